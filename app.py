@@ -3,7 +3,14 @@ Berke Yıldırım's Dashboard – Flask Backend
 Serves the static dashboard and exposes JSON API endpoints.
 """
 import os
+import time
 from flask import Flask, jsonify, request, send_from_directory
+from engine import metrics
+from engine.httpclient import connection_stats
+from engine.econ_calendar import CALENDAR
+from engine.materialize import MATERIALIZER
+from engine.universe import UNIVERSE
+from engine.seasonality import SEASONALITY
 from engine import (
     fetch_market_data,
     fetch_macro_data,
@@ -13,11 +20,13 @@ from engine import (
     get_market_status,
     fetch_turkey_macro,
     fetch_cbrt_tracker,
+    fetch_cbrt_history,
     fetch_economic_calendar,
     fetch_equity_risk,
     fetch_distressed,
     fetch_gold_correlation,
     compute_scorecard,
+    backtest_scorecard,
     generate_daily_brief,
     synthesize_narrative,
     terminal_chat,
@@ -138,6 +147,12 @@ def api_cbrt():
     return jsonify(data)
 
 
+@app.route("/api/cbrt/history")
+def api_cbrt_history():
+    """Full CBRT policy rate decision history (every change point)."""
+    return jsonify(fetch_cbrt_history())
+
+
 @app.route("/api/calendar")
 def api_calendar():
     """Upcoming economic events."""
@@ -166,7 +181,24 @@ def api_gold_correlation():
 @app.route("/api/scorecard")
 def api_scorecard():
     """Macro Risk Scorecard composite signal."""
-    return jsonify(compute_scorecard())
+    before = metrics.count("upstream.calls")
+    data = compute_scorecard()
+    # Upstream HTTP calls this request triggered (approximate under concurrent load)
+    calls = metrics.count("upstream.calls") - before
+    metrics.gauge("scorecard.upstream_calls", calls)
+    return jsonify({**data, "_upstream_calls": calls})
+
+
+@app.route("/api/scorecard/backtest")
+def api_scorecard_backtest():
+    """Replay the scorecard over its stored inputs; forward returns per signal bucket."""
+    return jsonify(backtest_scorecard())
+
+
+@app.route("/api/metrics")
+def api_metrics():
+    """Process-wide runtime counters (upstream calls, per-request gauges, connection reuse)."""
+    return jsonify({**metrics.snapshot(), "connections": connection_stats()})
 
 
 @app.route("/api/brief")
@@ -234,7 +266,8 @@ def api_registry_search():
     return jsonify(results)
 
 
-from engine.resolver import get_current_level, get_entity_analysis
+from engine.resolver import get_related_levels, get_entities_batch, warm_levels, get_current_level
+from engine.valuation import evaluate_all, valued_entities
 
 @app.route("/api/entity/<key>")
 def api_entity(key):
@@ -243,39 +276,75 @@ def api_entity(key):
     if not entity:
         return jsonify({"error": "Entity not found"}), 404
     
-    # Live level for primary
+    # Analysis from the materialized store (computed inline only when cold);
+    # the level is read live, since the stored one is up to a refresh cycle old
+    MATERIALIZER.record_access(entity["key"])
+    mat = MATERIALIZER.get_or_compute(entity["key"])
     val, unit, chg = get_current_level(entity["key"], entity)
+    if val is None: val, unit, chg = mat["level"]
     entity["current_value"] = val
     entity["current_unit"] = unit or entity.get("unit")
     entity["change_pct"] = chg
+    entity.update(mat["analysis"])  # merges 'alert', 'valuation', 'graph', 'seasonality', 'divergence', '_stages'
+    entity["analysis_ts"] = mat["analysis_ts"]
+    entity["analysis_age"] = int(time.time() - mat["computed_at"])
 
-    # Analysis (Alerts + Valuation + Seasonality + Divergence)
-    try:
-        analysis = get_entity_analysis(entity["key"], val, chg)
-        if analysis:
-            entity.update(analysis) # merges 'alert', 'valuation', 'seasonality', 'divergence'
-    except Exception:
-        pass
+    # Scheduled events that move this entity (indexed lookup)
+    entity["events"] = CALENDAR.for_entity(entity["key"], n=3)
 
     # Check for override
     override = get_override(key)
     entity["override"] = override
     
-    # Get related entities in same group
-    related = get_group_entities(entity["group"])
-    processed_related = []
-    for r in related:
-        if r["key"] != key:
-            r_val, r_unit, r_chg = get_current_level(r["key"], r)
-            r["current_value"] = r_val
-            r["current_unit"] = r_unit or r.get("unit")
-            r["change_pct"] = r_chg
-            processed_related.append(r)
-            
-    entity["related"] = processed_related
+    # Related entities in same group, levels looked up concurrently
+    related = [r for r in get_group_entities(entity["group"]) if r["key"] != key]
+    entity["related"] = get_related_levels(related)
     return jsonify(entity)
 
 
+MAX_BATCH_KEYS = 20
+VALID_PERIODS = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "max"]
+
+
+@app.route("/api/alerts")
+def api_alerts():
+    """Universe scanner alerts, newest first. Query params: limit, since (epoch)."""
+    limit = min(request.args.get("limit", 50, type=int), 500)
+    return jsonify(UNIVERSE.feed(limit=limit, since=request.args.get("since", type=float)))
+
+
+@app.route("/api/valuation")
+def api_valuation():
+    """Every registry valuation model in one batch, plus sensitivity grids."""
+    warm_levels(valued_entities())
+    return jsonify(evaluate_all())
+
+
+@app.route("/api/entities")
+def api_entities():
+    """Many entities in one request.
+    Query params: keys (comma-separated, required), history (period, optional:
+    adds closes aligned on common dates for the chartable ones).
+    """
+    keys = [k.strip().lstrip("@") for k in request.args.get("keys", "").split(",") if k.strip()]
+    if not keys:
+        return jsonify({"error": "No keys provided"}), 400
+    keys = list(dict.fromkeys(keys))[:MAX_BATCH_KEYS]
+    period = request.args.get("history")
+    if period and period not in VALID_PERIODS:
+        period = "3mo"
+    return jsonify(get_entities_batch(keys, history_period=period))
+
+
+@app.route("/api/group/<group>")
+def api_group(group):
+    """Every entity in a registry group, with live levels from the shared level store."""
+    members = [e["key"] for e in get_group_entities(group)]
+    if not members:
+        return jsonify({"error": "Group not found"}), 404
+    return jsonify({"group": group, **get_entities_batch(members)})
+
+
 @app.route("/api/entity/<key>/set", methods=["POST"])
 def api_entity_set(key):
     """Set a manual override for an entity."""
@@ -377,9 +446,12 @@ def background_scraper_loop():
             print(f"[Scraper] Crash: {e}")
             time.sleep(60)
 
-# Start background thread
+# Start background threads
 t = threading.Thread(target=background_scraper_loop, daemon=True)
 t.start()
+MATERIALIZER.start()
+UNIVERSE.start()
+SEASONALITY.start()
 
 
 # ---------------------------------------------------------------------------
@@ -1,19 +1,20 @@
 from .config import ALL_TICKERS, TICKER_CATEGORIES, TICKER_TAPE_ORDER
 from .market import fetch_market_data, fetch_movers, fetch_history, get_market_status, fetch_distressed, fetch_gold_correlation
-from .macro import fetch_macro_data, fetch_turkey_macro, fetch_cbrt_tracker, fetch_economic_calendar, fetch_equity_risk
+from .macro import fetch_macro_data, fetch_turkey_macro, fetch_cbrt_tracker, fetch_cbrt_history, fetch_economic_calendar, fetch_equity_risk, fetch_bond_yields
 from .news import fetch_news
 from .research import generate_daily_brief, synthesize_narrative, terminal_chat
 from .knowledge import get_context
 from .db import save_ticket, get_tickets, set_override, get_override, get_all_overrides, clear_override
-from .scorecard import compute_scorecard
+from .scorecard import compute_scorecard, backtest as backtest_scorecard
 from .registry import search_registry, resolve_entity, get_group_entities, DATA_REGISTRY
+from .levels import LEVELS
 
 __all__ = [
     "ALL_TICKERS", "TICKER_CATEGORIES", "TICKER_TAPE_ORDER",
     "fetch_market_data", "fetch_movers", "fetch_history", "get_market_status", "fetch_distressed", "fetch_gold_correlation",
-    "fetch_macro_data", "fetch_turkey_macro", "fetch_cbrt_tracker", "fetch_economic_calendar", "fetch_equity_risk",
+    "fetch_macro_data", "fetch_turkey_macro", "fetch_cbrt_tracker", "fetch_cbrt_history", "fetch_economic_calendar", "fetch_equity_risk", "fetch_bond_yields",
     "fetch_news", "generate_daily_brief", "synthesize_narrative", "terminal_chat", "get_context",
-    "save_ticket", "get_tickets", "compute_scorecard",
+    "save_ticket", "get_tickets", "compute_scorecard", "backtest_scorecard",
     "set_override", "get_override", "get_all_overrides", "clear_override",
-    "search_registry", "resolve_entity", "get_group_entities", "DATA_REGISTRY",
+    "search_registry", "resolve_entity", "get_group_entities", "DATA_REGISTRY", "LEVELS",
 ]
@@ -12,10 +12,11 @@ Logic:
 from .analytics import z_score
 from .market import fetch_history
 from .config import TICKER_CATEGORIES
+from .rolling import ROLLING, MIN_BARS, closed_bars
 
 class SigmaScanner:
-    def __init__(self):
-        self.history_cache = {} # Key -> List[Close Prices]
+    def __init__(self, stats=None):
+        self.stats = stats if stats is not None else ROLLING  # Symbol -> rolling window
     
     def check_anomaly(self, key, current_value, history_series=None):
         """
@@ -27,24 +28,49 @@ class SigmaScanner:
             current_value (float): Live value.
             history_series (list): Optional list of historical floats.
         """
-        hist = history_series
-        
-        # If no history provided, try to fetch it
-        if not hist or len(hist) < 5:
-            # We assume key is a valid ticker if we are here
-            # For non-tickers (macro), history might be passed in differently
+        if history_series and len(history_series) >= 5:
+            if len(history_series) < MIN_BARS: return None
+            return self.classify(z_score(current_value, history_series))
+
+        # Otherwise score against the symbol's rolling window (O(1)); history is
+        # only downloaded when the window is short or stale.
+        symbol = self._symbol(key)
+        if self.stats.needs_bars(symbol):
             try:
-                raw_hist = fetch_history(key, period="3mo")
-                if raw_hist:
-                    hist = [x["close"] for x in raw_hist if x.get("close")]
+                raw_hist = fetch_history(symbol, period="3mo")
+                if raw_hist: self.ingest(symbol, raw_hist)
             except Exception:
                 pass
-
-        if not hist or len(hist) < 20: # Need decent sample size for Z-Score
+        window = self.stats.window(symbol)
+        if window.n < MIN_BARS: # Need decent sample size for Z-Score
             return None
-            
-        z = z_score(current_value, hist)
-        
+        return self.classify(window.z(current_value))
+
+    def ingest(self, symbol, rows, now=None):
+        """
+        Fold fetch_history rows into the symbol's window. A bar whose day is
+        still running is the session in progress (it is the live value, not
+        history) and is left out; rows without timestamps replace the window
+        outright.
+        """
+        if any("time" not in r for r in rows):
+            self.stats.replace(symbol, [r.get("close") for r in rows])
+            return
+        bars = [(r["time"], r["close"]) for r in rows if r.get("close")]
+        self.stats.add_bars(symbol, closed_bars(bars, now))
+
+    @staticmethod
+    def _symbol(key):
+        """Registry keys of market entities map to their ticker ('usdtry' -> 'USDTRY=X')."""
+        from .registry import resolve_entity
+        entity = resolve_entity(key)
+        if entity and entity.get("source") == "market" and entity.get("technical_key"):
+            return entity["technical_key"]
+        return key
+
+    @staticmethod
+    def classify(z):
+        """Alert dict for a z-score beyond the sigma thresholds, else None."""
         # Thresholds
         if abs(z) >= 3.0:
             return {
@@ -65,35 +91,11 @@ class SigmaScanner:
 
     def check_divergence(self, key, current_val, change_pct, related_data={}):
         """
-        Checks for cross-asset divergences (e.g. Price flat but Risk rising).
+        Checks for cross-asset divergences (e.g. Price flat but Risk rising)
+        using the declarative rules in engine.divergence.
         related_data: Dict of {key: {"value": float, "change_pct": float}}
         """
-        alerts = []
-        
-        # 1. USDTRY vs CDS (Hidden Analysis)
-        # If USDTRY is flat/down but CDS is spiking -> Artificial Stability?
-        if key == "usdtry" and related_data.get("cds"):
-            cds = related_data["cds"]
-            cds_chg = cds.get("change_pct", 0)
-            
-            if abs(change_pct) < 0.1 and cds_chg > 2.0:
-                 alerts.append({
-                     "type": "DIVERGENCE",
-                     "level": "WARNING",
-                     "message": "Hidden Stress: Lira flat but CDS spiking (+{:.1f}%)".format(cds_chg)
-                 })
-
-        # 2. BIST100 vs VIX (Fragile Rally)
-        # If BIST is rallying but VIX (Global Fear) is rising -> Trap?
-        if key == "bist100" and related_data.get("vix"):
-            vix = related_data["vix"]
-            vix_chg = vix.get("change_pct", 0)
-            
-            if change_pct > 1.0 and vix_chg > 5.0:
-                 alerts.append({
-                     "type": "DIVERGENCE",
-                     "level": "CAUTION",
-                     "message": "Fragile Rally: BIST up despite Global Fear (VIX +{:.1f}%)".format(vix_chg)
-                 })
-                 
+        from .divergence import DIVERGENCE
+        alerts = [{"type": a["type"], "level": a["level"], "message": a["message"]}
+                  for a in DIVERGENCE.check(key, change_pct, related_data, current_value=current_val)]
         return alerts if alerts else None
@@ -8,7 +8,109 @@ NO external API calls. NO side effects. 100% Testable.
  zero-division, and edge cases gracefully."
 """
 import math
-import statistics
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+def _rows(history_series):
+    """List (None = missing) or array -> 2-D float array (symbols x time), NaN for missing."""
+    arr = np.array([np.nan if x is None else x for x in history_series], dtype=float) \
+        if isinstance(history_series, (list, tuple)) else np.asarray(history_series, dtype=float)
+    return arr.reshape(1, -1) if arr.ndim == 1 else arr
+
+# ── Batch (NumPy) primitives ─────────────────────────────────────────
+# 2-D inputs are (symbols x time); NaN marks a missing observation and is
+# skipped exactly like None in the scalar versions.
+
+def z_scores(current, history):
+    """
+    Z-Score of each row's current value against that row's history.
+    Rows with fewer than 2 observations or zero variance give 0.0.
+    """
+    hist = _rows(history)
+    cur = np.asarray(current, dtype=float).reshape(-1)
+    n = (~np.isnan(hist)).sum(axis=1)
+    out = np.zeros(hist.shape[0])
+    ok = n >= 2
+    if ok.any():
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nanmean(hist[ok], axis=1)
+            std = np.nanstd(hist[ok], axis=1, ddof=1)
+            z = np.where(std > 0, (cur[ok] - mean) / std, 0.0)
+        out[ok] = z
+    return out
+
+def percentile_ranks(current, history):
+    """Share of each row's observations below its current value (0.5 if none)."""
+    hist = _rows(history)
+    cur = np.asarray(current, dtype=float).reshape(-1)
+    valid = ~np.isnan(hist)
+    n = valid.sum(axis=1)
+    below = (valid & (hist < cur[:, None])).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, below / np.maximum(n, 1), 0.5)
+
+def rolling_z_scores(series, window):
+    """
+    Z-Score of every point against the `window` points before it
+    (the point itself is not in its own history, as in z_score).
+    Returns an array shaped like `series`; the first `window` columns are NaN.
+    """
+    x = _rows(series)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] <= window: return out
+    hist = sliding_window_view(x, window, axis=1)[:, :-1]     # (n, T-window, window)
+    cur = x[:, window:]
+    n = (~np.isnan(hist)).sum(axis=2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nanmean(hist, axis=2)
+        std = np.nanstd(hist, axis=2, ddof=1)
+        z = np.where((n >= 2) & (std > 0), (cur - mean) / std, 0.0)
+    out[:, window:] = z
+    return out
+
+def rolling_percentile_ranks(series, window):
+    """
+    Percentile rank of every point within the `window` points before it,
+    via sorted windows and one searchsorted over all of them.
+    Returns an array shaped like `series`; the first `window` columns are NaN.
+    """
+    x = _rows(series)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] <= window: return out
+    hist = sliding_window_view(x, window, axis=1)[:, :-1].reshape(-1, window)
+    cur = x[:, window:].reshape(-1)
+    # Exact integer keys: (window index, value rank). Sorting each window's keys
+    # then lays every window out in one globally sorted array for searchsorted.
+    values, inverse = np.unique(np.concatenate([hist.ravel(), cur]), return_inverse=True)
+    ranks = inverse.astype(np.int64)
+    nan_rank = len(values)  # np.unique puts NaN last; give it a rank above every value
+    ranks[np.isnan(np.concatenate([hist.ravel(), cur]))] = nan_rank
+    m = nan_rank + 1
+    w_idx = np.arange(hist.shape[0], dtype=np.int64)
+    keys = np.sort(w_idx[:, None] * m + ranks[:hist.size].reshape(hist.shape), axis=1).ravel()
+    below = np.searchsorted(keys, w_idx * m + ranks[hist.size:], side="left") - w_idx * window
+    n = (~np.isnan(hist)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = np.where(n > 0, below / np.maximum(n, 1), 0.5)
+    pct[np.isnan(cur)] = np.nan
+    out[:, window:] = pct.reshape(x.shape[0], -1)
+    return out
+
+def real_returns(nominal_rate, inflation_rate):
+    """Fisher real returns, elementwise; 0.0 where inflation <= -100%."""
+    n = np.asarray(nominal_rate, dtype=float)
+    i = np.asarray(inflation_rate, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(i <= -1.0, 0.0, (1 + n) / (1 + i) - 1)
+
+def implied_carry_trades(long_yield, short_yield, spot_fx, expected_spot_fx):
+    """implied_carry_trade, elementwise."""
+    spot = np.asarray(spot_fx, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (np.asarray(long_yield, dtype=float) - np.asarray(short_yield, dtype=float)) \
+            - (np.asarray(expected_spot_fx, dtype=float) - spot) / spot
+
+# ── Scalar primitives (thin wrappers over the batch versions) ────────
 
 def z_score(current_value, history_series):
     """
@@ -23,37 +125,16 @@ def z_score(current_value, history_series):
                +2.0 means 2 StdDev above mean.
                Returns 0.0 if not enough data (<2 points).
     """
-    clean_history = [x for x in history_series if x is not None]
-    # For a live Z-Score, we should check where 'current' sits within the distribution
-    # OF THE HISTORY. 
-    # Option A: (Current - Mean_History) / StdDev_History
-    # Option B: Add Current to History, then Compute.
     # Bloomberg usually compares Current to the Moving Average of the LAST N days.
     # So Current is NOT in the history used for Mean/StdDev.
-    
-    if len(clean_history) < 2:
-        return 0.0
-        
-    mean = statistics.mean(clean_history)
-    stdev = statistics.stdev(clean_history)
-    
-    if stdev == 0:
-        return 0.0
-        
-    return (current_value - mean) / stdev
+    return float(z_scores([current_value], history_series)[0])
 
 def percentile_rank(current_value, history_series):
     """
     Computes the percentile rank of the current value against history.
     0.0 = Lowest ever, 1.0 = Highest ever.
     """
-    clean_history = [x for x in history_series if x is not None]
-    if not clean_history:
-        return 0.5 # Neutral fallback
-        
-    # Count how many historical values are less than current
-    count = sum(1 for x in clean_history if x < current_value)
-    return count / len(clean_history)
+    return float(percentile_ranks([current_value], history_series)[0])
 
 def real_return(nominal_rate, inflation_rate):
     """
@@ -64,10 +145,7 @@ def real_return(nominal_rate, inflation_rate):
         nominal_rate (float): E.g. 0.50 for 50%.
         inflation_rate (float): E.g. 0.40 for 40%.
     """
-    if inflation_rate <= -1.0: # Hyper-deflation protection
-        return 0.0
-        
-    return ((1 + nominal_rate) / (1 + inflation_rate)) - 1
+    return float(real_returns(nominal_rate, inflation_rate))
 
 def implied_carry_trade(long_yield, short_yield, spot_fx, expected_spot_fx):
     """
@@ -82,11 +160,8 @@ def implied_carry_trade(long_yield, short_yield, spot_fx, expected_spot_fx):
     Returns:
         float: Expected ROI (e.g. 0.12 for 12%).
     """
-    interest_diff = long_yield - short_yield
-    fx_depreciation = (expected_spot_fx - spot_fx) / spot_fx
-    
     # Approx logic: Yield - Depreciation
-    return interest_diff - fx_depreciation
+    return float(implied_carry_trades(long_yield, short_yield, spot_fx, expected_spot_fx))
 
 def fair_value_ppp(spot_fx, home_cpi_index, foreign_cpi_index, base_spot_fx=None):
     """
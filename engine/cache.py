@@ -3,6 +3,7 @@ import threading
 
 _cache = {}
 _lock = threading.Lock()
+_listeners = []
 
 def get_cached(key, ttl_seconds=60):
     """Retrieve data from the thread-safe TTL cache."""
@@ -16,3 +17,29 @@ def set_cached(key, data):
     """Store data in the thread-safe TTL cache with a current timestamp."""
     with _lock:
         _cache[key] = {"data": data, "ts": time.time()}
+    for fn in _listeners:
+        try:
+            fn(key, data)
+        except Exception as e:
+            print(f"[cache] Listener failed for {key}: {e}")
+
+def subscribe(fn):
+    """Call fn(key, data) after every set_cached (outside the cache lock)."""
+    _listeners.append(fn)
+
+def get_last_good(key):
+    """Retrieve the last stored value for a key regardless of age (or None)."""
+    with _lock:
+        entry = _cache.get(key)
+        return entry["data"] if entry else None
+
+def invalidate(key):
+    """Drop a key so the next reader recomputes it."""
+    with _lock:
+        _cache.pop(key, None)
+
+def cached_at(key):
+    """Epoch seconds when `key` was last stored (or None)."""
+    with _lock:
+        entry = _cache.get(key)
+        return entry["ts"] if entry else None
@@ -75,6 +75,129 @@ def init_db():
         )
     ''')
     
+    # EVDS Observations (local series store)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS evds_observations (
+            series_code TEXT,
+            obs_date TEXT,
+            label TEXT,
+            value REAL,
+            PRIMARY KEY (series_code, obs_date)
+        )
+    ''')
+
+    # EVDS Sync Bookkeeping (when each series was last pulled, how far back we hold it)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS evds_sync (
+            series_code TEXT PRIMARY KEY,
+            synced_at REAL,
+            covered_from TEXT
+        )
+    ''')
+
+    # Economic Calendar (one row per event occurrence; period = YYYY-MM it belongs to)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS calendar_events (
+            event TEXT,
+            country TEXT,
+            period TEXT,
+            date TEXT,
+            time TEXT,
+            importance TEXT,
+            entities TEXT,
+            manual INTEGER DEFAULT 0,
+            PRIMARY KEY (event, country, period)
+        )
+    ''')
+    cols = {r["name"] for r in cursor.execute('PRAGMA table_info(calendar_events)')}
+    if "manual" not in cols:  # Tables created before hand-edits were flagged
+        cursor.execute('ALTER TABLE calendar_events ADD COLUMN manual INTEGER DEFAULT 0')
+
+    # CBRT Rate Decisions (change points of the policy rate series)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cbrt_decisions (
+            series_code TEXT,
+            obs_date TEXT,
+            label TEXT,
+            rate REAL,
+            previous REAL,
+            PRIMARY KEY (series_code, obs_date)
+        )
+    ''')
+
+    # Processing Cursors (how far an incremental job has consumed a series)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS processing_cursors (
+            name TEXT PRIMARY KEY,
+            last_obs TEXT,
+            last_value REAL
+        )
+    ''')
+
+    # Daily closes (local history store behind the rolling statistics)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS price_history (
+            symbol TEXT,
+            time INTEGER,
+            close REAL,
+            PRIMARY KEY (symbol, time)
+        )
+    ''')
+    # Bars are stamped at UTC midnight of their date; older rows carried the
+    # exchange's local midnight, so one session could be stored twice.
+    cursor.execute('UPDATE OR IGNORE price_history SET time = (time + 43200) / 86400 * 86400 WHERE time % 86400 != 0')
+    cursor.execute('DELETE FROM price_history WHERE time % 86400 != 0')
+
+    # Universe scanner alerts
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            epoch REAL,
+            timestamp DATETIME,
+            symbol TEXT,
+            name TEXT,
+            type TEXT,
+            level TEXT,
+            message TEXT,
+            price REAL,
+            z_score REAL,
+            percentile REAL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_epoch ON alerts (epoch)')
+
+    # Precomputed seasonality (kind: month | weekday | turn_of_month)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS seasonality (
+            symbol TEXT,
+            kind TEXT,
+            bucket TEXT,
+            mean REAL,
+            median REAL,
+            win_rate REAL,
+            count INTEGER,
+            t_stat REAL,
+            computed_at DATETIME,
+            PRIMARY KEY (symbol, kind, bucket)
+        )
+    ''')
+
+    # Macro scorecard inputs + composite, one row per refresh that changed them
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scorecard_history (
+            epoch REAL PRIMARY KEY,
+            timestamp DATETIME,
+            yield_curve REAL,
+            real_carry REAL,
+            ppi_cpi_gap REAL,
+            erp REAL,
+            cds REAL,
+            gold_corr REAL,
+            composite REAL,
+            signal TEXT
+        )
+    ''')
+
     conn.commit()
     conn.close()
 
@@ -255,6 +378,283 @@ def get_top_movers_by_date(date_str, limit=5):
     conn.close()
     return {"gainers": gainers, "losers": losers}
 
+def upsert_evds_observations(series_code, rows):
+    """Insert or revise EVDS observations. rows: iterable of (obs_date, label, value)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT INTO evds_observations (series_code, obs_date, label, value)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(series_code, obs_date) DO UPDATE SET
+            label=excluded.label, value=excluded.value
+    ''', [(series_code, d, l, v) for d, l, v in rows])
+    conn.commit()
+    conn.close()
+
+def get_evds_observations(series_code, since=None):
+    """Stored observations for a series, oldest first. since: ISO date lower bound."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT obs_date, label, value FROM evds_observations
+        WHERE series_code = ? AND obs_date >= ?
+        ORDER BY obs_date ASC
+    ''', (series_code, since or ""))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+def get_evds_sync(series_code):
+    """Sync bookkeeping for a series, plus its latest stored observation date."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT s.synced_at, s.covered_from,
+               (SELECT MAX(obs_date) FROM evds_observations o WHERE o.series_code = s.series_code) AS last_obs
+        FROM evds_sync s WHERE s.series_code = ?
+    ''', (series_code,))
+    row = cursor.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def set_evds_sync(series_code, synced_at, covered_from):
+    """Record a successful pull. covered_from only ever moves backwards."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO evds_sync (series_code, synced_at, covered_from)
+        VALUES (?, ?, ?)
+        ON CONFLICT(series_code) DO UPDATE SET
+            synced_at=excluded.synced_at,
+            covered_from=MIN(evds_sync.covered_from, excluded.covered_from)
+    ''', (series_code, synced_at, covered_from))
+    conn.commit()
+    conn.close()
+
+def seed_calendar_events(rows, start=None, end=None):
+    """
+    Upsert generated calendar rows (dicts), so a date corrected in config
+    replaces the stored one. Rows fixed by hand (manual = 1, see
+    set_calendar_date) are left alone. With a start/end (ISO dates) the rows
+    are the whole schedule for that span: other generated rows dated inside
+    it (e.g. an occurrence whose corrected date moved to another month) are
+    deleted.
+    """
+    keys = {(r["event"], r["country"], r["date"][:7]) for r in rows}
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT INTO calendar_events (event, country, period, date, time, importance, entities)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(event, country, period) DO UPDATE SET
+            date=excluded.date, time=excluded.time,
+            importance=excluded.importance, entities=excluded.entities
+        WHERE calendar_events.manual = 0
+    ''', [(r["event"], r["country"], r["date"][:7], r["date"], r.get("time", ""), r.get("importance", "medium"),
+           ",".join(r.get("entities", []))) for r in rows])
+    if start and end:
+        cursor.execute('''
+            SELECT event, country, period FROM calendar_events
+            WHERE manual = 0 AND date >= ? AND date <= ?
+        ''', (start, end))
+        stale = [tuple(r) for r in cursor.fetchall() if tuple(r) not in keys]
+        cursor.executemany('DELETE FROM calendar_events WHERE event = ? AND country = ? AND period = ?', stale)
+    conn.commit()
+    conn.close()
+
+def set_calendar_date(event, country, period, date, time=None):
+    """Correct one occurrence by hand; re-seeding will not overwrite it."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        UPDATE calendar_events SET date = ?, time = COALESCE(?, time), manual = 1
+        WHERE event = ? AND country = ? AND period = ?
+    ''', (date, time, event, country, period))
+    conn.commit()
+    conn.close()
+    return cursor.rowcount > 0
+
+def get_calendar_events():
+    """All calendar rows, in date/time order."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT event, country, date, time, importance, entities FROM calendar_events
+        ORDER BY date ASC, time ASC
+    ''')
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+def replace_cbrt_decisions(series_code, since, rows):
+    """
+    Swap the decisions of `series_code` on or after ISO date `since` (all of
+    them when None) for `rows`: (series_code, obs_date, label, rate, previous).
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM cbrt_decisions WHERE series_code = ? AND obs_date >= ?', (series_code, since or ""))
+    cursor.executemany('''
+        INSERT OR REPLACE INTO cbrt_decisions (series_code, obs_date, label, rate, previous)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+def get_cbrt_decisions(series_code):
+    """All recorded rate changes for a series, oldest first."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT obs_date, label, rate, previous FROM cbrt_decisions
+        WHERE series_code = ? ORDER BY obs_date ASC
+    ''', (series_code,))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+def get_cursor(name):
+    """Position of an incremental job: {"last_obs", "last_value"} or None."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT last_obs, last_value FROM processing_cursors WHERE name = ?', (name,))
+    row = cursor.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def set_cursor(name, last_obs, last_value):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO processing_cursors (name, last_obs, last_value) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET last_obs=excluded.last_obs, last_value=excluded.last_value
+    ''', (name, last_obs, last_value))
+    conn.commit()
+    conn.close()
+
+def save_price_history(symbol, bars):
+    """Upsert (time, close) bars for a symbol."""
+    if not bars: return
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT OR REPLACE INTO price_history (symbol, time, close) VALUES (?, ?, ?)
+    ''', [(symbol, t, c) for t, c in bars])
+    conn.commit()
+    conn.close()
+
+def get_price_history(symbol, limit=None):
+    """The most recent `limit` (time, close) bars for a symbol, oldest first."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT time, close FROM price_history WHERE symbol = ?
+        ORDER BY time DESC LIMIT ?
+    ''', (symbol, limit if limit is not None else -1))
+    rows = cursor.fetchall()
+    conn.close()
+    return [(r["time"], r["close"]) for r in reversed(rows)]
+
+def get_price_history_span():
+    """{symbol: (first time, last time, bars)} for every symbol in price_history."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT symbol, MIN(time) AS first, MAX(time) AS last, COUNT(*) AS n FROM price_history GROUP BY symbol')
+    rows = cursor.fetchall()
+    conn.close()
+    return {r["symbol"]: (r["first"], r["last"], r["n"]) for r in rows}
+
+def get_price_history_rows(symbols, since=0):
+    """(symbol, time, close) rows for many symbols at or after epoch `since`."""
+    if not symbols: return []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    marks = ",".join("?" * len(symbols))
+    cursor.execute(f'''
+        SELECT symbol, time, close FROM price_history
+        WHERE symbol IN ({marks}) AND time >= ? ORDER BY symbol, time
+    ''', (*symbols, since))
+    rows = cursor.fetchall()
+    conn.close()
+    return [tuple(r) for r in rows]
+
+def save_seasonality(symbols, rows, computed_at):
+    """Replace the seasonality rows of `symbols` (rows: dicts with the table columns)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany('DELETE FROM seasonality WHERE symbol = ?', [(s,) for s in symbols])
+    cursor.executemany('''
+        INSERT OR REPLACE INTO seasonality (symbol, kind, bucket, mean, median, win_rate, count, t_stat, computed_at)
+        VALUES (:symbol, :kind, :bucket, :mean, :median, :win_rate, :count, :t_stat, :computed_at)
+    ''', [{**r, "computed_at": computed_at} for r in rows])
+    conn.commit()
+    conn.close()
+
+def get_seasonality(symbol):
+    """All precomputed seasonality rows for a symbol."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM seasonality WHERE symbol = ?', (symbol,))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+def save_scorecard_point(row):
+    """Append one scorecard refresh (dict with the scorecard_history columns)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT OR REPLACE INTO scorecard_history
+            (epoch, timestamp, yield_curve, real_carry, ppi_cpi_gap, erp, cds, gold_corr, composite, signal)
+        VALUES (:epoch, :timestamp, :yield_curve, :real_carry, :ppi_cpi_gap, :erp, :cds, :gold_corr, :composite, :signal)
+    ''', row)
+    conn.commit()
+    conn.close()
+
+def get_scorecard_history(since=0):
+    """Stored scorecard refreshes at or after epoch `since`, oldest first."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM scorecard_history WHERE epoch >= ? ORDER BY epoch', (since,))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+def add_alerts(alerts):
+    """Append triggered scanner alerts (dicts with the alerts-table columns)."""
+    if not alerts: return
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT INTO alerts (epoch, timestamp, symbol, name, type, level, message, price, z_score, percentile)
+        VALUES (:epoch, :timestamp, :symbol, :name, :type, :level, :message, :price, :z_score, :percentile)
+    ''', alerts)
+    conn.commit()
+    conn.close()
+
+def get_alerts(limit=50, since=None):
+    """Most recent alerts first, optionally only those after epoch `since`."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT * FROM alerts WHERE epoch > ? ORDER BY epoch DESC, id DESC LIMIT ?
+    ''', (since or 0, limit))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+def get_last_alerts(since):
+    """{(symbol, type): (epoch, level)} of the latest alert per pair after `since`."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT symbol, type, MAX(epoch) AS epoch, level FROM alerts
+        WHERE epoch > ? GROUP BY symbol, type
+    ''', (since,))
+    rows = cursor.fetchall()
+    conn.close()
+    return {(r["symbol"], r["type"]): (r["epoch"], r["level"]) for r in rows}
+
 def save_ticket(items_json, notes=""):
     """Store a digital quality ticket."""
     conn = get_db_connection()
@@ -0,0 +1,148 @@
+"""
+The Divergence Spotter
+======================
+"When two things that move together stop moving together."
+Cross-asset divergence rules declared in config.json["divergence_rules"]
+(pair, conditions on each leg's change / z-score / value, severity,
+message), compiled once into flat NumPy arrays.
+
+    * Evaluation: one gather of every leg's metrics from the level store
+      (z-scores come from the rolling windows). Every condition of every
+      rule is then tested in a single vectorized comparison, and a rule
+      fires when none of its conditions failed.
+    * Results are cached and reused until a leg's inputs change. Popups
+      read their divergence from this cache instead of looking up each
+      pair again. The universe scanner pushes new hits into the alerts feed.
+"""
+import threading
+import numpy as np
+from .config import CONFIG
+from .levels import LEVELS
+from .rolling import ROLLING, MIN_BARS
+
+METRICS = ("change_pct", "z", "value")
+OPS = ("gt", "lt", "abs_gt", "abs_lt")
+LEGS = ("subject", "other")
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class DivergenceEngine:
+    def __init__(self, rules=None, levels=None, stats=None):
+        self.rules = rules if rules is not None else CONFIG.get("divergence_rules", {}).get("rules", [])
+        self.levels = levels if levels is not None else LEVELS
+        self.stats = stats if stats is not None else ROLLING
+        self._lock = threading.Lock()
+        self._cache = (None, [])  # (input stamp, fired alerts)
+        self._compile()
+
+    def _compile(self):
+        keys = []
+        for r in self.rules:
+            for leg in LEGS:
+                if r[leg] not in keys: keys.append(r[leg])
+        self.keys = keys
+        idx = {k: i for i, k in enumerate(keys)}
+        legs = np.array([[idx[r[leg]] for leg in LEGS] for r in self.rules], dtype=int).reshape(-1, 2)
+        rule_of, key_of, metric, op, value = [], [], [], [], []
+        for ri, r in enumerate(self.rules):
+            for c in r.get("when", []):
+                rule_of.append(ri)
+                key_of.append(legs[ri, LEGS.index(c["leg"])])
+                metric.append(METRICS.index(c.get("metric", "change_pct")))
+                op.append(OPS.index(c["op"]))
+                value.append(float(c["value"]))
+        self._legs = legs
+        self._rule_of = np.array(rule_of, dtype=int)
+        self._key_of = np.array(key_of, dtype=int)
+        self._metric = np.array(metric, dtype=int)
+        self._op = np.array(op, dtype=int)
+        self._value = np.array(value, dtype=float)
+        self._uses_z = {self.keys[k] for k, m in zip(key_of, metric) if METRICS[m] == "z"}
+
+    # ── Inputs ───────────────────────────────────────────────────────
+    def _z(self, key, value):
+        from .registry import resolve_entity
+        entity = resolve_entity(key) or {}
+        sym = entity.get("technical_key") if entity.get("source") == "market" else key
+        w = self.stats.window(sym or key)
+        return w.z(value) if w.n >= MIN_BARS and not np.isnan(value) else np.nan
+
+    def gather(self, overrides=None):
+        """(len(keys) x len(METRICS)) matrix of live inputs; `overrides` = {key: {metric: v}}."""
+        m = np.full((len(self.keys), len(METRICS)), np.nan)
+        for i, key in enumerate(self.keys):
+            o = (overrides or {}).get(key)
+            if o is not None:
+                val, chg = _num(o.get("value")), _num(o.get("change_pct"))
+            else:
+                val, _, chg = self.levels.level(key)
+                val, chg = _num(val), _num(chg)
+            m[i, 0], m[i, 2] = chg, val
+            if key in self._uses_z:
+                m[i, 1] = _num(o.get("z")) if o is not None and "z" in o else self._z(key, val)
+        return m
+
+    # ── Evaluation ───────────────────────────────────────────────────
+    def fire_mask(self, m):
+        """Boolean per rule: every condition holds (NaN inputs never satisfy one)."""
+        x = m[self._key_of, self._metric]
+        v = self._value
+        with np.errstate(invalid="ignore"):
+            ok = np.select([self._op == 0, self._op == 1, self._op == 2, self._op == 3],
+                           [x > v, x < v, np.abs(x) > v, np.abs(x) < v], default=False)
+        failed = np.bincount(self._rule_of[~ok], minlength=len(self.rules))
+        has_conditions = np.bincount(self._rule_of, minlength=len(self.rules)) > 0
+        return (failed == 0) & has_conditions
+
+    def _alerts(self, m, mask):
+        out = []
+        for ri in np.flatnonzero(mask):
+            r = self.rules[ri]
+            s, o = self._legs[ri]
+            fields = {}
+            for leg, k in (("subject", s), ("other", o)):
+                for mi, name in enumerate(METRICS):
+                    fields[f"{leg}_{name}"] = m[k, mi]
+            try:
+                message = r["message"].format(**fields)
+            except (KeyError, ValueError):
+                message = r["message"]
+            out.append({"rule": r["id"], "subject": r["subject"], "other": r["other"],
+                        "type": "DIVERGENCE", "level": r.get("level", "WARNING"), "message": message})
+        return out
+
+    def evaluate(self):
+        """Every configured rule against the level store; cached until an input changes."""
+        if not self.rules: return []
+        m = self.gather()
+        stamp = np.nan_to_num(m, nan=-1e300).tobytes()
+        with self._lock:
+            if self._cache[0] == stamp: return self._cache[1]
+        fired = self._alerts(m, self.fire_mask(m))
+        with self._lock:
+            self._cache = (stamp, fired)
+        return fired
+
+    def for_entity(self, key):
+        """Cached divergences whose subject is `key`."""
+        return [a for a in self.evaluate() if a["subject"] == key]
+
+    def check(self, key, change_pct, related, current_value=None):
+        """
+        Ad-hoc evaluation of `key`'s rules with explicit inputs:
+        related = {other key: {"value", "change_pct"}}. Returns fired alerts.
+        """
+        overrides = {k: v for k, v in related.items() if k in self.keys}
+        overrides[key] = {"value": current_value, "change_pct": change_pct}
+        m = self.gather(overrides)
+        mask = self.fire_mask(m) & np.array([r["subject"] == key for r in self.rules])
+        return self._alerts(m, mask)
+
+
+DIVERGENCE = DivergenceEngine()
@@ -0,0 +1,153 @@
+"""
+The Economic Calendar
+=====================
+"Know what's coming before it hits the tape."
+Scheduled events (CBRT, FOMC, TR statistical releases, US CPI) kept in the
+calendar_events table and served from an in-memory index.
+
+    * Sources: config.json["economic_calendar"] (fixed meeting dates and
+      monthly rules) plus the TR release rules behind engine.releases.
+      Seeding upserts: a date corrected in config replaces the stored one
+      (and an occurrence moved into another month leaves no copy behind),
+      while a date fixed by hand (set_calendar_date, manual = 1) sticks.
+    * Time index: events sorted by "YYYY-MM-DD HH:MM"; "next N after now"
+      and "events in window" are bisects, not scans.
+    * Entity / event-name indexes: key -> positions in the time index, so
+      "events affecting @cpi_yoy" or "next CBRT meeting" is a bisect into
+      a short list.
+
+The release clock reads actual release times from here, so a corrected
+date also moves the EVDS polling window.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from .config import CONFIG
+from .db import seed_calendar_events, get_calendar_events
+from .releases import RELEASES, now_tr
+
+HORIZON_DAYS = 400     # How far ahead rules are expanded
+LOOKBACK_DAYS = 45     # Recent past kept in the default listing
+IMPORTANCE = {"low": 0, "medium": 1, "high": 2}
+
+
+def _at(event):
+    return f"{event['date']} {event.get('time') or '00:00'}"
+
+
+class EconomicCalendar:
+    def __init__(self, config=None, schedule=RELEASES):
+        self.config = config if config is not None else CONFIG.get("economic_calendar", {})
+        self.schedule = schedule
+        self._lock = threading.Lock()
+        self._seeded_until = None
+        self._index = ([], [], {}, {})  # (events, at_keys, entity -> positions, event name -> positions)
+
+    # ── Build ────────────────────────────────────────────────────────
+    def _generate(self, start, end):
+        rows = []
+        for spec in self.config.get("fixed", []):
+            for d in spec.get("dates", []):
+                if start <= d <= end:
+                    rows.append({**{k: v for k, v in spec.items() if k != "dates"}, "date": d})
+        d0 = datetime.strptime(start, "%Y-%m-%d").replace(day=1)
+        for spec in self.config.get("monthly", []):
+            y, m = d0.year, d0.month
+            while f"{y:04d}-{m:02d}" <= end[:7]:
+                d = f"{y:04d}-{m:02d}-{spec['day']:02d}"
+                if start <= d <= end:
+                    rows.append({**{k: v for k, v in spec.items() if k != "day"}, "date": d})
+                y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+        if self.schedule is not None:
+            rows.extend(self.schedule.events(start, end))
+        return rows
+
+    def _ensure(self):
+        today = now_tr().strftime("%Y-%m-%d")
+        if self._seeded_until == today: return
+        with self._lock:
+            if self._seeded_until == today: return
+            start = (now_tr() - timedelta(days=HORIZON_DAYS)).strftime("%Y-%m-%d")
+            end = (now_tr() + timedelta(days=HORIZON_DAYS)).strftime("%Y-%m-%d")
+            seed_calendar_events(self._generate(start, end), start, end)
+            self._build(get_calendar_events())
+            self._seeded_until = today
+
+    def _build(self, rows):
+        events = []
+        for r in rows:
+            ents = [e for e in (r.get("entities") or "").split(",") if e]
+            events.append({"date": r["date"], "time": r.get("time") or "", "event": r["event"],
+                           "country": r["country"], "importance": r.get("importance") or "medium",
+                           "entities": ents})
+        events.sort(key=_at)
+        keys = [_at(e) for e in events]
+        by_entity, by_event = {}, {}
+        for pos, e in enumerate(events):
+            by_event.setdefault(e["event"], []).append(pos)
+            for ent in e["entities"]:
+                by_entity.setdefault(ent, []).append(pos)
+        self._index = (events, keys, by_entity, by_event)  # Swapped whole: readers never see a half-built index
+
+    def reload(self):
+        """Re-read the table (e.g. after a manual date fix)."""
+        self._seeded_until = None
+        self._ensure()
+
+    # ── Queries ──────────────────────────────────────────────────────
+    def _now_key(self, now):
+        return (now or now_tr()).strftime("%Y-%m-%d %H:%M")
+
+    def upcoming(self, n=5, now=None, country=None, min_importance=None):
+        """Next `n` events strictly after `now`, optionally filtered."""
+        self._ensure()
+        events, keys, _, _ = self._index
+        floor = IMPORTANCE.get(min_importance, 0)
+        out = []
+        for e in events[bisect_right(keys, self._now_key(now)):]:
+            if country and e["country"] != country: continue
+            if IMPORTANCE.get(e["importance"], 1) < floor: continue
+            out.append(e)
+            if len(out) >= n: break
+        return out
+
+    def window(self, start, end):
+        """Events with start <= date <= end (ISO dates)."""
+        self._ensure()
+        events, keys, _, _ = self._index
+        return events[bisect_left(keys, start):bisect_right(keys, f"{end} 99:99")]
+
+    def for_entity(self, key, n=3, now=None):
+        """Next `n` events linked to registry entity `key`."""
+        self._ensure()
+        events, keys, by_entity, _ = self._index
+        positions = by_entity.get(key, [])
+        start = bisect_left(positions, bisect_right(keys, self._now_key(now)))
+        return [events[p] for p in positions[start:start + n]]
+
+    def next_of(self, event_name, now=None):
+        """Next occurrence of a named event (e.g. "CBRT MPC Meeting"), or None."""
+        self._ensure()
+        events, keys, _, by_event = self._index
+        positions = by_event.get(event_name, [])
+        i = bisect_left(positions, bisect_right(keys, self._now_key(now)))
+        return events[positions[i]] if i < len(positions) else None
+
+    def last_of(self, event_name, now=None):
+        """Most recent occurrence at or before `now`, or None."""
+        self._ensure()
+        events, keys, _, by_event = self._index
+        positions = by_event.get(event_name, [])
+        i = bisect_left(positions, bisect_right(keys, self._now_key(now)))
+        return events[positions[i - 1]] if i > 0 else None
+
+    def listing(self, now=None):
+        """Default /api/calendar view: the recent past plus everything ahead."""
+        now = now or now_tr()
+        start = (now - timedelta(days=LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+        end = (now + timedelta(days=HORIZON_DAYS)).strftime("%Y-%m-%d")
+        return self.window(start, end)
+
+
+CALENDAR = EconomicCalendar()
+RELEASES.calendar = CALENDAR  # Release times come from the stored calendar
@@ -0,0 +1,287 @@
+"""
+The EVDS Client (Central Bank Gateway)
+======================================
+"One trip to the Central Bank."
+Shared access layer for the TCMB EVDS series endpoint.
+
+    * Batching: series sharing a date window go out in ONE request
+      (EVDS accepts dash-joined codes: series=TP.FG.J0-TP.FE.OKTG04).
+    * Concurrency: remaining batches/windows run in parallel over the
+      shared pooled HTTP layer (engine.httpclient).
+    * De-duplication: identical (series, window) requests from different
+      callers share one in-flight HTTP call and a short-lived result.
+
+Items are returned in the same shape as the raw API rows
+({"Tarih": ..., "TP_FG_J0": ...}), projected to the requested series.
+
+On top of the client sits EVDSStore: a persistent per-series observation
+store (SQLite) that only pulls dates after the last stored observation
+(plus a short trailing window for revisions) and answers last-value /
+growth questions from local data.
+"""
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from .config import EVDS_API_KEY
+from .cache import get_cached, set_cached
+from . import httpclient as http
+from .db import upsert_evds_observations, get_evds_observations, get_evds_sync, set_evds_sync
+from .releases import RELEASES
+
+EVDS_URL = "https://evds3.tcmb.gov.tr/igmevdsms-dis/"
+BATCH_SIZE = 10    # Keep URLs short and one bad code from sinking too many series
+RESULT_TTL = 60    # Seconds an identical (series, window) answer is re-served
+MAX_WORKERS = 6
+SYNC_INTERVAL = 600  # Seconds before a stored series is checked upstream again
+WINDOW_BUCKETS = [7, 30, 90, 180, 365, 800, 1600]  # Incremental windows snap to these so series still batch
+
+
+def evds_date(days_back=0):
+    """EVDS date string (dd-mm-YYYY) for `days_back` days ago."""
+    return (datetime.now() - timedelta(days=days_back)).strftime("%d-%m-%Y")
+
+
+def evds_iso(label):
+    """Sortable ISO date for an EVDS 'Tarih' label (daily, monthly, quarterly, annual)."""
+    label = str(label or "").strip()
+    m = re.fullmatch(r"(\d{1,2})-(\d{1,2})-(\d{4})", label)       # 13-02-2026
+    if m: return f"{m[3]}-{int(m[2]):02d}-{int(m[1]):02d}"
+    m = re.fullmatch(r"(\d{4})-?Q([1-4])", label, re.I)           # 2025-Q3
+    if m: return f"{m[1]}-{(int(m[2]) - 1) * 3 + 1:02d}-01"
+    m = re.fullmatch(r"(\d{4})-(\d{1,2})", label)                 # 2026-1
+    if m: return f"{m[1]}-{int(m[2]):02d}-01"
+    m = re.fullmatch(r"(\d{4})", label)                          # 2025
+    if m: return f"{m[1]}-01-01"
+    return None
+
+
+class EVDSClient:
+    def __init__(self, max_workers=MAX_WORKERS, http_client=http):
+        self.http = http_client
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="evds")
+        self._inflight = {}  # spec -> Future of a batch dict {code: items | None}
+        self._lock = threading.Lock()
+
+    def fetch(self, series_code, start_date=None, end_date=None, frequency=None):
+        """Single-series convenience wrapper. Returns a list of items."""
+        spec = self._spec(series_code, start_date, end_date, frequency)
+        return self.fetch_specs([spec]).get(spec, [])
+
+    def fetch_many(self, series_codes, start_date=None, end_date=None, frequency=None):
+        """Fetch several series over one date window. Returns {code: items}."""
+        specs = [self._spec(c, start_date, end_date, frequency) for c in series_codes if c]
+        res = self.fetch_specs(specs)
+        return {s[0]: res.get(s, []) for s in specs}
+
+    def prefetch(self, requests_list):
+        """
+        Warm the client for a mixed set of (series_code, start_date) pairs.
+        Pairs are grouped by window and batched; all windows run concurrently.
+        """
+        specs = [self._spec(code, start) for code, start in requests_list if code and code != "N/A"]
+        return self.fetch_specs(specs)
+
+    def fetch_specs(self, specs):
+        """
+        Core resolver: specs are (code, start, end, frequency) tuples.
+        Returns {spec: items}. Never raises; failures resolve to [].
+        """
+        specs = list(dict.fromkeys(s for s in specs if s[0] and s[0] != "N/A"))
+        if not EVDS_API_KEY:
+            return {s: [] for s in specs}
+
+        results = {}
+        pending = specs
+        batch_size = BATCH_SIZE
+        while pending:
+            waiting = self._claim(pending, batch_size)
+            retry = []
+            wait([f for f, _ in waiting.values()])
+            for spec, (fut, _) in waiting.items():
+                try:
+                    items = fut.result().get(spec[0])
+                except Exception:
+                    items = []
+                if items is None:
+                    # Multi-series batch was rejected; retry this series on its own
+                    retry.append(spec)
+                else:
+                    results[spec] = items
+            for spec in specs:
+                if spec not in results and spec not in waiting and spec not in retry:
+                    results[spec] = get_cached(self._cache_key(spec), RESULT_TTL) or []
+            pending = retry
+            batch_size = 1
+        return results
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _spec(self, code, start_date=None, end_date=None, frequency=None):
+        return (code, start_date or evds_date(60), end_date or evds_date(0), frequency)
+
+    def _cache_key(self, spec):
+        return "evds:" + ":".join(str(p) for p in spec)
+
+    def _claim(self, specs, batch_size):
+        """
+        For each spec: serve from the short-lived cache, join an in-flight
+        request, or group it into a new batch. Returns {spec: (future, code)}
+        for everything that needs waiting on.
+        """
+        waiting = {}
+        new_groups = {}
+        submitted = []
+        with self._lock:
+            for spec in specs:
+                if get_cached(self._cache_key(spec), RESULT_TTL) is not None:
+                    continue
+                fut = self._inflight.get(spec)
+                if fut is not None:
+                    waiting[spec] = (fut, spec[0])
+                    continue
+                new_groups.setdefault(spec[1:], []).append(spec)
+
+            for window, group in new_groups.items():
+                for i in range(0, len(group), batch_size):
+                    chunk = group[i:i + batch_size]
+                    fut = self.pool.submit(self._fetch_batch, [s[0] for s in chunk], *window)
+                    for spec in chunk:
+                        self._inflight[spec] = fut
+                        waiting[spec] = (fut, spec[0])
+                    submitted.append((fut, chunk))
+        # Outside the lock: a callback on an already-finished future runs inline
+        for fut, chunk in submitted:
+            fut.add_done_callback(lambda f, chunk=chunk: self._release(chunk))
+        return waiting
+
+    def _release(self, chunk):
+        with self._lock:
+            for spec in chunk:
+                self._inflight.pop(spec, None)
+
+    def _fetch_batch(self, codes, start_date, end_date, frequency):
+        """
+        One HTTP call for `codes`. Returns {code: items}; a code maps to
+        None when a multi-series request failed and should be retried singly.
+        """
+        url = f"{EVDS_URL}series={'-'.join(codes)}&startDate={start_date}&endDate={end_date}&type=json"
+        if frequency: url += f"&frequency={frequency}"
+        try:
+            r = self.http.get(url, headers={"key": EVDS_API_KEY}, timeout=15)
+            rows = r.json().get("items", []) if r.status_code == 200 else None
+        except Exception:
+            rows = None
+
+        if rows is None:
+            return {c: (None if len(codes) > 1 else []) for c in codes}
+
+        out = {}
+        for code in codes:
+            col = code.replace(".", "_")
+            items = [{"Tarih": row.get("Tarih", ""), col: row.get(col)} for row in rows if row.get(col) is not None]
+            out[code] = items
+            set_cached(self._cache_key((code, start_date, end_date, frequency)), items)
+        return out
+
+
+# Shared instance: every EVDS consumer goes through the same pool and in-flight map
+EVDS = EVDSClient()
+
+
+class EVDSStore:
+    """
+    Local EVDS history. `sync` brings series up to date with the fewest
+    possible rows over the wire; everything else reads SQLite only.
+    """
+    def __init__(self, client=EVDS, min_interval=SYNC_INTERVAL, schedule=None):
+        self.client = client
+        self.min_interval = min_interval
+        self.schedule = schedule  # ReleaseSchedule: monthly prints wait for their release day
+
+    def sync(self, needs, min_interval=None):
+        """
+        needs: list of (series_code, days_back) — how much history the caller
+        wants held locally. Series already covered and pulled within
+        `min_interval` seconds are skipped; the rest go out in one batched,
+        concurrent round. Stale series only re-pull a trailing window.
+        Without an explicit `min_interval`, series with a release rule are
+        held until their next release and polled briskly right after it.
+        """
+        interval = self.min_interval if min_interval is None else min_interval
+        use_schedule = self.schedule is not None and min_interval is None
+        now = time.time()
+        plan = {}
+        for code, days_back in needs:
+            if not code or code == "N/A": continue
+            want_from = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
+            meta = get_evds_sync(code)
+            if meta and meta["covered_from"] and meta["covered_from"] <= want_from:
+                wait = self.schedule.sync_interval(code, meta["last_obs"], interval) if use_schedule else interval
+                if now - (meta["synced_at"] or 0) < wait: continue
+                days = self._incremental_days(code, meta["last_obs"], days_back)
+            else:
+                days = days_back  # Cold (or too shallow): backfill the full window
+            plan[code] = max(plan.get(code, 0), days)
+
+        if not plan: return
+        specs = {code: self.client._spec(code, evds_date(days)) for code, days in plan.items()}
+        fetched = self.client.fetch_specs(list(specs.values()))
+        for code, spec in specs.items():
+            items = fetched.get(spec) or []
+            if not items: continue  # Leave bookkeeping untouched so the next call retries
+            col = code.replace(".", "_")
+            rows = []
+            for item in items:
+                iso = evds_iso(item.get("Tarih"))
+                try: val = float(str(item.get(col)).replace(",", "."))
+                except (TypeError, ValueError): continue
+                if iso: rows.append((iso, item.get("Tarih", ""), val))
+            if rows:
+                upsert_evds_observations(code, rows)
+                start_iso = datetime.strptime(spec[1], "%d-%m-%Y").strftime("%Y-%m-%d")
+                set_evds_sync(code, now, start_iso)
+
+    def last_obs(self, series_code):
+        """ISO date of the latest stored observation, or None."""
+        meta = get_evds_sync(series_code) if series_code else None
+        return meta["last_obs"] if meta else None
+
+    def values(self, series_code):
+        """All stored (label, value) pairs, oldest first."""
+        if not series_code: return []
+        return [(r["label"], r["value"]) for r in get_evds_observations(series_code)]
+
+    def last(self, series_code):
+        """(value, label) of the latest stored observation, or (None, None)."""
+        vals = self.values(series_code)
+        return (vals[-1][1], vals[-1][0]) if vals else (None, None)
+
+    def growth(self, series_code, periods):
+        """
+        % change of the last observation vs `periods` observations earlier
+        (12 = YoY on a monthly index, 4 = YoY on a quarterly one, 1 = MoM).
+        Returns (pct or None, label of last observation).
+        """
+        vals = self.values(series_code)
+        if len(vals) <= periods: return None, (vals[-1][0] if vals else "")
+        base = vals[-1 - periods][1]
+        pct = round(((vals[-1][1] / base) - 1) * 100, 2) if base else None
+        return pct, vals[-1][0]
+
+    def _incremental_days(self, series_code, last_obs, days_back):
+        """Window reaching back to the last stored observation plus ~3 periods for revisions."""
+        if not last_obs: return days_back
+        recent = get_evds_observations(series_code, since=(datetime.strptime(last_obs, "%Y-%m-%d") - timedelta(days=400)).strftime("%Y-%m-%d"))
+        dates = [datetime.strptime(r["obs_date"], "%Y-%m-%d") for r in recent[-4:]]
+        gaps = sorted((b - a).days for a, b in zip(dates, dates[1:]))
+        period = gaps[len(gaps) // 2] if gaps else 30
+        days = (datetime.now() - datetime.strptime(last_obs, "%Y-%m-%d")).days + max(3 * period, 7)
+        for bucket in WINDOW_BUCKETS:
+            if days <= bucket: return bucket
+        return days
+
+
+STORE = EVDSStore(schedule=RELEASES)
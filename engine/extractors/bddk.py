@@ -1,8 +1,7 @@
 
-import requests
 import logging
-from datetime import datetime, timedelta
 from ..config import EVDS_API_KEY
+from ..evds import STORE
 
 class BDDKExtractor:
     """
@@ -51,33 +50,15 @@ class BDDKExtractor:
         # Helper to get last value for a single series
         def get_last_val(series_code):
             try:
-                # Fetch last 120 days to ensure we find a value
-                start_date = (datetime.now() - timedelta(days=120)).strftime("%d-%m-%Y")
-                end_date = datetime.now().strftime("%d-%m-%Y")
-                url = f"https://evds3.tcmb.gov.tr/igmevdsms-dis/series={series_code}&startDate={start_date}&endDate={end_date}&type=json"
-                
-                self.logger.info(f"Fetching EVDS Series: {series_code} | URL: {url}")
-                
-                r = requests.get(url, headers={"key": EVDS_API_KEY}, timeout=10)
-                if r.status_code != 200: 
-                    self.logger.error(f"EVDS HTTP {r.status_code} for {series_code}")
+                # Keep 120 days held locally; only the tail is re-pulled once stored
+                self.logger.info(f"Syncing EVDS Series: {series_code}")
+                STORE.sync([(series_code, 120)])
+                val, label = STORE.last(series_code)
+                if val is None:
+                    self.logger.warning(f"No stored value for {series_code}.")
                     return None, None
-                
-                items = r.json().get("items", [])
-                self.logger.info(f"Items found: {len(items)}")
-                
-                if not items: return None, None
-                
-                # Reverse search for first non-null
-                key = series_code.replace(".", "_")
-                for item in reversed(items):
-                    v = item.get(key)
-                    if v and v != "null":
-                         self.logger.info(f"Found Value for {series_code}: {v}")
-                         return float(v), item.get("Tarih")
-                
-                self.logger.warning(f"No non-null value found for {series_code} in last {len(items)} items.")
-                return None, None
+                self.logger.info(f"Found Value for {series_code}: {val}")
+                return val, label
             except Exception as e:
                 self.logger.error(f"EVDS/get_last_val Error: {e}")
                 return None, None
@@ -1,10 +1,10 @@
 
-import requests
 import pandas as pd
 import logging
 import io
 from bs4 import BeautifulSoup
 from datetime import datetime
+from .. import httpclient as http
 
 class TimExtractor:
     def __init__(self):
@@ -26,7 +26,7 @@ class TimExtractor:
         """
         try:
             # 1. Find the Excel Link
-            r = requests.get(self.base_url, headers=self.headers, timeout=15)
+            r = http.get(self.base_url, headers=self.headers, timeout=15)
             if r.status_code != 200:
                 self.logger.error(f"Failed to load TİM page: {r.status_code}")
                 return None
@@ -53,7 +53,7 @@ class TimExtractor:
             self.logger.info(f"Downloading Excel: {target_link}")
             
             # 2. Download Excel
-            r_file = requests.get(target_link, headers=self.headers, timeout=30)
+            r_file = http.get(target_link, headers=self.headers, timeout=30, max_bytes=20 * 1024 * 1024)
             if r_file.status_code != 200: return None
             
             # 3. Parse Excel
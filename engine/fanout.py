@@ -0,0 +1,144 @@
+"""
+The Fan-Out Executor
+====================
+"Wait for the slowest, not for the sum."
+Runs independent data sources concurrently, each under its own deadline.
+
+    * A source that misses its deadline is filled from its last-known-good
+      value (kept in engine.cache under `<key_prefix>:<name>`).
+    * The late call keeps running in the background; when it lands it
+      becomes the new last-known-good and `on_late(name)` fires so callers
+      can drop assembled caches.
+    * Identical keyed sources share one in-flight call, so a slow upstream
+      is never hit twice by overlapping refreshes.
+    * Nesting: a fan-out started from inside a task (scorecard -> macro panel
+      -> bonds) runs on the next level's executor, so workers waiting on
+      inner work can never starve that work of threads.
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from .cache import set_cached, get_last_good
+
+POOL_WORKERS = 32   # Per nesting level
+_pools = {}         # nesting level -> ThreadPoolExecutor
+_local = threading.local()
+_inflight = {}
+_lock = threading.Lock()
+
+
+def _pool():
+    """Executor for tasks submitted from this thread: one level below the caller's own."""
+    level = getattr(_local, "level", 0) + 1
+    with _lock:
+        pool = _pools.get(level)
+        if pool is None:
+            pool = _pools[level] = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix=f"fanout{level}")
+    return pool, level
+
+
+def _is_not_none(value):
+    return value is not None
+
+
+def fan_out(tasks, deadline=8.0, key_prefix=None, is_good=_is_not_none, on_late=None, unshared=()):
+    """
+    Run `tasks` concurrently.
+
+    Args:
+        tasks (dict): {name: callable} or {name: (callable, deadline_seconds)}.
+        deadline (float): Default per-source budget in seconds.
+        key_prefix (str): Enables last-known-good fallback and in-flight sharing.
+        is_good (callable): Only results passing this become last-known-good.
+        on_late (callable): Called with the source name when a timed-out
+            source finally completes with a good value.
+        unshared (iterable): Task names that run without a key (no fallback,
+            no sharing), for results that depend on per-call arguments.
+
+    Returns:
+        (results, status): results[name] is the value (or fallback / None);
+        status[name] = {"status": "ok"|"stale"|"timeout"|"error", "ms": int}.
+        "stale" means the value shown is the last-known-good one.
+    """
+    start = time.time()
+    futures = {}
+    for name, task in tasks.items():
+        fn, budget = task if isinstance(task, tuple) else (task, deadline)
+        key = f"{key_prefix}:{name}" if key_prefix and name not in unshared else None
+        futures[name] = (_submit(key, fn, is_good), budget, key)
+
+    results, status = {}, {}
+    for name, (fut, budget, key) in futures.items():
+        remaining = max(0.0, start + budget - time.time())
+        try:
+            value, elapsed = fut.result(timeout=remaining)
+            if is_good(value) or not key or get_last_good(key) is None:
+                results[name] = value
+                status[name] = {"status": "ok", "ms": int(elapsed * 1000)}
+                continue
+            state = "empty"  # Arrived in time but carried nothing usable
+        except FutureTimeout:
+            state = "timeout"
+            if on_late:
+                fut.add_done_callback(lambda f, name=name: _notify_late(f, name, is_good, on_late))
+        except Exception as e:
+            print(f"[fanout] {name} failed: {e}")
+            state = "error"
+        fallback = get_last_good(key) if key else None
+        results[name] = fallback
+        status[name] = {"status": "stale" if fallback is not None else state, "ms": int((time.time() - start) * 1000)}
+    return results, status
+
+
+def _submit(key, fn, is_good):
+    pool, level = _pool()
+    if key is None:
+        return pool.submit(_timed, fn, None, is_good, level)
+    with _lock:
+        fut = _inflight.get(key)
+        if fut is not None:
+            return fut
+        fut = pool.submit(_timed, fn, key, is_good, level)
+        _inflight[key] = fut
+    fut.add_done_callback(lambda f: _forget(key))
+    return fut
+
+
+def _timed(fn, key, is_good, level):
+    _local.level = level
+    t0 = time.time()
+    value = fn()
+    if key and is_good(value):
+        set_cached(key, value)
+    return value, time.time() - t0
+
+
+def _forget(key):
+    with _lock:
+        _inflight.pop(key, None)
+
+
+def _notify_late(fut, name, is_good, on_late):
+    try:
+        value, _ = fut.result()
+        if is_good(value):
+            on_late(name)
+    except Exception:
+        pass
+
+
+def run_shared(key, fn, is_good=_is_not_none, deadline=None, on_late=None):
+    """
+    Call `fn` once for every concurrent caller of `key` and return its value.
+    A good result also becomes the key's last-known-good. With a `deadline`
+    (seconds), a call still running by then returns the last-known-good
+    value (or None) instead, and `on_late(key)` fires when it lands.
+    """
+    fut = _submit(key, fn, is_good)
+    try:
+        value, _ = fut.result(timeout=deadline)
+    except FutureTimeout:
+        if on_late:
+            fut.add_done_callback(lambda f: _notify_late(f, key, is_good, on_late))
+        return get_last_good(key)
+    return value
@@ -4,10 +4,102 @@ The Second-Order Map (Graph Engine)
 "The Market Graph"
 Maps causal relationships between assets (e.g. Oil -> Airlines).
 Checks if correlated assets are moving in sync or diverging.
+
+A chain is computed in one batch:
+    * Daily closes for the trigger and every linked symbol come from the
+      local store (price_history). Symbols whose rolling window is short or
+      stale are topped up in one multi-ticker download.
+    * Aligned daily returns give the measured correlation and realized beta
+      of each link to the trigger in one vectorized pass. Live z-scores
+      come from a single batch z_scores call over the links' windows.
+    * Correlation and beta are cached per trigger until a new bar lands;
+      only the live z-scores are recomputed on every call.
 """
+import time
+import threading
+import numpy as np
+import pandas as pd
 from .alerts import SigmaScanner
+from .analytics import z_scores
+from .db import get_price_history_rows
+from .rolling import ROLLING, MIN_BARS, closed_bars
 
 SCANNER = SigmaScanner()
+LOOKBACK_DAYS = 100   # Calendar days of closes behind correlation / beta (~3 months of bars)
+
+_stats_lock = threading.Lock()
+_stats_cache = {}  # trigger symbol -> (newest bar time, {symbol: (corr, beta, obs)}, symbols covered)
+
+
+def _is_market(entity):
+    return entity.get("source") == "market" and bool(entity.get("technical_key"))
+
+
+def _symbol(entity):
+    return entity["technical_key"] if _is_market(entity) else entity["key"]
+
+
+def _top_up(symbols, stats=ROLLING):
+    """One batched download for the symbols whose windows need bars."""
+    need = [s for s in symbols if stats.needs_bars(s)]
+    if not need: return
+    from .market import fetch_daily_bars
+    try:
+        for sym, bars in fetch_daily_bars(need, period="3mo").items():
+            stats.add_bars(sym, closed_bars(bars))
+    except Exception as e:
+        print(f"[graph] Bar top-up failed: {e}")
+
+
+def link_stats(trigger, symbols, rows):
+    """
+    Correlation and beta of each symbol's daily returns to the trigger's,
+    on the dates they share. rows: (symbol, time, close).
+    Returns {symbol: (corr, beta, observations)}.
+    """
+    if not rows: return {}
+    df = pd.DataFrame(rows, columns=["symbol", "time", "close"])
+    df["date"] = pd.to_datetime(df["time"], unit="s")  # UTC midnight of the session's date (rolling.day_epoch)
+    closes = df.pivot_table(index="date", columns="symbol", values="close", aggfunc="last")
+    if trigger not in closes: return {}
+    rets = closes.pct_change(fill_method=None)
+    cols = [s for s in symbols if s in rets]
+    t = rets[trigger].to_numpy()[:, None]
+    r = rets[cols].to_numpy()
+    ok = ~np.isnan(r) & ~np.isnan(t)
+    n = ok.sum(axis=0)
+    tt = np.where(ok, t, 0.0)
+    rr = np.where(ok, r, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mt = tt.sum(axis=0) / n
+        mr = rr.sum(axis=0) / n
+        dt = np.where(ok, tt - mt, 0.0)
+        dr = np.where(ok, rr - mr, 0.0)
+        cov = (dt * dr).sum(axis=0)
+        var_t = (dt * dt).sum(axis=0)
+        var_r = (dr * dr).sum(axis=0)
+        corr = cov / np.sqrt(var_t * var_r)
+        beta = cov / var_t
+    out = {}
+    for i, sym in enumerate(cols):
+        if n[i] >= MIN_BARS and np.isfinite(corr[i]):
+            out[sym] = (round(float(corr[i]), 2), round(float(beta[i]), 2), int(n[i]))
+    return out
+
+
+def _cached_link_stats(trigger, symbols, now=None):
+    now = now or time.time()
+    rows = get_price_history_rows([trigger] + symbols, since=now - LOOKBACK_DAYS * 86400)
+    newest = max((r[1] for r in rows), default=None)
+    with _stats_lock:
+        hit = _stats_cache.get(trigger)
+        if hit and hit[0] == newest and set(symbols) <= set(hit[2]):
+            return hit[1]
+    stats = link_stats(trigger, symbols, rows)
+    with _stats_lock:
+        _stats_cache[trigger] = (newest, stats, list(symbols))
+    return stats
+
 
 def get_impact_chain(trigger_key):
     """
@@ -16,58 +108,59 @@ def get_impact_chain(trigger_key):
         trigger_key: The entity being viewed (e.g. 'oil_brent').
     Returns:
         List of dicts: [
-            {"symbol": "THYAO.IS", "correlation": "Linked", "z_score": -1.5, "status": "Clean"}
+            {"key": "THYAO.IS", "correlation": 0.62, "beta": 1.1, "z_score": -1.5, ...}
         ]
     """
-    from .resolver import get_current_level
     from .registry import resolve_entity
+    from .resolver import get_current_level
     entity = resolve_entity(trigger_key)
     if not entity or "correlations" not in entity:
         return []
-        
-    chain = []
-    
+
+    links = []
     for linked_key in entity["correlations"]:
-        # Resolve linked entity
-        # Note: correlated keys in registry might be tickers (THYAO.IS) or logic keys (@thyao)
-        # We try resolve_entity first.
-        linked_ent = resolve_entity(linked_key) 
-        
-        # If not found via resolve_entity (maybe it's a raw ticker not in registry?),
-        # fallback to using it as a raw key for market fetch.
-        if not linked_ent:
-            # Create a dummy entity wrapper for raw tickers
-            linked_ent = {"key": linked_key, "technical_key": linked_key, "source": "market", "name": linked_key}
-            
-        # Get live data
-        val, _, chg = get_current_level(linked_ent["key"], linked_ent)
-        
-        if val is None:
+        # Correlated keys might be tickers (THYAO.IS) or registry keys; raw
+        # tickers outside the registry get a dummy market entity.
+        linked_ent = resolve_entity(linked_key) or \
+            {"key": linked_key, "technical_key": linked_key, "source": "market", "name": linked_key}
+        links.append((linked_ent, _symbol(linked_ent)))
+
+    trigger = _symbol(entity)
+    symbols = [sym for _, sym in links]
+    _top_up([_symbol(e) for e in [entity] + [e for e, _ in links] if _is_market(e)], SCANNER.stats)
+    stats = _cached_link_stats(trigger, symbols)
+
+    # Live z-scores for every link in one call
+    levels = [get_current_level(e["key"], e) for e, _ in links]
+    live = np.array([v if isinstance(v, (int, float)) else np.nan for v, _, _ in levels], dtype=float)
+    width = SCANNER.stats.size
+    hist = np.full((len(symbols), width), np.nan)
+    for i, sym in enumerate(symbols):
+        vals = SCANNER.stats.window(sym).values
+        if len(vals) >= MIN_BARS: hist[i, width - len(vals):] = list(vals)
+    zs = z_scores(live, hist)
+
+    chain = []
+    for i, (linked_ent, sym) in enumerate(links):
+        val, _, chg = levels[i]
+        corr, beta, obs = stats.get(sym, (None, None, 0))
+        if np.isnan(live[i]):
             # Still append to show the link exists, but mark as N/A
-            chain.append({
-                "key": linked_ent.get("key"),
-                "name": linked_ent.get("name"),
-                "price": "N/A",
-                "change_pct": 0,
-                "z_score": 0.0,
-                "status": "No Data"
-            })
+            chain.append({"key": linked_ent.get("key"), "name": linked_ent.get("name"), "price": "N/A",
+                          "change_pct": 0, "z_score": 0.0, "correlation": corr, "beta": beta,
+                          "observations": obs, "status": "No Data"})
             continue
-
-        # Check Z-Score for the linked asset to see if it's reacting
-        # We need history for Z-Score. 
-        # Using SCANNER.check_anomaly which fetches history internally.
-        alert = SCANNER.check_anomaly(linked_ent["key"], val)
-        
-        z = alert["z_score"] if alert else 0.0
-        
+        z = float(zs[i])
+        alert = SCANNER.classify(z)
         chain.append({
             "key": linked_ent.get("key"),
             "name": linked_ent.get("name"),
             "price": val,
             "change_pct": chg,
-            "z_score": z,
+            "z_score": round(z, 2) if alert else 0.0,
+            "correlation": corr,
+            "beta": beta,
+            "observations": obs,
             "alert": alert # Full alert dict if exists
         })
-        
     return chain
@@ -0,0 +1,102 @@
+"""
+The HTTP Layer
+==============
+"Keep the line open."
+One pooled session for every outbound fetcher (macro, EVDS, scraper,
+research, extractors) instead of bare requests.get/post calls.
+
+    * Per-host keep-alive pools: repeat calls to evds3.tcmb.gov.tr,
+      tradingeconomics.com or api.groq.com reuse an open TCP+TLS connection.
+    * Sane defaults: (connect, read) timeouts when the caller gives none.
+    * Retries: idempotent requests retry on connect errors / 429 / 5xx
+      with jittered exponential backoff. POSTs are never retried.
+    * Size limits: bodies are streamed and cut off at `max_bytes`.
+
+Every call is counted in engine.metrics; `connection_stats()` reports how
+often connections were reused, per host.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .metrics import count_upstream
+
+DEFAULT_TIMEOUT = (4, 10)          # (connect, read) seconds
+MAX_BYTES = 5 * 1024 * 1024        # 5 MB is plenty for any page/JSON we parse
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+
+
+class ResponseTooLarge(requests.RequestException):
+    """Raised when a body exceeds the caller's max_bytes."""
+
+
+def _build_session():
+    retry = Retry(
+        total=2, connect=2, read=1, status=2,
+        backoff_factor=0.3, backoff_jitter=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+SESSION = _build_session()
+
+
+def get(url, headers=None, params=None, timeout=None, max_bytes=MAX_BYTES, **kwargs):
+    """Pooled GET. Same return type as requests.get."""
+    return request("GET", url, headers=headers, params=params, timeout=timeout, max_bytes=max_bytes, **kwargs)
+
+
+def post(url, headers=None, json=None, data=None, timeout=None, max_bytes=MAX_BYTES, **kwargs):
+    """Pooled POST (not retried)."""
+    return request("POST", url, headers=headers, json=json, data=data, timeout=timeout, max_bytes=max_bytes, **kwargs)
+
+
+def request(method, url, timeout=None, max_bytes=MAX_BYTES, **kwargs):
+    count_upstream(url)
+    resp = SESSION.request(method, url, timeout=timeout or DEFAULT_TIMEOUT, stream=True, **kwargs)
+    try:
+        declared = int(resp.headers.get("Content-Length") or 0)
+        if max_bytes and declared > max_bytes:
+            raise ResponseTooLarge(f"{url}: {declared} bytes > limit {max_bytes}")
+        body = bytearray()
+        for chunk in resp.iter_content(64 * 1024):
+            body.extend(chunk)
+            if max_bytes and len(body) > max_bytes:
+                raise ResponseTooLarge(f"{url}: body exceeds limit {max_bytes}")
+        resp._content = bytes(body)
+        resp._content_consumed = True
+    except Exception:
+        resp.close()
+        raise
+    return resp
+
+
+def connection_stats():
+    """
+    Per-host connection reuse: requests sent vs. new connections opened.
+    reuse_rate = share of requests served on an already-open connection.
+    """
+    hosts = {}
+    for adapter in {id(a): a for a in SESSION.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None: continue
+            entry = hosts.setdefault(pool.host, [0, 0])
+            entry[0] += pool.num_requests
+            entry[1] += pool.num_connections
+    out = {}
+    for host, (reqs, conns) in sorted(hosts.items()):
+        out[host] = {
+            "requests": reqs,
+            "connections": conns,
+            "reuse_rate": round(1 - conns / reqs, 3) if reqs else None,
+        }
+    return out
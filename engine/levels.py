@@ -0,0 +1,162 @@
+"""
+The Level Store
+===============
+"One number per name, already on the shelf."
+Live level of every registry entity (and every raw market ticker), keyed by
+entity key: {"value", "unit", "change_pct", "ts", "source"}.
+
+    * Populated, not polled: the store subscribes to set_cached, so whenever
+      a fetcher stores one of its feeds ("market", "macro", "bonds",
+      "turkey_macro", ...) the levels it carries are extracted once and
+      written here.
+    * Reads are dict lookups. Nothing in this module fetches; callers that
+      need a cold feed filled first use resolver.warm_levels.
+    * An entity fed by several sources keeps the value from the first feed
+      in SOURCE_FEEDS order (e.g. the policy-rate table beats turkey_macro),
+      but only while that value is numeric and younger than PRIORITY_SECONDS.
+      An "N/A" or a stale reading from a better feed never blocks a real
+      value from a lower one.
+"""
+import time
+import threading
+from .cache import subscribe
+from .registry import DATA_REGISTRY
+
+# Registry source -> feeds (cache keys) carrying its levels, in priority order
+SOURCE_FEEDS = {
+    "market": ["market"],
+    "macro": ["macro", "bonds", "turkey_macro"],
+    "EVDS+CALC": ["turkey_macro"],
+    "equity_risk": ["erp", "bonds"],
+    "cbrt": ["cbrt_tracker"],
+    "gold_corr": ["gold_corr"],
+    "scorecard": ["scorecard"],
+    "banking": ["banking_monitor"],
+    "sentiment": ["sentiment"],
+    "trade": ["trade"],
+}
+PRIORITY_SECONDS = 1800   # A higher-priority feed's value holds its entity this long without a refresh
+NO_VALUE_RANK = 99        # Rank of non-numeric placeholders ("N/A"): any real value replaces them
+BPS_KEYS = ("spread", "tr_yield_curve", "risk_premium")  # Bond-table keys quoted in % but shown in bps
+# Registry technical_key -> turkey_macro row key, where the two disagree
+TURKEY_MACRO_ALIASES = {"cpi_yoy": "cpi", "ppi_yoy": "ppi", "food_cpi": "food_inflation"}
+
+
+def _extract(feed, key, entity, data):
+    """(value, unit, change_pct) for one entity from one feed's payload, or None."""
+    tech = entity.get("technical_key")
+    source = entity.get("source")
+    unit = entity.get("unit")
+
+    if feed == "market":
+        m = data.get(tech)
+        return (m.get("price"), unit, m.get("change_pct")) if m else None
+    if feed == "macro":
+        rates = data.get("policy_rates") or {}
+        if tech in rates: return rates[tech], "%", None
+        if tech == "cds" and data.get("cds"): return data["cds"].get("val"), "bps", None
+        return None
+    if feed == "bonds":
+        if tech not in data: return None
+        val = data[tech]
+        if source == "macro" and tech in BPS_KEYS:
+            return (val * 100 if isinstance(val, (int, float)) else val), "bps", None
+        return val, "%", None
+    if feed == "turkey_macro":
+        names = {key, tech, TURKEY_MACRO_ALIASES.get(tech)} - {None}
+        for item in data:
+            if item.get("key") in names:
+                return item.get("last"), item.get("unit"), None
+        return None
+    if feed == "erp":
+        return (data[tech], unit or "%", None) if tech in data else None
+    if feed == "cbrt_tracker":
+        if tech in ("aofm", "policy_rate"): return data.get("current_rate"), "%", None
+        if tech == "next_meeting": return data.get("next_meeting"), "", None
+        return None
+    if feed == "gold_corr":
+        return (data.get("corr_usd"), "", None) if tech in ("gold_corr", "composite") else None
+    if feed == "scorecard":
+        return (data.get("composite"), "pts", None) if tech == "composite" else None
+    if feed == "banking_monitor":
+        return (data[tech], unit, None) if tech in data else None
+    if feed == "sentiment":
+        # Registry says "panic"/"greed", the trends extractor says "panic_score"
+        mapped = tech if tech.endswith("_score") else f"{tech}_score"
+        for k in (mapped, tech):
+            if k in data: return data[k], unit, None
+        return None
+    if feed == "trade":
+        return (data.get("total_exports"), unit, None) if tech == "total_exports" else None
+    return None
+
+
+def _is_number(v):
+    if isinstance(v, bool): return False
+    if isinstance(v, (int, float)): return v == v  # NaN is not a level
+    try:
+        float(str(v).replace(",", ".").replace("%", "").strip())
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+class LevelStore:
+    def __init__(self, registry=None):
+        self._lock = threading.Lock()
+        self._levels = {}
+        self._by_feed = {}  # feed -> [(entity key, entity, rank)]
+        for key, entity in (registry if registry is not None else DATA_REGISTRY).items():
+            for rank, feed in enumerate(SOURCE_FEEDS.get(entity.get("source"), [])):
+                self._by_feed.setdefault(feed, []).append((key, entity, rank))
+
+    def publish(self, feed, data):
+        """Extract and store every level carried by `feed`'s payload."""
+        entries = self._by_feed.get(feed)
+        if not entries or not data: return
+        now = time.time()
+        found = {}
+        for key, entity, rank in entries:
+            try:
+                level = _extract(feed, key, entity, data)
+            except (AttributeError, TypeError, KeyError):
+                level = None
+            if level and level[0] is not None:
+                found[key] = (level, rank)
+        if feed == "market" and isinstance(data, dict):
+            # Raw tickers (graph links, search hits outside the registry)
+            for sym, m in data.items():
+                if isinstance(m, dict) and m.get("price") is not None and sym not in found:
+                    found[sym] = ((m["price"], "", m.get("change_pct")), 0)
+        with self._lock:
+            for key, ((val, unit, chg), rank) in found.items():
+                if not _is_number(val): rank = NO_VALUE_RANK
+                old = self._levels.get(key)
+                if old and old["rank"] < rank and now - old["ts"] < PRIORITY_SECONDS:
+                    continue  # A higher-priority feed holds a fresh value for this entity
+                self._levels[key] = {"value": val, "unit": unit, "change_pct": chg,
+                                     "ts": now, "source": feed, "rank": rank}
+
+    def get(self, key):
+        """Full record for `key` (value, unit, change_pct, ts, source) or None."""
+        with self._lock:
+            rec = self._levels.get(key)
+        return {k: v for k, v in rec.items() if k != "rank"} if rec else None
+
+    def level(self, key):
+        """(value, unit, change_pct) for `key`, or (None, None, None)."""
+        with self._lock:
+            rec = self._levels.get(key)
+        return (rec["value"], rec["unit"], rec["change_pct"]) if rec else (None, None, None)
+
+    def has(self, key):
+        with self._lock:
+            return key in self._levels
+
+    def _on_cache_set(self, key, data):
+        if key in self._by_feed or key == "market":
+            self.publish(key, data)
+
+
+LEVELS = LevelStore()
+subscribe(LEVELS._on_cache_set)
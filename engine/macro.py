@@ -1,11 +1,21 @@
-import requests
 import pandas as pd
 import re
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
-from .config import CONFIG, EVDS_API_KEY, FRED_API_KEY
-from .cache import get_cached, set_cached
+from .config import CONFIG, FRED_API_KEY
+from .cache import get_cached, set_cached, invalidate
+from .fanout import fan_out, run_shared
+from . import httpclient as http
+from . import pages
+from .evds import STORE
+from .releases import RELEASES
+from .econ_calendar import CALENDAR
 from .extractors.bddk import BDDKExtractor
+from .db import get_evds_observations, replace_cbrt_decisions, get_cbrt_decisions, get_cursor, set_cursor
+
+_UA = {"User-Agent": "Mozilla/5.0"}
+BONDS_DEADLINE = 10     # Seconds a caller waits on the shared bond round before serving its last-known-good
+CBRT_REVISION_DAYS = 30  # Trailing days of policy-rate decisions re-derived each run (EVDS re-pulls revisions)
 
 def fetch_banking_monitor():
     """Fetches weekly banking data (Loans, Deposits, NPL) via BDDK Extractor."""
@@ -28,59 +38,76 @@ def fetch_macro_data():
     cached = get_cached("macro", ttl_seconds=120)
     if cached is not None: return cached
     codes = CONFIG.get("macro_panel", {})
-    aofm_val = _evds_last_value(codes.get("aofm", "TP.APIFON4"))
-    comm_loan = _evds_last_value(codes.get("commercial_loan_rate", "TP.KTF17"))
-    deposit = _evds_last_value(codes.get("deposit_rate_tl", "TP.TRY.MT06"))
-    bonds = _fetch_bond_yields()
-    cds = _fetch_cds(bonds)
+
+    # Independent sources fan out; each gets its own budget and falls back
+    # to its last-known-good value instead of holding the panel hostage.
+    parts, status = fan_out({
+        "policy_rates": (lambda: _fetch_policy_rates(codes), 10),
+        "bonds": (fetch_bond_yields, 10),
+        "cds": (_fetch_cds, 10),
+    }, key_prefix="macro_src", is_good=_has_values, on_late=lambda name: invalidate("macro"))
 
     result = {
-        "policy_rates": {
-            "aofm": aofm_val, "aofm_source": "EVDS",
-            "comm_loan": comm_loan, "comm_loan_source": "EVDS",
-            "deposit": deposit, "deposit_source": "EVDS",
-        },
-        "bonds": bonds,
-        "cds": cds,
+        "policy_rates": parts["policy_rates"] or _empty_policy_rates(),
+        "bonds": parts["bonds"] or _empty_bonds(),
+        "cds": parts["cds"] or {"val": "N/A", "source": "N/A", "label": "CDS 5Y"},
+        "_sources": status,
     }
     set_cached("macro", result)
     return result
 
-def _fetch_cds(bonds=None):
+def _fetch_policy_rates(codes):
+    STORE.sync([(codes.get(k), 60) for k in ("aofm", "commercial_loan_rate", "deposit_rate_tl")])
+    return {
+        "aofm": _evds_last_value(codes.get("aofm", "TP.APIFON4")), "aofm_source": "EVDS",
+        "comm_loan": _evds_last_value(codes.get("commercial_loan_rate", "TP.KTF17")), "comm_loan_source": "EVDS",
+        "deposit": _evds_last_value(codes.get("deposit_rate_tl", "TP.TRY.MT06")), "deposit_source": "EVDS",
+    }
+
+def _empty_policy_rates():
+    return {"aofm": "N/A", "aofm_source": "N/A", "comm_loan": "N/A", "comm_loan_source": "N/A", "deposit": "N/A", "deposit_source": "N/A"}
+
+def _has_values(part):
+    """True if a source returned at least one real number (labels/sources don't count)."""
+    if not isinstance(part, dict): return False
+    return any(v not in ("N/A", None, "") for k, v in part.items() if not k.endswith("source") and k != "label")
+
+def _fetch_cds():
     """Fetch Turkey 5Y CDS with multi-stage fallback (WorldGov -> TE -> Synthetic)."""
     res = {"val": "N/A", "source": "N/A", "label": "CDS 5Y"}
     
     # 1. Try WorldGovernmentBonds (Dynamic fallback search)
     try:
-        r = requests.get("https://www.worldgovernmentbonds.com/country/turkey/", headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-        if r.status_code == 200:
-            # Look for 2xx.xx patterns near CDS keywords
-            text = r.text
-            match = re.search(r"CDS 5 years.*?(\d{3}\.\d{2})", text, re.I | re.S)
-            if match:
-                res.update({"val": float(match.group(1)), "source": "SCRAPE:worldgov"})
-                return res
+        val = pages.extract("https://www.worldgovernmentbonds.com/country/turkey/", _parse_worldgov_cds, headers=_UA)
+        if val is not None:
+            res.update({"val": val, "source": "SCRAPE:worldgov"})
+            return res
     except Exception: pass
 
     # 2. Try TradingEconomics 
     try:
-        r = requests.get("https://tradingeconomics.com/turkey/cds", headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-        if r.status_code == 200:
-            soup = BeautifulSoup(r.text, "lxml")
-            val = soup.select_one("#last")
-            if val and val.text.strip():
-                res.update({"val": float(val.text.strip()), "source": "SCRAPE:tradingeconomics"})
-                return res
+        val = pages.extract("https://tradingeconomics.com/turkey/cds", _parse_te_last, headers=_UA)
+        if val not in (None, "N/A"):
+            res.update({"val": val, "source": "SCRAPE:tradingeconomics"})
+            return res
     except Exception: pass
 
     # 3. Fallback: N/A (We avoid misleading synthetic numbers for highly sensitive CDS data)
     return res
 
+def _parse_worldgov_cds(text):
+    # Look for 2xx.xx patterns near CDS keywords
+    match = re.search(r"CDS 5 years.*?(\d{3}\.\d{2})", text, re.I | re.S)
+    return float(match.group(1)) if match else None
+
 def fetch_turkey_macro():
-    cached = get_cached("turkey_macro", ttl_seconds=600)
-    if cached is not None: return cached
     codes = CONFIG.get("turkey_macro", {})
+    # Right after a scheduled release, refresh every minute until the new print lands
+    ttl = RELEASES.poll_seconds if RELEASES.in_window(codes.values(), STORE.last_obs) else 600
+    cached = get_cached("turkey_macro", ttl_seconds=ttl)
+    if cached is not None: return cached
     result = []
+    _prefetch_turkey_macro(codes)
     
     # helper for repetitive EVDS YoY/MoM appends
     def _add_evds_metric(name, series_key, key_slug, unit="%"):
@@ -170,6 +197,23 @@ def fetch_turkey_macro():
     set_cached("turkey_macro", result)
     return result
 
+def _prefetch_turkey_macro(codes):
+    """
+    Bring every series the panel reads up to date in the local EVDS store in
+    one concurrent round of batched requests, so the helpers below read
+    SQLite instead of issuing ~15 sequential calls.
+    """
+    panel = CONFIG.get("macro_panel", {})
+    STORE.sync(
+        [(codes.get(k), 14*35) for k in ("cpi_index", "core_cpi_index", "ppi_index", "food_cpi_index")]
+        + [(panel.get(k), 120) for k in ("aofm", "deposit_rate_tl", "commercial_loan_rate")]
+        + [(codes.get(k), 120) for k in ("unemployment", "current_account", "m2", "total_credit",
+                                         "business_confidence", "consumer_confidence")]
+        + [(BDDKExtractor.SERIES_MAPPING["loans"], 120),
+           (codes.get("fx_reserves"), 60),
+           (codes.get("gdp_volume"), 800)]
+    )
+
 def fetch_sentiment_dashboard():
     """Fetch Panic/Greed indices from Google Trends (Cached 1h)."""
     cached = get_cached("sentiment", ttl_seconds=3600)
@@ -209,100 +253,102 @@ def fetch_equity_risk():
     set_cached("erp", res)
     return res
 
-def _evds_fetch(series_code, start_date=None, end_date=None, frequency=None):
-    if not EVDS_API_KEY or not series_code or series_code == "N/A": return []
-    if start_date is None: start_date = (datetime.now() - timedelta(days=60)).strftime("%d-%m-%Y")
-    if end_date is None: end_date = datetime.now().strftime("%d-%m-%Y")
-    url = f"https://evds3.tcmb.gov.tr/igmevdsms-dis/series={series_code}&startDate={start_date}&endDate={end_date}&type=json"
-    if frequency: url += f"&frequency={frequency}"
-    try:
-        r = requests.get(url, headers={"key": EVDS_API_KEY}, timeout=15)
-        return r.json().get("items", []) if r.status_code == 200 else []
-    except Exception: return []
-
 def _evds_last_value(series_code, start_days_back=60):
-    start = (datetime.now() - timedelta(days=start_days_back)).strftime("%d-%m-%Y")
-    items = _evds_fetch(series_code, start)
-    if not items: return "N/A"
-    col = series_code.replace(".", "_")
-    for item in reversed(items):
-        if item.get(col) is not None: return item.get(col)
-    return "N/A"
+    if not series_code: return "N/A"
+    STORE.sync([(series_code, start_days_back)])
+    val, _ = STORE.last(series_code)
+    return val if val is not None else "N/A"
 
 def _evds_yoy_from_index(series_code, months_back=14):
     if not series_code: return "N/A", "N/A", ""
-    items = _evds_fetch(series_code, (datetime.now() - timedelta(days=months_back*35)).strftime("%d-%m-%Y"))
-    if not items: return "N/A", "N/A", ""
-    col = series_code.replace(".", "_"); vals = []
-    for item in items:
-        v = item.get(col)
-        if v is not None:
-            try: vals.append((item.get("Tarih", ""), float(str(v).replace(",", "."))))
-            except ValueError: pass
-    if len(vals) < 2: return "N/A", "N/A", ""
-    last_val = vals[-1][1]; prev_val = vals[-2][1]
-    mom = round(((last_val / prev_val) - 1) * 100, 2) if prev_val else "N/A"
-    yoy = round(((last_val / vals[-13][1]) - 1) * 100, 2) if len(vals) >= 13 and vals[-13][1] else "N/A"
-    return yoy, mom, vals[-1][0]
+    STORE.sync([(series_code, months_back*35)])
+    yoy, date = STORE.growth(series_code, 12)
+    mom, _ = STORE.growth(series_code, 1)
+    if mom is None and yoy is None: return "N/A", "N/A", ""
+    return ("N/A" if yoy is None else yoy), ("N/A" if mom is None else mom), date
+
+def fetch_bond_yields():
+    """
+    Bond yields as a first-class source (own TTL). The macro panel, ERP,
+    scorecard and resolver all read this, so one refresh serves them all;
+    concurrent cold callers share a single upstream round. A round that
+    outlives BONDS_DEADLINE serves the last-known-good yields and drops the
+    cache once it lands.
+    """
+    cached = get_cached("bonds", ttl_seconds=300)
+    if cached is not None: return cached
+    res = run_shared("src:bonds", _fetch_bond_yields, is_good=_has_values,
+                     deadline=BONDS_DEADLINE, on_late=lambda _: invalidate("bonds"))
+    if res is None: return _empty_bonds()
+    if _has_values(res): set_cached("bonds", res)
+    return res
+
+def _empty_bonds():
+    return {"tr_2y": "N/A", "tr_10y": "N/A", "us_10y": "N/A", "spread": "N/A", "fed_funds": "N/A", "us_cpi": "N/A", "tr_yield_curve": "N/A"}
+
+def _fred_observations(series_id, limit=1):
+    url = f"https://api.stlouisfed.org/fred/series/observations?series_id={series_id}&api_key={FRED_API_KEY}&file_type=json&sort_order=desc&limit={limit}"
+    r = http.get(url, timeout=5)
+    return r.json().get("observations", [])
+
+def _fred_latest(series_id):
+    obs = _fred_observations(series_id)
+    if obs and obs[0]["value"] != ".": return float(obs[0]["value"])
+    return "N/A"
+
+def _fred_cpi_yoy():
+    obs = _fred_observations("CPIAUCSL", limit=13)
+    if len(obs) >= 13:
+        curr = float(obs[0]["value"])
+        prev = float(obs[12]["value"])
+        return round(((curr - prev) / prev) * 100, 2)
+    return "N/A"
+
+def _te_last(path):
+    """Headline (#last) value of a TradingEconomics indicator page, or 'N/A'."""
+    val = pages.extract(f"https://tradingeconomics.com/{path}", _parse_te_last, headers=_UA, timeout=8)
+    return "N/A" if val is None else val
+
+def _parse_te_last(text):
+    val = BeautifulSoup(text, "lxml").select_one("#last")
+    try: return float(val.text.strip()) if val else "N/A"
+    except ValueError: return "N/A"
+
+def _te_tr_curve():
+    """TR 2Y / 10Y benchmark yields from the TradingEconomics bond table."""
+    return pages.extract("https://tradingeconomics.com/turkey/government-bond-yield", _parse_te_tr_curve, headers=_UA, timeout=8) or {}
+
+def _parse_te_tr_curve(text):
+    out = {}
+    for row in BeautifulSoup(text, "lxml").select("table tr"):
+        cells = row.find_all("td")
+        if len(cells) >= 2:
+            name = cells[0].text.lower(); val = cells[1].text
+            try: v = float(val)
+            except ValueError: continue
+            if "10y" in name or "10 year" in name: out["tr_10y"] = v
+            elif "2y" in name or "2 year" in name: out["tr_2y"] = v
+    return out
 
 def _fetch_bond_yields():
-    res = {"tr_2y": "N/A", "tr_10y": "N/A", "us_10y": "N/A", "spread": "N/A", "fed_funds": "N/A", "us_cpi": "N/A"}
-    if FRED_API_KEY:
-        try:
-            # US 10Y
-            url = f"https://api.stlouisfed.org/fred/series/observations?series_id=DGS10&api_key={FRED_API_KEY}&file_type=json&sort_order=desc&limit=1"
-            r = requests.get(url, timeout=5)
-            obs = r.json().get("observations", [])
-            if obs and obs[0]["value"] != ".": res["us_10y"] = float(obs[0]["value"])
-
-            # Fed Funds
-            url = f"https://api.stlouisfed.org/fred/series/observations?series_id=FEDFUNDS&api_key={FRED_API_KEY}&file_type=json&sort_order=desc&limit=1"
-            r = requests.get(url, timeout=5)
-            obs = r.json().get("observations", [])
-            if obs and obs[0]["value"] != ".": res["fed_funds"] = float(obs[0]["value"])
-
-            # US CPI YoY
-            url = f"https://api.stlouisfed.org/fred/series/observations?series_id=CPIAUCSL&api_key={FRED_API_KEY}&file_type=json&sort_order=desc&limit=13"
-            r = requests.get(url, timeout=5)
-            obs = r.json().get("observations", [])
-            if len(obs) >= 13:
-                curr = float(obs[0]["value"])
-                prev = float(obs[12]["value"])
-                res["us_cpi"] = round(((curr - prev) / prev) * 100, 2)
-        except Exception: pass
-
-    # Scraper Fallback
-    try:
-        # TradingEconomics for TR Bonds
-        r = requests.get("https://tradingeconomics.com/turkey/government-bond-yield", headers={"User-Agent": "Mozilla/5.0"}, timeout=8)
-        if r.status_code == 200:
-            soup = BeautifulSoup(r.text, "lxml")
-            for row in soup.select("table tr"):
-                cells = row.find_all("td")
-                if len(cells) >= 2:
-                    name = cells[0].text.lower(); val = cells[1].text
-                    try: v = float(val)
-                    except ValueError: continue
-                    if "10y" in name or "10 year" in name: res["tr_10y"] = v
-                    elif "2y" in name or "2 year" in name: res["tr_2y"] = v
-        
-        # TradingEconomics for US Rates (if FRED failed)
-        if res["fed_funds"] == "N/A":
-            r = requests.get("https://tradingeconomics.com/united-states/interest-rate", headers={"User-Agent": "Mozilla/5.0"}, timeout=8)
-            if r.status_code == 200:
-                soup = BeautifulSoup(r.text, "lxml")
-                val = soup.select_one("#last")
-                if val: res["fed_funds"] = float(val.text.strip())
-
-        # TradingEconomics for US CPI (if FRED failed)
-        if res["us_cpi"] == "N/A":
-            r = requests.get("https://tradingeconomics.com/united-states/inflation-cpi", headers={"User-Agent": "Mozilla/5.0"}, timeout=8)
-            if r.status_code == 200:
-                soup = BeautifulSoup(r.text, "lxml")
-                val = soup.select_one("#last")
-                if val: res["us_cpi"] = float(val.text.strip())
+    res = _empty_bonds()
 
-    except Exception: pass
+    # FRED series and the TR curve scrape are independent: fetch together
+    tasks = {"tr_curve": _te_tr_curve}
+    if FRED_API_KEY:
+        tasks.update({"us_10y": lambda: _fred_latest("DGS10"), "fed_funds": lambda: _fred_latest("FEDFUNDS"), "us_cpi": _fred_cpi_yoy})
+    parts, _ = fan_out(tasks, deadline=8)
+    res.update(parts.get("tr_curve") or {})
+    for k in ("us_10y", "fed_funds", "us_cpi"):
+        if parts.get(k) is not None: res[k] = parts[k]
+
+    # TradingEconomics fallbacks for whatever FRED could not provide (also in parallel)
+    fallbacks = {k: (lambda path=path: _te_last(path)) for k, path in
+                 (("fed_funds", "united-states/interest-rate"), ("us_cpi", "united-states/inflation-cpi")) if res[k] == "N/A"}
+    if fallbacks:
+        parts, _ = fan_out(fallbacks, deadline=8)
+        for k, v in parts.items():
+            if v is not None: res[k] = v
 
     if res["tr_10y"] != "N/A" and res["us_10y"] != "N/A":
         res["spread"] = round(float(res["tr_10y"]) - float(res["us_10y"]), 2)
@@ -314,108 +360,112 @@ def _fetch_bond_yields():
     return res
 
 def _calc_gdp_yoy(series_code):
-    items = _evds_fetch(series_code, (datetime.now() - timedelta(days=800)).strftime("%d-%m-%Y"))
-    if not items: return "N/A", ""
-    col = series_code.replace(".", "_"); vals = []
-    for item in items:
-        v = item.get(col)
-        if v is not None:
-            try: vals.append((item.get("Tarih", ""), float(str(v).replace(",", "."))))
-            except ValueError: pass
-    if len(vals) < 5: return "N/A", ""
-    yoy = round(((vals[-1][1] / vals[-5][1]) - 1) * 100, 2) if vals[-5][1] else "N/A"
-    return yoy, vals[-1][0]
+    if not series_code: return "N/A", ""
+    STORE.sync([(series_code, 800)])
+    if len(STORE.values(series_code)) < 5: return "N/A", ""
+    yoy, date = STORE.growth(series_code, 4)
+    return ("N/A" if yoy is None else yoy), date
 
 def _fetch_turkey_rating():
     try:
-        r = requests.get("https://tradingeconomics.com/turkey/rating", headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-        if r.status_code == 200:
-            soup = BeautifulSoup(r.text, "lxml")
-            for row in soup.select("table tr"):
-                cells = row.find_all("td")
-                if len(cells) >= 4 and "moody's" in cells[0].text.lower():
-                    return {"rating": cells[1].text.strip(), "outlook": cells[2].text.strip(), "date": cells[3].text.strip()}
+        return pages.extract("https://tradingeconomics.com/turkey/rating", _parse_te_rating, headers=_UA) or {}
     except Exception: pass
     return {}
 
+def _parse_te_rating(text):
+    for row in BeautifulSoup(text, "lxml").select("table tr"):
+        cells = row.find_all("td")
+        if len(cells) >= 4 and "moody's" in cells[0].text.lower():
+            return {"rating": cells[1].text.strip(), "outlook": cells[2].text.strip(), "date": cells[3].text.strip()}
+    return {}
+
 def fetch_cbrt_tracker():
     cached = get_cached("cbrt_tracker", ttl_seconds=3600)
     if cached is not None: return cached
     res = {"current_rate": "N/A", "previous_rate": "N/A", "last_change_date": "N/A", "next_meeting": _get_next_cbrt_meeting(), "history": []}
     series = CONFIG.get("cbrt_tracker", {}).get("policy_rate_series", "TP.APIFON4")
-    items = _evds_fetch(series, (datetime.now() - timedelta(days=730)).strftime("%d-%m-%Y"))
-    if items:
-        col = series.replace(".", "_"); hist = []; prev = None
-        for item in items:
-            v = item.get(col)
-            if v is not None:
-                try: r = float(str(v).replace(",", "."))
-                except ValueError: continue
-                hist.append({"date": item.get("Tarih", ""), "rate": r})
-                if prev is not None and r != prev: res["last_change_date"] = item.get("Tarih", "")
-                prev = r
-        if hist:
-            res["current_rate"] = hist[-1]["rate"]
-            for i in range(len(hist)-2, -1, -1):
-                if hist[i]["rate"] != res["current_rate"]:
-                    res["previous_rate"] = hist[i]["rate"]; break
-            changes = []; last_r = None
-            for h in hist:
-                if h["rate"] != last_r:
-                    changes.append(h); last_r = h["rate"]
-            res["history"] = changes[-24:]
+    current = _update_cbrt_decisions(series)
+    decisions = get_cbrt_decisions(series)
+    if current is not None:
+        res["current_rate"] = current
+        last = decisions[-1] if decisions else None
+        if last and last["previous"] is not None:
+            res["previous_rate"] = last["previous"]
+            res["last_change_date"] = last["label"]
+        res["history"] = [{"date": d["label"], "rate": d["rate"]} for d in decisions[-24:]]
     set_cached("cbrt_tracker", res)
     return res
 
+def fetch_cbrt_history():
+    """Every recorded policy rate change (the first row is the baseline, previous=None)."""
+    series = CONFIG.get("cbrt_tracker", {}).get("policy_rate_series", "TP.APIFON4")
+    _update_cbrt_decisions(series)
+    out = []
+    for d in get_cbrt_decisions(series):
+        change = round((d["rate"] - d["previous"]) * 100) if d["previous"] is not None else None
+        out.append({"date": d["label"], "iso_date": d["obs_date"], "rate": d["rate"], "previous": d["previous"], "change_bps": change})
+    return {"series": series, "decisions": out}
+
+def _update_cbrt_decisions(series):
+    """
+    Fold observations since the stored cursor into cbrt_decisions.
+    The first run walks the whole backfill once. Later runs re-derive the
+    change points of the trailing CBRT_REVISION_DAYS, the window the EVDS
+    store re-pulls, so a revised rate replaces the stored decision.
+    Returns the latest rate (or None).
+    """
+    STORE.sync([(series, 730)])
+    name = f"cbrt:{series}"
+    cur = get_cursor(name) or {"last_obs": None, "last_value": None}
+    since, last_rate = None, None
+    if cur["last_obs"]:
+        since = (datetime.strptime(cur["last_obs"], "%Y-%m-%d") - timedelta(days=CBRT_REVISION_DAYS)).strftime("%Y-%m-%d")
+        before = [d for d in get_cbrt_decisions(series) if d["obs_date"] < since]
+        last_rate = before[-1]["rate"] if before else None  # Rate in force when the window opens
+    rows = get_evds_observations(series, since=since)
+    if not rows: return cur["last_value"]
+    changes = []
+    for row in rows:
+        if row["value"] != last_rate:
+            changes.append((series, row["obs_date"], row["label"], row["value"], last_rate))
+        last_rate = row["value"]
+    replace_cbrt_decisions(series, since, changes)
+    last_obs = rows[-1]["obs_date"]
+    if (last_obs, last_rate) != (cur["last_obs"], cur["last_value"]): set_cursor(name, last_obs, last_rate)
+    return last_rate
+
 def _get_next_cbrt_meeting():
-    dates = ["2026-03-12", "2026-04-22", "2026-06-11", "2026-07-23", "2026-09-10", "2026-10-22", "2026-12-10", "2027-01-21"]
-    today = datetime.now().strftime("%Y-%m-%d")
-    for d in dates:
-        if d >= today: return d
-    return "TBD"
+    nxt = CALENDAR.next_of("CBRT MPC Meeting")
+    return nxt["date"] if nxt else "TBD"
 
 def fetch_economic_calendar():
-    cached = get_cached("calendar", ttl_seconds=3600)
-    if cached is not None: return cached
-    # Simplified logic: merge recurring events
-    events = []
-    # CBRT
-    for d in ["2026-03-12", "2026-04-22", "2026-06-11", "2026-07-23", "2026-09-10", "2026-10-22", "2026-12-10"]:
-        events.append({"date": d, "event": "CBRT MPC Meeting", "country": "TR", "importance": "high"})
-    # US FOMC
-    for d in ["2026-03-18", "2026-04-29", "2026-06-17", "2026-07-29", "2026-09-16", "2026-10-28", "2026-12-09"]:
-        events.append({"date": d, "event": "FOMC Rate Decision", "country": "US", "importance": "high"})
-    # Monthly releases (simple generation)
-    for m in range(2, 13):
-        events.append({"date": f"2026-{m:02d}-03", "event": "TR CPI Release", "country": "TR", "importance": "high"})
-        events.append({"date": f"2026-{m:02d}-13", "event": "US CPI Release", "country": "US", "importance": "high"})
-    
-    events.sort(key=lambda x: x["date"])
-    set_cached("calendar", events)
-    return events
+    """Recent and upcoming events from the indexed calendar (engine.econ_calendar)."""
+    return CALENDAR.listing()
 
 def _fetch_bist_pe():
     """Fetch BIST 100 PE Ratio from TradingEconomics."""
     try:
-        r = requests.get("https://tradingeconomics.com/turkey/stock-market", headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-        if r.status_code == 200:
-            soup = BeautifulSoup(r.text, "lxml")
-            # Look for P/E Ratio table
-            # Usually in a table with 'Price to Earnings'
-            for row in soup.select("table tr"):
-                cells = row.find_all("td")
-                if len(cells) >= 2:
-                    name = cells[0].text.strip()
-                    if "Price to Earnings" in name:
-                        val = cells[1].text.strip()
-                        return float(val)
+        val = pages.extract("https://tradingeconomics.com/turkey/stock-market", _parse_te_pe, headers=_UA)
+        if val is not None: return val
     except Exception: pass
     return "N/A"
 
+def _parse_te_pe(text):
+    # Look for P/E Ratio table
+    # Usually in a table with 'Price to Earnings'
+    for row in BeautifulSoup(text, "lxml").select("table tr"):
+        cells = row.find_all("td")
+        if len(cells) >= 2:
+            name = cells[0].text.strip()
+            if "Price to Earnings" in name:
+                try: return float(cells[1].text.strip())
+                except ValueError: return None
+    return None
+
 def fetch_erp():
     """Calculate Equity Risk Premium (Earnings Yield - 10Y Bond Yield)."""
     pe = _fetch_bist_pe()
-    bonds = _fetch_bond_yields()
+    bonds = fetch_bond_yields()
     tr_10y = bonds.get("tr_10y", "N/A")
     
     erp = "N/A"
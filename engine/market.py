@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 from .config import ALL_TICKERS, CONFIG
 from .cache import get_cached, set_cached
 from .db import archive_market_snapshot
+from .metrics import count_upstream
+from .rolling import day_epoch
 
 def fetch_market_data():
     """Batch-fetch all tickers via yfinance. Returns dict keyed by symbol."""
@@ -80,6 +82,7 @@ def fetch_market_data():
 def _fetch_single_ticker_fast(sym):
     """Fallback method using Ticker.fast_info for reliable single-point data."""
     try:
+        count_upstream("yfinance")
         t = yf.Ticker(sym)
         info = t.fast_info
         price = info.last_price
@@ -111,13 +114,14 @@ def _na_entry(sym):
         "_source": "N/A",
     }
 
-def _yf_download_batched(symbols, chunk_size=10, pause=0.4):
+def _yf_download_batched(symbols, chunk_size=10, pause=0.4, period="2d"):
     merged = {}
     for i in range(0, len(symbols), chunk_size):
         chunk = symbols[i : i + chunk_size]
         if not chunk: continue
         try:
-            df = yf.download(chunk, period="2d", group_by="ticker", threads=False, progress=False, auto_adjust=True, timeout=15)
+            count_upstream("yfinance")
+            df = yf.download(chunk, period=period, group_by="ticker", threads=False, progress=False, auto_adjust=True, timeout=15)
             part = _yf_get_ticker_dfs(df, chunk)
             merged.update(part)
         except Exception as e:
@@ -224,6 +228,7 @@ def fetch_history(symbol, period="3mo"):
     cached = get_cached(cached_key, ttl_seconds=1800)
     if cached is not None: return cached
     try:
+        count_upstream("yfinance")
         t = yf.Ticker(symbol); interval = "1d"
         if period == "1d": interval = "5m"
         elif period == "5d": interval = "1h"
@@ -236,6 +241,23 @@ def fetch_history(symbol, period="3mo"):
     except Exception: return None
 
 
+def fetch_daily_bars(symbols, period="5d"):
+    """
+    Daily closes for many symbols in batched downloads (20 per request).
+    Returns {symbol: [(epoch, close), ...]} oldest first, stamped at UTC
+    midnight of each session's date; the last bar may be the session in
+    progress.
+    """
+    out = {}
+    for sym, df in _yf_download_batched(list(symbols), chunk_size=20, pause=0.4, period=period).items():
+        try:
+            closes = df["Close"].dropna()
+            if not closes.empty:
+                out[sym] = [(day_epoch(i.timestamp()), float(c)) for i, c in closes.items()]
+        except Exception: pass
+    return out
+
+
 def fetch_long_history(symbol, period="10y", interval="1mo"):
     """
     Fetches long-term history for seasonality analysis.
@@ -246,6 +268,7 @@ def fetch_long_history(symbol, period="10y", interval="1mo"):
     if cached is not None: return cached
     
     try:
+        count_upstream("yfinance")
         t = yf.Ticker(symbol)
         df = t.history(period=period, interval=interval)
         if df.empty: return None
@@ -327,6 +350,7 @@ def fetch_distressed():
     for i in range(0, len(tickers), chunk_size):
         chunk = tickers[i: i+chunk_size]
         try:
+            count_upstream("yfinance")
             data = yf.download(chunk, period="3mo", group_by="ticker", threads=False, progress=False, auto_adjust=True)
             for sym in chunk:
                 try:
@@ -363,6 +387,7 @@ def fetch_gold_correlation():
     try:
         # Fetch 3mo history for XAUUSD (GC=F) and USDTRY (TRY=X)
         tickers = ["GC=F", "TRY=X"]
+        count_upstream("yfinance")
         df = yf.download(tickers, period="3mo", interval="1d", group_by="ticker", threads=False, progress=False, auto_adjust=True)
         
         # Extract Close series
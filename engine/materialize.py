@@ -0,0 +1,129 @@
+"""
+The Analysis Materializer
+=========================
+"Have the answer ready before the question."
+Keeps full entity analysis (level + alerts, valuation, graph, seasonality,
+divergence) precomputed for the entities people actually open.
+
+    * Access tracking: every popup open bumps a decaying score per entity;
+      the top HOT_SIZE (plus HOT_SEED) form the hot set.
+    * Refresh: a background loop recomputes a hot entity when one of the
+      caches it reads was refreshed since its last computation, or when
+      the stored result is older than MAX_AGE.
+    * Serving: /api/entity reads the stored result (with analysis_ts) and
+      only computes inline for a cold entity.
+"""
+import math
+import time
+import threading
+from datetime import datetime
+from .cache import cached_at
+
+HOT_SEED = ["usdtry", "bist100", "cds"]   # Warm from the first tick
+HOT_SIZE = 12
+REFRESH_SECONDS = 60
+MAX_AGE = 600                             # Never serve a result older than this
+HALF_LIFE = 6 * 3600                      # Access scores halve every 6 hours
+
+
+class AnalysisMaterializer:
+    def __init__(self):
+        self._scores = {}   # key -> (score, ts)
+        self._store = {}    # key -> entry
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ── Access tracking ──────────────────────────────────────────────
+    def record_access(self, key, now=None):
+        now = now or time.time()
+        with self._lock:
+            score, ts = self._scores.get(key, (0.0, now))
+            self._scores[key] = (score * math.pow(0.5, (now - ts) / HALF_LIFE) + 1.0, now)
+
+    def hot_keys(self, n=HOT_SIZE, now=None):
+        now = now or time.time()
+        with self._lock:
+            decayed = {k: s * math.pow(0.5, (now - ts) / HALF_LIFE) for k, (s, ts) in self._scores.items()}
+        ranked = sorted(decayed, key=decayed.get, reverse=True)[:n]
+        return list(dict.fromkeys(HOT_SEED + ranked))
+
+    # ── Store ────────────────────────────────────────────────────────
+    def get(self, key, max_age=MAX_AGE):
+        with self._lock:
+            entry = self._store.get(key)
+        if entry and time.time() - entry["computed_at"] < max_age:
+            return entry
+        return None
+
+    def get_or_compute(self, key):
+        return self.get(key) or self.compute(key)
+
+    def compute(self, key):
+        """Compute and store level + analysis for `key`. Returns the entry (or None)."""
+        from .registry import resolve_entity
+        from .resolver import get_current_level, get_entity_analysis, warm_levels
+        entity = resolve_entity(key)
+        if not entity: return None
+        warm_levels([entity])  # No-op once any fetcher has published the entity's feed
+        val, unit, chg = get_current_level(entity["key"], entity)
+        try:
+            analysis = get_entity_analysis(entity["key"], val, chg) or {}
+        except Exception as e:
+            print(f"[materialize] Analysis failed for {key}: {e}")
+            analysis = {}
+        now = time.time()
+        entry = {
+            "level": (val, unit, chg),
+            "analysis": analysis,
+            "computed_at": now,
+            "analysis_ts": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+            "inputs": self._input_stamp(entity),
+        }
+        with self._lock:
+            self._store[entity["key"]] = entry
+        return entry
+
+    def _inputs(self, entity):
+        from .resolver import _source_feeds
+        keys = [cache_key for cache_key, _ in _source_feeds(entity.get("source"))]
+        if entity.get("source") == "market" and entity.get("technical_key"):
+            keys.append(f"hist_{entity['technical_key']}_3mo")
+        return keys
+
+    def _input_stamp(self, entity):
+        return max((cached_at(k) or 0 for k in self._inputs(entity)), default=0)
+
+    def needs_refresh(self, key):
+        from .registry import resolve_entity
+        with self._lock:
+            entry = self._store.get(key)
+        if not entry or time.time() - entry["computed_at"] >= MAX_AGE - REFRESH_SECONDS:
+            return True
+        entity = resolve_entity(key)
+        return bool(entity) and self._input_stamp(entity) > entry["inputs"]
+
+    # ── Background loop ──────────────────────────────────────────────
+    def refresh_once(self):
+        refreshed = []
+        for key in self.hot_keys():
+            try:
+                if self.needs_refresh(key):
+                    self.compute(key)
+                    refreshed.append(key)
+            except Exception as e:
+                print(f"[materialize] {key} failed: {e}")
+        return refreshed
+
+    def _loop(self):
+        print("[Background] Starting Analysis Materializer...")
+        while True:
+            self.refresh_once()
+            time.sleep(REFRESH_SECONDS)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+
+MATERIALIZER = AnalysisMaterializer()
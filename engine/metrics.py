@@ -0,0 +1,44 @@
+"""
+Runtime Metrics
+===============
+"Measure before you optimize."
+Process-wide counters and gauges, served as-is by /api/metrics.
+
+    counters: monotonically increasing (e.g. upstream.calls)
+    gauges:   last observed value (e.g. scorecard.upstream_calls)
+"""
+import threading
+from urllib.parse import urlparse
+
+_counters = {}
+_gauges = {}
+_lock = threading.Lock()
+
+
+def incr(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def count(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def count_upstream(url_or_host):
+    """Record one outbound HTTP call (total and per host)."""
+    host = urlparse(url_or_host).netloc if "://" in url_or_host else url_or_host
+    with _lock:
+        _counters["upstream.calls"] = _counters.get("upstream.calls", 0) + 1
+        key = f"upstream.host.{host}"
+        _counters[key] = _counters.get(key, 0) + 1
+
+
+def snapshot():
+    with _lock:
+        return {"counters": dict(sorted(_counters.items())), "gauges": dict(sorted(_gauges.items()))}
@@ -1,78 +1,217 @@
+"""
+The Wire
+========
+"Ask what changed, not what exists."
+Aggregates the RSS feeds into one source-balanced news list.
+
+    * All feeds are fetched at once through the pooled HTTP client, each
+      with its own timeout, so a refresh takes as long as the slowest feed.
+    * Conditional GET: each feed's ETag / Last-Modified is sent back as
+      If-None-Match / If-Modified-Since. An unchanged feed answers 304 and
+      costs neither a download nor a parse. A feed that ignores validators
+      but returns byte-identical content is not parsed either.
+    * Seen-set: every processed entry is remembered by (source, hash of its
+      link / guid), bounded to SEEN_MAX and seeded from the archive on first
+      use. An entry seen before is skipped before its summary or date is
+      touched, so a 200 that repeats yesterday's entries costs only the
+      XML parse.
+    * Summaries are stripped of markup with a regex plus html.unescape
+      instead of building a BeautifulSoup tree per entry.
+"""
+import re
+import html
+import time
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
 import feedparser
-from bs4 import BeautifulSoup
+from . import httpclient as http
 from .cache import get_cached, set_cached
 from .db import archive_news, get_recent_news
-from collections import deque
-
-# Set a browser-like User Agent to avoid being blocked
-feedparser.USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+from .fanout import fan_out
+from .metrics import incr
 
 RSS_SOURCES = {
     "Bloomberg HT": "https://www.bloomberght.com/rss",
     "Investing TR": "https://tr.investing.com/rss/news.rss",
     "Dünya": "https://www.dunya.com/rss",
-    "Reuters BIZ": "https://www.reutersagency.com/feed/?best-topics=business&post_type=best", 
+    "Reuters BIZ": "https://www.reutersagency.com/feed/?best-topics=business&post_type=best",
     "CNBC": "https://www.cnbc.com/id/100003114/device/rss/rss.html",
     "MarketWatch": "https://www.marketwatch.com/rss/marketpulse",
 }
+FEED_TIMEOUT = (3, 6)      # (connect, read) seconds per feed
+REFRESH_DEADLINE = 10      # Upper bound on one refresh; a feed still running after this is skipped
+MAX_ENTRIES = 30           # Per feed and refresh
+SEEN_MAX = 5000            # Remembered entries (~a week of every feed)
+SEEN_SEED = 500            # Archived entries loaded into the seen-set on first use
+
+_state_lock = threading.Lock()
+_validators = {}           # source -> {"etag", "modified"} from its last 200
+_body_hashes = {}          # source -> digest of its last 200 body (for feeds without validators)
+_seen = OrderedDict()      # (source, entry hash) -> None, oldest first
+_seen_loaded = False
+
+_DROP_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.S | re.I)
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def strip_tags(text):
+    """Plain text of an HTML snippet: tags dropped, entities decoded, whitespace collapsed."""
+    if "<" in text:
+        text = _TAG_RE.sub(" ", _DROP_RE.sub(" ", text))
+    if "&" in text:
+        text = html.unescape(text)
+    return " ".join(text.split())
+
+
+def _entry_key(name, link):
+    return name, hashlib.sha1(link.encode("utf-8", "replace")).hexdigest()[:16]
+
+
+def _load_seen():
+    global _seen_loaded
+    with _state_lock:
+        if _seen_loaded: return
+        _seen_loaded = True
+    try:
+        recent = get_recent_news(limit=SEEN_SEED)
+    except Exception as e:
+        print(f"[news] Seen-set seed failed: {e}")
+        return
+    mark_seen(_entry_key(r["source"], r["link"] or r["title"]) for r in reversed(recent))
+
+
+def mark_seen(keys):
+    with _state_lock:
+        for k in keys:
+            _seen[k] = None
+            _seen.move_to_end(k)
+        while len(_seen) > SEEN_MAX:
+            _seen.popitem(last=False)
+
+
+def _is_seen(key):
+    with _state_lock:
+        return key in _seen
+
+
+def _conditional_headers(name):
+    with _state_lock:
+        v = _validators.get(name, {})
+    headers = {}
+    if v.get("etag"): headers["If-None-Match"] = v["etag"]
+    if v.get("modified"): headers["If-Modified-Since"] = v["modified"]
+    return headers
+
+
+def _parse_entry(name, entry):
+    summary = entry.get("summary", "") or entry.get("description", "")
+    summary = strip_tags(summary)[:160].strip()
+    if len(summary) == 160: summary += "..."
+
+    ts_struct = entry.get("published_parsed") or entry.get("updated_parsed")
+    if ts_struct:
+        ts_iso = time.strftime("%Y-%m-%d %H:%M:%S", ts_struct)
+    else:
+        ts_iso = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    return {
+        "source": name,
+        "title": entry.get("title", ""),
+        "summary": summary,
+        "link": entry.get("link", ""),
+        "time": ts_iso,
+    }
+
+
+def fetch_feed(name, url):
+    """
+    One conditional fetch of a feed. Returns (status code, new items, their
+    seen-set keys, state); a 304 returns no items and no state. state holds
+    the response's validators and body digest, committed by refresh_feeds
+    only once the items are archived.
+    """
+    resp = http.get(url, headers=_conditional_headers(name), timeout=FEED_TIMEOUT)
+    if resp.status_code == 304:
+        incr("news.not_modified")
+        return 304, [], [], None
+    resp.raise_for_status()
+    state = {"etag": resp.headers.get("ETag"), "modified": resp.headers.get("Last-Modified"),
+             "digest": hashlib.sha1(resp.content).digest()}
+    with _state_lock:
+        unchanged = _body_hashes.get(name) == state["digest"]
+    if unchanged:
+        incr("news.not_modified")  # Byte-identical 200 from a feed that ignores validators
+        return resp.status_code, [], [], state
+    feed = feedparser.parse(resp.content, response_headers=dict(resp.headers))
+    items, keys = [], []
+    for entry in feed.entries[:MAX_ENTRIES]:
+        key = _entry_key(name, entry.get("link") or entry.get("id") or entry.get("title", ""))
+        if _is_seen(key) or key in keys: continue
+        items.append(_parse_entry(name, entry))
+        keys.append(key)
+    incr("news.new_entries", len(items))
+    return resp.status_code, items, keys, state
+
+
+def refresh_feeds(sources=None):
+    """Fetch every feed concurrently and archive the new entries. Returns {source: status}."""
+    _load_seen()
+    sources = sources or RSS_SOURCES
+    results, status = fan_out({name: (lambda name=name, url=url: fetch_feed(name, url))
+                               for name, url in sources.items()}, deadline=REFRESH_DEADLINE)
+    all_fetched, all_keys, states, out = [], [], {}, {}
+    for name, res in results.items():
+        if res is None:
+            out[name] = status[name]["status"]
+            continue
+        code, items, keys, state = res
+        if state: states[name] = state
+        all_fetched.extend(items)
+        all_keys.extend(keys)
+        out[name] = code
+    if all_fetched:
+        archive_news(all_fetched)
+    # Only once archived: after a failed write the next refresh neither gets a
+    # 304 nor skips the body, so the entries are fetched and retried
+    mark_seen(all_keys)
+    with _state_lock:
+        for name, state in states.items():
+            _validators[name] = {"etag": state["etag"], "modified": state["modified"]}
+            _body_hashes[name] = state["digest"]
+    return out
+
 
 def fetch_news():
     """Aggregate news from RSS feeds with source-balancing (Round Robin)."""
     cached = get_cached("news", ttl_seconds=300)
     if cached is not None: return cached
 
-    all_fetched = []
-    for name, url in RSS_SOURCES.items():
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:30]:
-                summary = entry.get("summary", "") or entry.get("description", "")
-                if "<" in summary:
-                    summary = BeautifulSoup(summary, "lxml").get_text()
-                summary = summary[:160].strip()
-                if len(summary) == 160: summary += "..."
-                
-                import time
-                ts_struct = entry.get("published_parsed") or entry.get("updated_parsed")
-                if ts_struct:
-                    ts_iso = time.strftime("%Y-%m-%d %H:%M:%S", ts_struct)
-                else:
-                    ts_iso = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-                all_fetched.append({
-                    "source": name,
-                    "title": entry.get("title", ""),
-                    "summary": summary,
-                    "link": entry.get("link", ""),
-                    "time": ts_iso,
-                })
-        except Exception: pass
-    
-    if all_fetched:
-        archive_news(all_fetched)
-    
+    refresh_feeds()
+
     # BALANCED RETRIEVAL:
     # 1. Fetch a large enough buffer from DB (e.g., 200 items)
     raw_history = get_recent_news(limit=200)
-    
+
     # 2. Group by source
     by_source = {}
     for item in raw_history:
         s = item['source']
         if s not in by_source: by_source[s] = deque()
         by_source[s].append(item)
-    
+
     # 3. Interleave (Round Robin) to ensure diversity at the top
     balanced = []
     sources_cycle = list(by_source.keys())
-    
+
     while len(balanced) < 60 and sources_cycle:
         for s in list(sources_cycle):
             if by_source[s]:
                 balanced.append(by_source[s].popleft())
             else:
                 sources_cycle.remove(s)
-            
+
             if len(balanced) >= 60: break
 
     set_cached("news", balanced)
@@ -0,0 +1,104 @@
+"""
+The Page Cache
+==============
+"Don't re-read a page that hasn't changed."
+Shared cache for scraped HTML pages (TradingEconomics, worldgovernmentbonds,
+user-linked sources).
+
+    1. Conditional GET: stored ETag / Last-Modified go out as
+       If-None-Match / If-Modified-Since; a 304 costs no body.
+    2. Content hashing: a 200 whose body hashes the same as last time is
+       treated as unchanged (many sites ignore validators).
+    3. Extraction memo: parser results are memoized per (url, parser) and
+       content hash, so BeautifulSoup only runs when the page really changed.
+
+Counters in engine.metrics: pages.requests, pages.not_modified,
+pages.unchanged, pages.parsed, pages.parse_skipped, pages.bytes.
+
+Pages are kept least-recently-used first and capped at MAX_PAGES; an
+evicted page takes its extraction memos with it.
+"""
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from . import httpclient as http
+from .metrics import incr
+
+MAX_PAGES = 256  # Cached page bodies; user-linked sources make the URL set open-ended
+
+_pages = OrderedDict()  # url -> {"text", "hash", "etag", "last_modified", "fetched_at"}, oldest first
+_extracted = {}  # (url, parser_name) -> (content_hash, value)
+_lock = threading.Lock()
+
+
+def fetch_page(url, headers=None, timeout=10):
+    """
+    Conditionally fetch `url`. Returns the page entry with an extra
+    "changed" flag, or None if the request failed.
+    """
+    with _lock:
+        prev = _pages.get(url)
+        if prev: _pages.move_to_end(url)
+    req_headers = dict(headers or {})
+    if prev:
+        if prev.get("etag"): req_headers["If-None-Match"] = prev["etag"]
+        if prev.get("last_modified"): req_headers["If-Modified-Since"] = prev["last_modified"]
+
+    incr("pages.requests")
+    try:
+        r = http.get(url, headers=req_headers, timeout=timeout)
+    except Exception as e:
+        print(f"[pages] {url} failed: {e}")
+        return None
+
+    if r.status_code == 304 and prev:
+        incr("pages.not_modified")
+        with _lock:
+            prev["fetched_at"] = time.time()
+        return {**prev, "changed": False}
+    if r.status_code != 200:
+        return None
+
+    incr("pages.bytes", len(r.content))
+    digest = hashlib.sha1(r.content).hexdigest()
+    entry = {
+        "text": r.text,
+        "hash": digest,
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+    }
+    changed = not prev or prev["hash"] != digest
+    if not changed: incr("pages.unchanged")
+    with _lock:
+        _pages[url] = entry
+        _pages.move_to_end(url)
+        while len(_pages) > MAX_PAGES:
+            evicted, _ = _pages.popitem(last=False)
+            for k in [k for k in _extracted if k[0] == evicted]:
+                del _extracted[k]
+    return {**entry, "changed": changed}
+
+
+def extract(url, parser, name=None, headers=None, timeout=10):
+    """
+    Fetch `url` (conditionally) and return parser(text). The parser only
+    runs when the content hash differs from the last parse for this
+    (url, parser); otherwise the memoized value is returned.
+    Returns None if the page could not be fetched.
+    """
+    page = fetch_page(url, headers=headers, timeout=timeout)
+    if page is None:
+        return None
+    memo_key = (url, name or parser.__qualname__)
+    with _lock:
+        memo = _extracted.get(memo_key)
+    if memo and memo[0] == page["hash"]:
+        incr("pages.parse_skipped")
+        return memo[1]
+    value = parser(page["text"])
+    incr("pages.parsed")
+    with _lock:
+        _extracted[memo_key] = (page["hash"], value)
+    return value
@@ -2,6 +2,8 @@
 Data Registry — Every metric has a name.
 Maps canonical @names to their metadata, data source, and educational explanations.
 """
+from .config import ALL_TICKERS, TICKER_CATEGORIES
+from .search_index import SearchIndex
 
 DATA_REGISTRY = {
     # ── POLICY RATES ─────────────────────────────────────────────────
@@ -35,19 +37,6 @@ DATA_REGISTRY = {
     "npl_ratio":      {"name": "NPL Ratio",             "group": "banking",    "technical_key": "npl_ratio",        "source": "banking", "unit": "%",
                        "explain": "Non-Performing Loans / Total Loans. A key indicator of asset quality. Rising NPLs = corporates having debt difficulty."},
 
-    # ── MARKET INSTRUMENTS ───────────────────────────────────────────
-    "bist100":        {"name": "BIST 100 Index",        "group": "equities",   "technical_key": "XU100.IS",        "source": "market", "unit": "pts", "chartable": True,
-                       "explain": "Borsa Istanbul 100.",
-                       "valuation": {"model": "ERP_YIELD", "inputs": ["tr_10y", "pe"]}},
-    
-    # ... (snip) ...
-
-    # ── FX ───────────────────────────────────────────────────────────
-    "usdtry":         {"name": "USD/TRY",               "group": "fx",         "technical_key": "USDTRY=X",        "source": "market", "unit": "",    "chartable": True,
-                       "explain": "US Dollar to Turkish Lira.",
-                       "valuation": {"model": "PPP", "inputs": ["cpi_yoy"]},
-                       "correlations": ["AKBNK.IS", "GARAN.IS", "FROTO.IS", "THYAO.IS"]}, # Banks (inverse), Exporters (direct)
-
     "risk_premium":   {"name": "Risk Premium (Spread)", "group": "bonds",      "technical_key": "risk_premium",    "source": "macro", "unit": "bps",
                        "explain": "TR 10Y minus US 10Y. Shows how much extra yield investors demand to hold Turkish debt vs US Treasuries. Higher = more perceived risk."},
     "tr_curve":       {"name": "Yield Curve (10Y-2Y)",  "group": "bonds",      "technical_key": "tr_curve",        "source": "macro", "unit": "bps",
@@ -72,6 +61,8 @@ DATA_REGISTRY = {
                        "explain": "PPI minus CPI. Positive gap = producers are absorbing costs (margins shrinking). Negative gap = cost pressures easing, disinflation signal."},
     "food_cpi":       {"name": "Food CPI",              "group": "inflation",  "technical_key": "food_cpi",        "source": "macro", "unit": "%",
                        "explain": "Food inflation — critical in Turkey where food is 25%+ of the CPI basket. Politically sensitive."},
+    "us_cpi":         {"name": "US CPI YoY",            "group": "inflation",  "technical_key": "us_cpi",          "source": "macro", "unit": "%",
+                       "explain": "US headline inflation (FRED CPIAUCSL, year-over-year). The foreign leg of the USD/TRY inflation differential."},
 
     # ── REAL ECONOMY ─────────────────────────────────────────────────
     "gdp":            {"name": "GDP Growth",            "group": "economy",    "technical_key": "gdp_yoy",         "source": "macro", "unit": "%",
@@ -101,7 +92,8 @@ DATA_REGISTRY = {
 
     # ── MARKET INSTRUMENTS ───────────────────────────────────────────
     "bist100":        {"name": "BIST 100 Index",        "group": "equities",   "technical_key": "XU100.IS",        "source": "market", "unit": "pts", "chartable": True,
-                       "explain": "Borsa Istanbul 100 — Turkey's main stock index. Composed of the 100 largest companies by market cap."},
+                       "explain": "Borsa Istanbul 100 — Turkey's main stock index. Composed of the 100 largest companies by market cap.",
+                       "valuation": {"model": "ERP_YIELD", "inputs": ["tr_10y", "pe"]}},
     "bist30":         {"name": "BIST 30 Index",         "group": "equities",   "technical_key": "XU030.IS",        "source": "market", "unit": "pts", "chartable": True,
                        "explain": "The 30 most liquid stocks on Borsa Istanbul. More concentrated = more volatile. Used for futures trading."},
     "sp500":          {"name": "S&P 500",               "group": "equities",   "technical_key": "^GSPC",           "source": "market", "unit": "pts", "chartable": True,
@@ -121,7 +113,9 @@ DATA_REGISTRY = {
 
     # ── FX ───────────────────────────────────────────────────────────
     "usdtry":         {"name": "USD/TRY",               "group": "fx",         "technical_key": "USDTRY=X",        "source": "market", "unit": "",    "chartable": True,
-                       "explain": "US Dollar to Turkish Lira. The single most important price in Turkey. Drives import costs, inflation expectations, and political stability."},
+                       "explain": "US Dollar to Turkish Lira. The single most important price in Turkey. Drives import costs, inflation expectations, and political stability.",
+                       "valuation": {"model": "PPP", "inputs": ["cpi_yoy", "us_cpi"]},
+                       "correlations": ["AKBNK.IS", "GARAN.IS", "FROTO.IS", "THYAO.IS"]}, # Banks (inverse), Exporters (direct)
     "eurtry":         {"name": "EUR/TRY",               "group": "fx",         "technical_key": "EURTRY=X",        "source": "market", "unit": "",    "chartable": True,
                        "explain": "Euro to Turkish Lira. Important because Europe is Turkey's largest trading partner."},
     "dxy":            {"name": "Dollar Index (DXY)",     "group": "fx",         "technical_key": "DX-Y.NYB",        "source": "market", "unit": "",    "chartable": True,
@@ -181,42 +175,34 @@ for key, entry in DATA_REGISTRY.items():
     GROUP_ALIASES[g].append(key)
 
 
+def _ticker_documents():
+    """Plain tickers from ALL_TICKERS that have no registry entry of their own."""
+    registered = {e.get("technical_key") for e in DATA_REGISTRY.values()}
+    category = {sym: cat for cat, syms in TICKER_CATEGORIES.items() for sym in syms}
+    return [{"key": sym, "name": name, "group": category.get(sym, "tickers"), "technical_key": sym,
+             "source": "market", "unit": "", "chartable": True, "explain": ""}
+            for sym, name in ALL_TICKERS.items() if sym not in registered]
+
+
+# Prebuilt search index: registry entities first, then bare tickers
+SEARCH_INDEX = SearchIndex([{"key": k, **v} for k, v in DATA_REGISTRY.items()] + _ticker_documents())
+
+
 def search_registry(query):
-    """Fuzzy search across entity keys, names, and groups. Returns list of matches."""
+    """Search across entity keys, names, groups and tickers (prefix, substring and typo matches)."""
     query = query.lower().strip().lstrip("@")
     if not query:
         return []
 
-    results = []
-
     # Exact key match first
     if query in DATA_REGISTRY:
-        results.append({"key": query, **DATA_REGISTRY[query], "match_type": "exact"})
-        return results
+        return [{"key": query, **DATA_REGISTRY[query], "match_type": "exact"}]
 
     # Group match — e.g., "inflation" returns all inflation metrics
     if query in GROUP_ALIASES:
-        for key in GROUP_ALIASES[query]:
-            results.append({"key": key, **DATA_REGISTRY[key], "match_type": "group"})
-        return results
-
-    # Fuzzy: search key, name, group, explain, technical_key
-    for key, entry in DATA_REGISTRY.items():
-        searchable = f"{key} {entry['name']} {entry['group']} {entry.get('explain', '')} {entry.get('technical_key', '')}".lower()
-        if query in searchable:
-            # Rank: key match > technical_key match > name match > explain match
-            if query in key:
-                score = 4
-            elif query in entry.get("technical_key", "").lower():
-                score = 3
-            elif query in entry["name"].lower():
-                score = 2
-            else:
-                score = 1
-            results.append({"key": key, **entry, "match_type": "fuzzy", "score": score})
-
-    results.sort(key=lambda x: x.get("score", 0), reverse=True)
-    return results[:15]
+        return [{"key": key, **DATA_REGISTRY[key], "match_type": "group"} for key in GROUP_ALIASES[query]]
+
+    return [{**doc, "match_type": kind, "score": score} for doc, score, kind in SEARCH_INDEX.search(query, limit=15)]
 
 
 def resolve_entity(key):
@@ -227,15 +213,10 @@ def resolve_entity(key):
         entry["key"] = key
         return entry
     
-    # 2. Fallback: check technical_key (e.g. user typed @^IXIC)
-    clean_key = key.lstrip("@").upper()
-    for k, entry in DATA_REGISTRY.items():
-        if entry.get("technical_key") == clean_key:
-            res = dict(entry)
-            res["key"] = k
-            return res
-            
-    return None
+    # 2. Fallback: technical_key (e.g. user typed @^IXIC) or a bare ticker
+    clean_key = key.lstrip("@")
+    doc = SEARCH_INDEX.by_technical_key(clean_key) or SEARCH_INDEX.by_key(clean_key)
+    return dict(doc) if doc else None
 
 
 def get_group_entities(group):
@@ -0,0 +1,157 @@
+"""
+The Release Clock
+=================
+"Nothing changes until TÜİK says so."
+Release-aware refresh policy for monthly / quarterly EVDS series.
+
+A CPI index prints once a month; polling it every 10 minutes is wasted
+traffic. Each rule in config.json["release_calendar"] says when a series is
+published (nominal day + Istanbul time) and which observation period that
+release carries (lag_months). From that:
+
+    * Landed:  the latest stored observation is the one the last release
+               carried -> hold the series until the next release.
+    * Pending: a release time has passed but its observation has not shown
+               up yet -> poll every `poll_seconds` for `window_hours`.
+    * Overdue: still missing after the window -> fall back to the normal
+               sync interval (the calendar may be off by a holiday).
+
+Series without a rule keep the caller's default interval.
+"""
+import math
+from datetime import datetime, timedelta, timezone
+from .config import CONFIG
+from .metrics import incr
+
+TR_UTC_OFFSET = timedelta(hours=3)  # Türkiye stays on UTC+3 all year
+
+
+def now_tr():
+    """Naive datetime in Istanbul time (release times are quoted in it)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None) + TR_UTC_OFFSET
+
+
+def _add_months(year, month, delta):
+    idx = year * 12 + (month - 1) + delta
+    return idx // 12, idx % 12 + 1
+
+
+class ReleaseSchedule:
+    def __init__(self, config=None, series_keys=None):
+        cfg = config if config is not None else CONFIG.get("release_calendar", {})
+        keys = series_keys if series_keys is not None else CONFIG.get("turkey_macro", {})
+        self.poll_seconds = cfg.get("poll_seconds", 60)
+        self.window = timedelta(hours=cfg.get("window_hours", 72))
+        self.rules = cfg.get("rules", [])
+        self.calendar = None  # EconomicCalendar; when attached, its stored dates win over the nominal day
+        self._by_code = {}
+        for rule in self.rules:
+            for key in rule.get("series", []):
+                code = keys.get(key, key)  # Raw EVDS codes are accepted too
+                if code: self._by_code[code] = rule
+
+    def rule_for(self, series_code):
+        return self._by_code.get(series_code)
+
+    def _release_at(self, rule, year, month):
+        hh, mm = (int(x) for x in rule.get("time", "10:00").split(":"))
+        return datetime(year, month, rule["day"], hh, mm)
+
+    def _months(self, rule):
+        return rule.get("months") or range(1, 13)
+
+    def _from_calendar(self, event):
+        if not event: return None
+        return datetime.strptime(f"{event['date']} {event.get('time') or '00:00'}", "%Y-%m-%d %H:%M")
+
+    def last_release(self, rule, now=None):
+        """Most recent scheduled release at or before `now` (Istanbul time)."""
+        now = now or now_tr()
+        if self.calendar is not None:
+            at = self._from_calendar(self.calendar.last_of(rule["event"], now))
+            if at: return at
+        y, m = now.year, now.month
+        for _ in range(13):
+            if m in self._months(rule):
+                at = self._release_at(rule, y, m)
+                if at <= now: return at
+            y, m = _add_months(y, m, -1)
+        return None
+
+    def next_release(self, rule, now=None):
+        """First scheduled release strictly after `now` (Istanbul time)."""
+        now = now or now_tr()
+        if self.calendar is not None:
+            at = self._from_calendar(self.calendar.next_of(rule["event"], now))
+            if at: return at
+        y, m = now.year, now.month
+        for _ in range(13):
+            if m in self._months(rule):
+                at = self._release_at(rule, y, m)
+                if at > now: return at
+            y, m = _add_months(y, m, 1)
+        return None
+
+    def expected_period(self, rule, release_at):
+        """ISO date of the observation a release carries ("2026-09-01")."""
+        y, m = _add_months(release_at.year, release_at.month, -rule.get("lag_months", 1))
+        return f"{y:04d}-{m:02d}-01"
+
+    def state(self, series_code, last_obs, now=None):
+        """'landed' | 'pending' | 'overdue' | None (no rule for this series)."""
+        rule = self.rule_for(series_code)
+        if not rule: return None
+        now = now or now_tr()
+        released = self.last_release(rule, now)
+        if released is None or (last_obs and last_obs >= self.expected_period(rule, released)):
+            return "landed"
+        return "pending" if now - released < self.window else "overdue"
+
+    def sync_interval(self, series_code, last_obs, default, now=None):
+        """
+        Seconds a stored series may go without an upstream check.
+        math.inf = hold until the next release changes the expected period.
+        """
+        state = self.state(series_code, last_obs, now)
+        if state == "landed":
+            incr("releases.held")
+            return math.inf
+        if state == "pending":
+            return self.poll_seconds
+        return default
+
+    def in_window(self, series_codes, last_obs_of, now=None):
+        """
+        True if any of `series_codes` is waiting on a release that just
+        happened. `last_obs_of(code)` is only consulted for series whose
+        release window is open, so this is usually pure date arithmetic.
+        """
+        now = now or now_tr()
+        for code in series_codes:
+            rule = self.rule_for(code)
+            if not rule: continue
+            released = self.last_release(rule, now)
+            if released is None or now - released >= self.window: continue
+            if self.state(code, last_obs_of(code), now) == "pending": return True
+        return False
+
+    def events(self, start, end):
+        """Calendar entries for every rule's releases between two ISO dates."""
+        out = []
+        d0 = datetime.strptime(start, "%Y-%m-%d")
+        d1 = datetime.strptime(end, "%Y-%m-%d")
+        for rule in self.rules:
+            y, m = d0.year, d0.month
+            while (y, m) <= (d1.year, d1.month):
+                if m in self._months(rule):
+                    at = self._release_at(rule, y, m)
+                    if d0 <= at.replace(hour=0, minute=0) <= d1:
+                        out.append({"date": at.strftime("%Y-%m-%d"), "time": rule.get("time", ""),
+                                    "event": rule["event"], "country": "TR",
+                                    "importance": rule.get("importance", "medium"),
+                                    "entities": rule.get("entities", [])})
+                y, m = _add_months(y, m, 1)
+        return out
+
+
+RELEASES = ReleaseSchedule()
@@ -1,8 +1,8 @@
-import requests
 import os
 import json
 from datetime import datetime, timedelta
 from .cache import get_cached, set_cached
+from . import httpclient as http
 from .db import search_news, get_top_movers_by_date, get_tickets
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
@@ -51,7 +51,7 @@ def synthesize_narrative(concept_name, value, unit, news_headlines):
             "Authorization": f"Bearer {GROQ_API_KEY}",
             "Content-Type": "application/json"
         }
-        response = requests.post(GROQ_URL, headers=headers, json=payload, timeout=10)
+        response = http.post(GROQ_URL, headers=headers, json=payload, timeout=10)
         response.raise_for_status()
         result = response.json()
         return result['choices'][0]['message']['content'].strip()
@@ -191,7 +191,7 @@ def terminal_chat(query, news_context, market_context, chart_context=None):
             "Authorization": f"Bearer {GROQ_API_KEY}",
             "Content-Type": "application/json"
         }
-        r = requests.post(GROQ_URL, headers=headers, json=payload, timeout=15)
+        r = http.post(GROQ_URL, headers=headers, json=payload, timeout=15)
         r.raise_for_status()
         return r.json()['choices'][0]['message']['content'].strip()
     except Exception as e:
@@ -207,7 +207,7 @@ def generate_daily_brief():
     # Avoid circular imports by importing inside function
     from .market import fetch_market_data
     from .macro import fetch_macro_data
-    from .macro import fetch_economic_calendar
+    from .econ_calendar import CALENDAR
 
     market = fetch_market_data()
     macro = fetch_macro_data()
@@ -245,8 +245,7 @@ def generate_daily_brief():
     lines.append(("GLOBAL", gl_line))
 
     # --- Watch line ---
-    calendar = fetch_economic_calendar()
-    upcoming = calendar[:3]
+    upcoming = CALENDAR.upcoming(3, min_importance="medium")
     if upcoming:
         watch_parts = [f"{e['event']} ({e['date']})" for e in upcoming]
         lines.append(("WATCH", " | ".join(watch_parts)))
@@ -1,6 +1,8 @@
-from .cache import get_cached
+from datetime import datetime
+from .fanout import fan_out
+from .levels import LEVELS, SOURCE_FEEDS
 from .market import fetch_market_data, fetch_gold_correlation
-from .macro import fetch_macro_data, fetch_turkey_macro, fetch_cbrt_tracker, fetch_equity_risk
+from .macro import fetch_macro_data, fetch_turkey_macro, fetch_cbrt_tracker, fetch_equity_risk, fetch_bond_yields
 from .scorecard import compute_scorecard
 from .alerts import SigmaScanner
 from .valuation import compute_fair_value
@@ -9,210 +11,172 @@ from .graph import get_impact_chain
 # Global scanner instance to share cache if implemented later
 SCANNER = SigmaScanner()
 
+# Per-stage budgets (seconds). A stage that misses its budget is reported as
+# "timeout" and the popup renders without it.
+STAGE_DEADLINES = {"alert": 2.5, "valuation": 2.5, "graph": 3.0, "seasonality": 3.0, "divergence": 2.5}
+# Stages whose output depends on the live value: never shared with a concurrent
+# call for another value, never patched from an older run
+LIVE_STAGES = {"alert", "valuation", "divergence"}
+
+
 def get_entity_analysis(key, current_value, change_pct=0.0):
     """
-    Orchestrates all analysis engines (Alerts, Valuation, Graph, Seasonality).
-    Returns a dict with 'alerts', 'valuation', 'graph', 'seasonality' keys.
+    Orchestrates all analysis engines (Alerts, Valuation, Graph, Seasonality,
+    Divergence) concurrently, each under its own deadline.
+    Returns a dict with 'alert', 'valuation', 'graph', 'seasonality',
+    'divergence' keys (whichever produced a result) plus '_stages':
+    {stage: {"status": "ok"|"stale"|"timeout"|"error"|"empty", "ms": int}}.
     """
-    result = {}
+    stages = {
+        "alert": lambda: SCANNER.check_anomaly(key, current_value),
+        "valuation": lambda: compute_fair_value(key, current_value),
+        "graph": lambda: get_impact_chain(key),
+        "seasonality": lambda: _seasonality_stage(key),
+        "divergence": lambda: _divergence_stage(key, current_value, change_pct),
+    }
+    # Wrapped so "no finding" (None) is a valid answer and only timeouts/errors
+    # fall back to the entity's last-known-good stage output.
+    tasks = {name: (lambda fn=fn: {"v": fn()}, STAGE_DEADLINES[name]) for name, fn in stages.items()}
+    outputs, status = fan_out(tasks, key_prefix=f"analysis:{key}", unshared=LIVE_STAGES)
 
-    # 1. Anomaly / Sigma Scanner
-    try:
-        # We need history for anomaly detection. 
-        # For optimization, we rely on cached history or fetch fresh if critical.
-        alert = SCANNER.check_anomaly(key, current_value)
-        if alert:
-            result["alert"] = alert
-    except Exception as e:
-        print(f"[resolver] Anomaly check failed for {key}: {e}")
-
-    # 2. Valuation Engine
-    try:
-        val_data = compute_fair_value(key, current_value)
-        if val_data:
-            result["valuation"] = val_data
-    except Exception as e:
-        print(f"[resolver] Valuation failed for {key}: {e}")
-
-    # 3. Graph / Second-Order
-    try:
-        chain = get_impact_chain(key)
-        if chain:
-            result["graph"] = chain
-    except Exception as e:
-        print(f"[resolver] Graph failed for {key}: {e}")
-
-    # 4. Seasonality
-    try:
-        # Only check seasonality for major assets (tickers)
-        if "." in key or "=" in key or key in ["usdtry", "eurtry", "xauusd", "bist100"]:
-             from .seasonality import get_monthly_seasonality
-             from .registry import resolve_entity # Fix NameError
-             
-             # Map simple keys to tickers if needed, but let's assume key is passable or resolver helps.
-             # Actually get_monthly_seasonality calls fetch_long_history(symbol).
-             # If key is "usdtry", fetch_long_history needs "USDTRY=X".
-             # We should use the entity's technical_key or symbol.
-             entity = resolve_entity(key)
-             if entity:
-                 sym = entity.get("technical_key") or entity.get("key")
-                 # Check if it's a valid ticker format for yfinance
-                 if sym:
-                     seas = get_monthly_seasonality(sym)
-                     if seas:
-                         result["seasonality"] = seas
-    except Exception as e:
-        print(f"[resolver] Seasonality failed for {key}: {e}")
-
-    # 5. Divergence Spotter
-    try:
-        related_metrics = {}
-        # Fetch CDS for USDTRY
-        if key == "usdtry":
-            cds_ent = resolve_entity("cds")
-            if cds_ent:
-                val, _, chg = get_current_level("cds", cds_ent)
-                if val: related_metrics["cds"] = {"value": val, "change_pct": chg}
-        
-        # Fetch VIX for BIST100
-        elif key == "bist100":
-             # VIX might be registered as 'vix' or part of macro
-             vix_ent = resolve_entity("vix") # Ensure 'vix' is in registry
-             if vix_ent:
-                 vix_val, _, vix_chg = get_current_level("vix", vix_ent)
-                 if vix_val: related_metrics["vix"] = {"value": vix_val, "change_pct": vix_chg}
-
-        if related_metrics:
-            div_alerts = SCANNER.check_divergence(key, current_value, change_pct, related_metrics)
-            if div_alerts:
-                # Merge with existing alert if any, or create list
-                # Currently 'alert' key is a single dict. We might need a list 'alerts'.
-                # For now, let's just REPLACE 'alert' if it's None, or append to a new 'divergence' key.
-                # Let's use a new key 'divergence' for clarity in UI.
-                result["divergence"] = div_alerts[0] # Just take the first one for now
-                
-    except Exception as e:
-        print(f"[resolver] Divergence failed for {key}: {e}")
-        
+    result = {}
+    for name, out in outputs.items():
+        if out and out["v"]:
+            result[name] = out["v"]
+    result["_stages"] = status
     return result
 
+def _seasonality_stage(key):
+    # Precomputed daily for every tracked symbol: a table read, never a download.
+    # Market entities are stored under their ticker ("usdtry" -> "USDTRY=X").
+    from .seasonality import get_monthly_seasonality
+    from .registry import resolve_entity
+    entity = resolve_entity(key)
+    if not entity: return None
+    sym = entity.get("technical_key") if entity.get("source") == "market" else None
+    return get_monthly_seasonality(sym or entity["key"])
+
+def _divergence_stage(key, current_value, change_pct):
+    # Rules are evaluated for every pair at once and cached (engine.divergence);
+    # the popup only picks its own. First one only for now.
+    from .divergence import DIVERGENCE
+    hits = DIVERGENCE.for_entity(key)
+    if not hits: return None
+    return {"type": hits[0]["type"], "level": hits[0]["level"], "message": hits[0]["message"]}
+
+def get_related_levels(entities, deadline=2.0):
+    """
+    Live levels for a list of registry entities. Feeds no fetcher has
+    published yet are filled concurrently first; sources that miss the
+    deadline leave their entities with None values.
+    """
+    warm_levels(entities, deadline=deadline)
+    out = []
+    for e in entities:
+        val, unit, chg = get_current_level(e["key"], e)
+        out.append({**e, "current_value": val, "current_unit": unit or e.get("unit"), "change_pct": chg})
+    return out
+
 def get_current_level(entity_key, entity_data):
     """
     Given an entity key (e.g. 'usdtry') and its registry data (dict),
-    attempt to find its current live value from the various engine caches.
+    return its live value from the level store (see engine.levels).
+    Never fetches: a feed nobody has published yet reads as missing.
     Returns (value, unit, change_pct) or (None, None, None).
     """
-    tech_key = entity_data.get("technical_key")
-    source = entity_data.get("source")
-    
-    # Proactive Fetching if cache empty
-    def get_or_fetch(cache_key, fetch_func):
-        val = get_cached(cache_key)
-        if val is None:
-            try:
-                # Some compute functions don't take args, others might. 
-                # Most fetchers are arg-less.
-                return fetch_func()
-            except Exception:
-                return None
-        return val
-
-    # 1. Market Data (Direct Ticker)
-    if source == "market":
-        market = get_or_fetch("market", fetch_market_data)
-        if market and tech_key in market:
-            m = market[tech_key]
-            return m.get("price"), entity_data.get("unit"), m.get("change_pct")
-
-    # 2. Macro Data (Policy Rates, Bonds, CDS)
-    if source == "macro":
-        macro = get_or_fetch("macro", fetch_macro_data)
-        if macro:
-            # Check Policy Rates
-            if tech_key in macro.get("policy_rates", {}):
-                return macro["policy_rates"][tech_key], "%", None
-            # Check Bonds
-            if tech_key in macro.get("bonds", {}):
-                val = macro["bonds"][tech_key]
-                unit = "%"
-                if tech_key in ["spread", "tr_yield_curve", "risk_premium"]:
-                     unit = "bps"
-                     val = val * 100 if isinstance(val, (int, float)) else val
-                return val, unit, None
-            # Check CDS
-            if tech_key == "cds" and macro.get("cds"):
-                return macro["cds"].get("val"), "bps", None
-
-    # 3. Turkey Macro / EVDS+CALC
-    if source == "macro" or source == "EVDS+CALC":
-        tm = get_or_fetch("turkey_macro", fetch_turkey_macro)
-        if tm:
-            for item in tm:
-                if item.get("key") == entity_key or item.get("key") == tech_key:
-                    return item.get("last"), item.get("unit"), None
-
-    # 4. ERP Specific
-    if source == "equity_risk":
-        erp = get_or_fetch("erp", fetch_equity_risk)
-        if erp and tech_key in erp:
-            return erp[tech_key], entity_data.get("unit", "%"), None
-        # Bonds are also under equity_risk sometimes in registry
-        macro = get_or_fetch("macro", fetch_macro_data)
-        if macro and tech_key in macro.get("bonds", {}):
-            return macro["bonds"][tech_key], "%", None
-
-    # 5. CBRT Tracker
-    if source == "cbrt":
-        cbrt = get_or_fetch("cbrt_tracker", fetch_cbrt_tracker)
-        if cbrt:
-            if tech_key == "aofm" or tech_key == "policy_rate":
-                return cbrt.get("current_rate"), "%", None
-            if tech_key == "next_meeting":
-                return cbrt.get("next_meeting"), "", None
-
-    # 6. Scorecard / Correlation
-    if source == "gold_corr":
-        gc = get_or_fetch("gold_corr", fetch_gold_correlation)
-        if gc:
-            if tech_key == "gold_corr" or tech_key == "composite":
-                return gc.get("corr_usd"), "", None
-    
-    if source == "scorecard":
-        sc = get_or_fetch("scorecard", compute_scorecard)
-        if sc and tech_key == "composite":
-            return sc.get("composite"), "pts", None
-
-    # 7. Banking Monitor
-    if source == "banking":
-        from .macro import fetch_banking_monitor
-        bm = get_or_fetch("banking_monitor", fetch_banking_monitor)
-        if bm and tech_key in bm:
-             return bm[tech_key], entity_data.get("unit"), None
-
-    # 8. Sentiment (Google Trends)
-    if source == "sentiment":
-        from .macro import fetch_sentiment_dashboard
-        sent = get_or_fetch("sentiment", fetch_sentiment_dashboard)
-        if sent:
-            # key is "panic_score" or "greed_score"
-            # tech_key is "panic" or "greed"
-            # but TrendsExtractor returns "panic_score", "greed_score"
-            # registry tech_key is "panic", "greed".
-            # Mapping: panic -> panic_score
-            mapped_key = f"{tech_key}_score" if not tech_key.endswith("_score") else tech_key
-            if mapped_key in sent:
-                 return sent[mapped_key], entity_data.get("unit"), None
-            # Or direct match
-            if tech_key in sent:
-                 return sent[tech_key], entity_data.get("unit"), None
-
-    # 9. Trade (TİM)
-    if source == "trade":
-        from .macro import fetch_trade_data
-        trade = get_or_fetch("trade", fetch_trade_data)
-        if trade:
-            if tech_key == "total_exports":
-                # Add sectors to related values in the future?
-                return trade.get("total_exports"), entity_data.get("unit"), None
-
-    return None, None, None
+    val, unit, chg = LEVELS.level(entity_key)
+    if val is None and entity_data.get("source") == "market" and entity_data.get("technical_key"):
+        # Raw tickers are stored under their symbol
+        val, unit, chg = LEVELS.level(entity_data["technical_key"])
+        unit = entity_data.get("unit", unit)
+    return val, unit, chg
+
+
+def _source_feeds(source):
+    """(cache_key, fetcher) pairs carrying the levels of a registry source."""
+    from .macro import fetch_banking_monitor, fetch_sentiment_dashboard, fetch_trade_data
+    fetchers = {
+        "market": fetch_market_data, "macro": fetch_macro_data, "bonds": fetch_bond_yields,
+        "turkey_macro": fetch_turkey_macro, "erp": fetch_equity_risk, "cbrt_tracker": fetch_cbrt_tracker,
+        "gold_corr": fetch_gold_correlation, "scorecard": compute_scorecard,
+        "banking_monitor": fetch_banking_monitor, "sentiment": fetch_sentiment_dashboard,
+        "trade": fetch_trade_data,
+    }
+    return [(feed, fetchers[feed]) for feed in SOURCE_FEEDS.get(source, [])]
+
+
+def warm_levels(entities, deadline=8.0):
+    """
+    Run the fetchers for entities the level store has not seen yet, once
+    per feed and concurrently, and publish what comes back. Entities that
+    already have a level cost nothing.
+    """
+    feeds = {}
+    for e in entities:
+        tech = e.get("technical_key")
+        if LEVELS.has(e["key"]) or (tech and LEVELS.has(tech)): continue
+        for cache_key, fn in _source_feeds(e.get("source")):
+            feeds[cache_key] = fn
+    if not feeds: return
+    results, _ = fan_out(feeds, deadline=deadline)
+    for cache_key, data in results.items():
+        LEVELS.publish(cache_key, data)  # Fetchers that skip set_cached (or returned stale data) still land
+
+
+def get_entities_batch(keys, history_period=None):
+    """
+    Resolve many entities in one pass: cold feeds warmed once each, levels
+    read from the level store, and (optionally) close histories fetched once per distinct
+    symbol and aligned on common dates.
+    Returns {"entities": {key: entity | {"error": ...}}, "history": {...}?}.
+    """
+    from .registry import resolve_entity
+    from .db import get_override
+    resolved = {}
+    for key in keys:
+        entity = resolve_entity(key)
+        resolved[key] = entity
+    found = list({e["key"]: e for e in resolved.values() if e}.values())
+    warm_levels(found)
+
+    out = {}
+    for key, entity in resolved.items():
+        if not entity:
+            out[key] = {"key": key, "error": "Entity not found"}
+            continue
+        val, unit, chg = get_current_level(entity["key"], entity)
+        out[key] = {**entity, "current_value": val, "current_unit": unit or entity.get("unit"),
+                    "change_pct": chg, "override": get_override(entity["key"])}
+    result = {"entities": out}
+    if history_period:
+        result["history"] = _aligned_history(found, history_period)
+    return result
+
+
+def _aligned_history(entities, period):
+    """
+    Daily closes for chartable entities on the dates they all share.
+    Overlapping symbols (e.g. @bist100 and @XU100.IS) are fetched once.
+    """
+    from .market import fetch_history
+    symbols = {}
+    for e in entities:
+        if e.get("source") == "market" and e.get("technical_key"):
+            symbols.setdefault(e["technical_key"], []).append(e["key"])
+    if not symbols: return {"dates": [], "series": {}}
+    fetched, _ = fan_out({sym: (lambda sym=sym: fetch_history(sym, period)) for sym in symbols}, deadline=10.0)
+
+    closes = {}
+    for sym, rows in fetched.items():
+        if not rows: continue
+        by_day = {}
+        for r in rows:
+            by_day[datetime.utcfromtimestamp(r["time"]).strftime("%Y-%m-%d")] = r["close"]
+        closes[sym] = by_day
+    if not closes: return {"dates": [], "series": {}}
+    dates = sorted(set.intersection(*(set(c) for c in closes.values())))
+    series = {}
+    for sym, by_day in closes.items():
+        for key in symbols[sym]:
+            series[key] = [by_day[d] for d in dates]
+    return {"dates": dates, "series": series}
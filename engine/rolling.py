@@ -0,0 +1,176 @@
+"""
+The Rolling Window
+==================
+"Keep the tally; don't recount the room."
+Per-series rolling statistics updated one bar at a time.
+
+    * RollingWindow: the last `size` values with a windowed Welford mean /
+      variance and monotonic min / max deques, so push, mean, std, z, min
+      and max are all O(1) (amortized).
+    * RollingStats: one window per symbol, persisted bar by bar in the
+      price_history table. After a restart a window is rebuilt from the
+      local store instead of re-downloading history; only bars newer than
+      the last stored one are ever added. Bars are stamped at UTC
+      midnight of their session's date whatever the exchange's time zone
+      (day_epoch), so one session is one bar however it was downloaded.
+    * Freshness: a window is stale only once the next weekday's bar should
+      have closed (its UTC day is over), so a window holding yesterday's
+      close (or Friday's, over the weekend) is fresh and costs no download.
+      Completed bars are kept; only a bar whose day is still running is
+      treated as the session in progress.
+"""
+import math
+import time
+import threading
+from collections import deque
+from .db import save_price_history, get_price_history
+
+WINDOW = 63            # ~3 months of daily bars (what SigmaScanner used to download)
+MIN_BARS = 20          # Below this a z-score is not meaningful
+DAY = 86400
+RETRY_SECONDS = 1800        # Stale or short windows look for bars at most this often
+
+
+def day_epoch(t):
+    """
+    UTC midnight of a daily bar's calendar date. Accepts stamps at any
+    exchange's local midnight (UTC-12 .. UTC+12) as well as UTC midnight.
+    """
+    return (int(t) + DAY // 2) // DAY * DAY
+
+
+def next_bar_due(last_time):
+    """Epoch at which the first weekday bar after `last_time` has closed (its UTC day is over)."""
+    d = day_epoch(last_time) + DAY
+    while time.gmtime(d).tm_wday >= 5:
+        d += DAY
+    return d + DAY
+
+
+def closed_bars(bars, now=None):
+    """(time, close) bars whose day is over; today's bar is the session in progress."""
+    now = now or time.time()
+    return [(t, c) for t, c in bars if day_epoch(t) + DAY <= now]
+
+
+class RollingWindow:
+    __slots__ = ("size", "values", "n", "mean", "m2", "last_time", "_seq", "_min", "_max")
+
+    def __init__(self, size=WINDOW):
+        self.size = size
+        self.values = deque()
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+        self.last_time = None
+        self._seq = 0
+        self._min = deque()  # (seq, value), increasing values
+        self._max = deque()  # (seq, value), decreasing values
+
+    def push(self, x, t=None):
+        """Append one value, evicting the oldest once the window is full."""
+        x = float(x)
+        if len(self.values) == self.size:
+            self._evict()
+        self.values.append(x)
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        seq = self._seq
+        self._seq += 1
+        while self._min and self._min[-1][1] >= x: self._min.pop()
+        self._min.append((seq, x))
+        while self._max and self._max[-1][1] <= x: self._max.pop()
+        self._max.append((seq, x))
+        if t is not None: self.last_time = t
+
+    def _evict(self):
+        y = self.values.popleft()
+        oldest = self._seq - self.n
+        if self.n == 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+        else:
+            old_mean = self.mean
+            self.mean = (self.n * old_mean - y) / (self.n - 1)
+            self.m2 = max(0.0, self.m2 - (y - old_mean) * (y - self.mean))
+            self.n -= 1
+        if self._min and self._min[0][0] == oldest: self._min.popleft()
+        if self._max and self._max[0][0] == oldest: self._max.popleft()
+
+    def std(self):
+        """Sample standard deviation (same as statistics.stdev)."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def z(self, x):
+        """Z-score of `x` against the window (0.0 when undefined)."""
+        sd = self.std()
+        return (x - self.mean) / sd if sd > 0 else 0.0
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+
+class RollingStats:
+    def __init__(self, size=WINDOW, persist=True):
+        self.size = size
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._checked = {}  # symbol -> last time new bars were looked for
+
+    def window(self, symbol):
+        """The symbol's window, rebuilt from price_history on first use."""
+        with self._lock:
+            w = self._windows.get(symbol)
+            if w is None:
+                w = RollingWindow(self.size)
+                if self.persist:
+                    for t, close in get_price_history(symbol, limit=self.size):
+                        w.push(close, t)
+                self._windows[symbol] = w
+            return w
+
+    def add_bars(self, symbol, bars):
+        """
+        Fold (time, close) bars into the window; only sessions newer than the
+        last one held are pushed (and stored). Returns how many were new.
+        """
+        w = self.window(symbol)
+        by_day = {day_epoch(t): c for t, c in sorted(bars) if c is not None}
+        with self._lock:
+            new = [(t, c) for t, c in sorted(by_day.items()) if w.last_time is None or t > w.last_time]
+            for t, c in new:
+                w.push(c, t)
+        if new and self.persist:
+            save_price_history(symbol, new)
+        return len(new)
+
+    def replace(self, symbol, values):
+        """Rebuild a window from bare values (no timestamps, not persisted)."""
+        w = RollingWindow(self.size)
+        for v in values:
+            if v is not None: w.push(v)
+        with self._lock:
+            self._windows[symbol] = w
+        return w
+
+    def is_stale(self, symbol, now=None):
+        """True once the bar after the window's newest one should have closed."""
+        w = self.window(symbol)
+        return w.last_time is None or (now or time.time()) >= next_bar_due(w.last_time)
+
+    def needs_bars(self, symbol, now=None):
+        """True if the window is short or stale and we haven't looked lately."""
+        now = now or time.time()
+        w = self.window(symbol)
+        if w.n >= MIN_BARS and not self.is_stale(symbol, now): return False
+        if now - self._checked.get(symbol, 0) < RETRY_SECONDS: return False
+        self._checked[symbol] = now
+        return True
+
+
+ROLLING = RollingStats()
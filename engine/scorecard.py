@@ -5,10 +5,77 @@ Aggregates all study-case metrics into a single RISK-ON / RISK-OFF / NEUTRAL
 signal with a composite score from -100 (maximum risk-off) to +100 (maximum risk-on).
 
 Each metric is scored from -1 (bearish) to +1 (bullish) and weighted.
-"""
 
-from .macro import fetch_turkey_macro, fetch_macro_data, fetch_equity_risk
+    * The bands live in one table (RULES), so the live card and the
+      backtest score the same inputs the same way. `score_matrix` scores
+      any number of input rows in one NumPy pass.
+    * Inputs are declared per metric (METRIC_SOURCES). Their sources are
+      fetched concurrently under one deadline and share in-flight calls.
+      A source that misses the deadline falls back to its last good value.
+      Otherwise the card is computed without it and the gap is listed under
+      "missing".
+    * The card is cached under "scorecard" (which also feeds the level
+      store), so the resolver and the daily brief reuse it.
+    * Every refresh that changes the inputs is stored in the
+      scorecard_history table.
+    * `backtest()` recomputes the composite from the stored inputs and
+      joins each trading day to the last refresh before it. It then reports
+      forward BIST100 / USDTRY returns for each signal bucket.
+"""
+import time
+import threading
+from datetime import datetime
+import numpy as np
+from .macro import fetch_turkey_macro, fetch_macro_data, fetch_equity_risk, fetch_bond_yields
 from .market import fetch_gold_correlation
+from .db import save_scorecard_point, get_scorecard_history, get_price_history_rows
+from .cache import get_cached, set_cached, invalidate
+from .fanout import fan_out, run_shared
+
+# metric -> (comparison, [(threshold, score, signal), ...], (fallback score, signal), value format)
+# Bands are tested in order; the first that holds wins.
+RULES = {
+    # Yield Curve (TR 10Y - TR 2Y): positive = normal (risk-on), negative = inverted (recession signal)
+    "yield_curve": (">", [(2, 1.0, "STEEP (Normal)"), (0, 0.3, "FLAT (Watch)"), (-1, -0.5, "INVERTED (Warning)")],
+                    (-1.0, "DEEP INVERSION (Danger)"), "{:.2f}%"),
+    # Real Carry (TR real deposit - US real fed funds): positive = Lira attractive
+    "real_carry": (">", [(5, 1.0, "STRONG CARRY"), (0, 0.5, "POSITIVE CARRY"), (-3, -0.3, "NEGATIVE CARRY")],
+                   (-1.0, "CAPITAL FLIGHT RISK"), "{:.1f}%"),
+    # PPI-CPI Gap: positive gap = margin squeeze on producers (bearish for equities)
+    "ppi_cpi_gap": ("<", [(-5, 0.5, "DEFLATIONARY (Margins expanding)"), (0, 0.3, "HEALTHY"), (5, -0.3, "COST PRESSURE")],
+                    (-1.0, "MARGIN SQUEEZE"), "{:.1f} pts"),
+    # Equity Risk Premium: positive = stocks cheap vs bonds (risk-on)
+    "erp": (">", [(3, 1.0, "STOCKS CHEAP"), (0, 0.3, "STOCKS FAIR"), (-5, -0.5, "BONDS ATTRACTIVE")],
+            (-1.0, "STOCKS EXPENSIVE"), "{:.1f}%"),
+    # CDS / Sovereign Risk
+    "cds": ("<", [(200, 1.0, "LOW RISK"), (350, 0.3, "MODERATE"), (500, -0.5, "ELEVATED")],
+            (-1.0, "DISTRESSED"), "{:.0f} bps"),
+    # Gold Correlation (FX Hedge vs Commodity)
+    "gold_corr": (">", [(0.85, -0.8, "PURE FX HEDGE (Lira fear)"), (0.5, -0.3, "MIXED DRIVER")],
+                  (0.5, "COMMODITY PLAY (Healthy)"), "{}"),
+}
+WEIGHTS = {
+    "yield_curve": 0.20,
+    "real_carry": 0.20,
+    "ppi_cpi_gap": 0.10,
+    "erp": 0.20,
+    "cds": 0.20,
+    "gold_corr": 0.10,
+}
+METRICS = tuple(RULES)
+SIGNALS = ("RISK-OFF", "NEUTRAL", "RISK-ON")
+SIGNAL_BAND = 25          # composite > +25 -> RISK-ON, < -25 -> RISK-OFF
+
+BACKTEST_ASSETS = {"bist100": "XU100.IS", "usdtry": "USDTRY=X"}
+BACKTEST_HORIZONS = (1, 5, 20)   # Trading days forward
+MAX_INPUT_AGE_DAYS = 7           # A day is scored only if a refresh happened this recently
+BAR_CLOSE_OFFSET = 15 * 3600     # Bars are stamped at UTC midnight of their date; BIST closes 18:00 Istanbul (15:00 UTC),
+                                 # the earliest close of BACKTEST_ASSETS, so no asset sees a later signal
+MIN_RECORD_SECONDS = 60          # Changed inputs are recorded at most this often...
+HEARTBEAT_SECONDS = 86400        # ...unchanged ones once a day, so quiet stretches stay scored
+
+_record_lock = threading.Lock()
+_last_recorded = {"epoch": 0, "inputs": None}
 
 
 def _safe_float(val):
@@ -30,142 +97,264 @@ def _find_metric(store, key):
     return None
 
 
-def compute_scorecard():
+# ── Scoring (shared by the live card and the backtest) ───────────────
+def score_matrix(inputs):
     """
-    Compute aggregate macro scorecard.
-    Returns dict with individual scores, composite score, and signal.
+    Score an (n x len(METRICS)) input matrix (NaN = missing) in one pass.
+    Returns (scores, band index) matrices; missing inputs score NaN / -1.
     """
-    # Fetch all data sources
-    turkey_macro = fetch_turkey_macro()
-    macro_data = fetch_macro_data()
-    erp_data = fetch_equity_risk()
-    gold_corr = fetch_gold_correlation()
+    x = np.atleast_2d(np.asarray(inputs, dtype=float))
+    scores = np.full(x.shape, np.nan)
+    bands = np.full(x.shape, -1, dtype=int)
+    for j, m in enumerate(METRICS):
+        op, steps, (fallback, _), _ = RULES[m]
+        v = x[:, j]
+        with np.errstate(invalid="ignore"):
+            conds = [v > t if op == ">" else v < t for t, _, _ in steps]
+        have = ~np.isnan(v)
+        scores[:, j] = np.where(have, np.select(conds, [s for _, s, _ in steps], default=fallback), np.nan)
+        bands[:, j] = np.where(have, np.select(conds, range(len(steps)), default=len(steps)), -1)
+    return scores, bands
+
+
+def composite_scores(scores, weights=None):
+    """Weighted mean of the available scores, scaled to -100..+100 (0 when none)."""
+    w = np.array([(weights or WEIGHTS)[m] for m in METRICS], dtype=float)
+    have = ~np.isnan(scores)
+    total = (have * w).sum(axis=1)
+    weighted = np.where(have, scores, 0.0) @ w
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, weighted / total * 100, 0.0)
+
+
+def signal_index(composite):
+    """0 = RISK-OFF, 1 = NEUTRAL, 2 = RISK-ON (index into SIGNALS)."""
+    composite = np.asarray(composite, dtype=float)
+    return np.where(composite > SIGNAL_BAND, 2, np.where(composite > -SIGNAL_BAND, 1, 0))
+
+
+# ── Live card ────────────────────────────────────────────────────────
+def _input_sources():
+    """Source name -> fetcher; every scorecard input comes from one of these."""
+    return {
+        "turkey_macro": fetch_turkey_macro,
+        "macro": fetch_macro_data,
+        "erp": fetch_equity_risk,
+        "gold_corr": fetch_gold_correlation,
+        "bonds": fetch_bond_yields,  # Shared source: macro and ERP read it too, one in-flight round serves all
+    }
+
+
+# metric -> sources it is computed from (missing metrics are reported with these)
+METRIC_SOURCES = {
+    "yield_curve": ("bonds",),
+    "real_carry": ("macro", "turkey_macro", "bonds"),
+    "ppi_cpi_gap": ("turkey_macro",),
+    "erp": ("erp",),
+    "cds": ("turkey_macro", "macro"),
+    "gold_corr": ("gold_corr",),
+}
+SCORECARD_TTL = 120
+SCORECARD_DEADLINE = 8.0   # After this the card is computed from whatever sources arrived
 
-    bonds = macro_data.get("bonds", {}) if macro_data else {}
+
+def _fetch_sources():
+    """All sources at once under SCORECARD_DEADLINE; a late one drops the cached card when it lands."""
+    return fan_out(_input_sources(), deadline=SCORECARD_DEADLINE, key_prefix="scorecard_src",
+                   on_late=lambda name: invalidate("scorecard"))
+
+
+def scorecard_inputs(sources=None):
+    """
+    Raw input value per metric (None when a source is unavailable).
+    `sources` = {source name: payload}; fetched concurrently when omitted.
+    """
+    if sources is None:
+        sources, _ = _fetch_sources()
+    turkey_macro = sources.get("turkey_macro")
+    macro_data = sources.get("macro")
+    erp_data = sources.get("erp")
+    gold_corr = sources.get("gold_corr")
+
+    bonds = sources.get("bonds") or {}
     rates = macro_data.get("policy_rates", {}) if macro_data else {}
 
-    scores = {}
+    inputs = dict.fromkeys(METRICS)
 
-    # ─── 1. Yield Curve (TR 10Y - TR 2Y) ───
-    # Positive = normal (risk-on), Negative = inverted (recession signal)
     tr_10y = _safe_float(bonds.get("tr_10y"))
     tr_2y = _safe_float(bonds.get("tr_2y"))
     if tr_10y is not None and tr_2y is not None:
-        spread = tr_10y - tr_2y
-        if spread > 2:
-            scores["yield_curve"] = {"score": 1.0, "value": f"{spread:.2f}%", "signal": "STEEP (Normal)"}
-        elif spread > 0:
-            scores["yield_curve"] = {"score": 0.3, "value": f"{spread:.2f}%", "signal": "FLAT (Watch)"}
-        elif spread > -1:
-            scores["yield_curve"] = {"score": -0.5, "value": f"{spread:.2f}%", "signal": "INVERTED (Warning)"}
-        else:
-            scores["yield_curve"] = {"score": -1.0, "value": f"{spread:.2f}%", "signal": "DEEP INVERSION (Danger)"}
+        inputs["yield_curve"] = tr_10y - tr_2y
 
-    # ─── 2. Real Carry ───
-    # Positive = Lira attractive (risk-on for TRY assets)
     deposit = _safe_float(rates.get("deposit"))
     cpi = _find_metric(turkey_macro, "cpi")
     fed = _safe_float(bonds.get("fed_funds"))
     us_cpi = _safe_float(bonds.get("us_cpi"))
-
     if all(v is not None for v in [deposit, cpi, fed, us_cpi]):
-        tr_real = deposit - cpi
-        us_real = fed - us_cpi
-        carry = tr_real - us_real
-        if carry > 5:
-            scores["real_carry"] = {"score": 1.0, "value": f"{carry:.1f}%", "signal": "STRONG CARRY"}
-        elif carry > 0:
-            scores["real_carry"] = {"score": 0.5, "value": f"{carry:.1f}%", "signal": "POSITIVE CARRY"}
-        elif carry > -3:
-            scores["real_carry"] = {"score": -0.3, "value": f"{carry:.1f}%", "signal": "NEGATIVE CARRY"}
-        else:
-            scores["real_carry"] = {"score": -1.0, "value": f"{carry:.1f}%", "signal": "CAPITAL FLIGHT RISK"}
-
-    # ─── 3. PPI-CPI Gap ───
-    # Positive gap = margin squeeze on producers (bearish for equities)
-    ppi_cpi = _find_metric(turkey_macro, "ppi_cpi_gap")
-    if ppi_cpi is not None:
-        if ppi_cpi < -5:
-            scores["ppi_cpi_gap"] = {"score": 0.5, "value": f"{ppi_cpi:.1f} pts", "signal": "DEFLATIONARY (Margins expanding)"}
-        elif ppi_cpi < 0:
-            scores["ppi_cpi_gap"] = {"score": 0.3, "value": f"{ppi_cpi:.1f} pts", "signal": "HEALTHY"}
-        elif ppi_cpi < 5:
-            scores["ppi_cpi_gap"] = {"score": -0.3, "value": f"{ppi_cpi:.1f} pts", "signal": "COST PRESSURE"}
-        else:
-            scores["ppi_cpi_gap"] = {"score": -1.0, "value": f"{ppi_cpi:.1f} pts", "signal": "MARGIN SQUEEZE"}
-
-    # ─── 4. Equity Risk Premium (ERP) ───
-    # Positive = stocks cheap vs bonds (risk-on), Negative = bonds dominate
-    erp = _safe_float(erp_data.get("erp")) if erp_data else None
-    if erp is not None:
-        if erp > 3:
-            scores["erp"] = {"score": 1.0, "value": f"{erp:.1f}%", "signal": "STOCKS CHEAP"}
-        elif erp > 0:
-            scores["erp"] = {"score": 0.3, "value": f"{erp:.1f}%", "signal": "STOCKS FAIR"}
-        elif erp > -5:
-            scores["erp"] = {"score": -0.5, "value": f"{erp:.1f}%", "signal": "BONDS ATTRACTIVE"}
-        else:
-            scores["erp"] = {"score": -1.0, "value": f"{erp:.1f}%", "signal": "STOCKS EXPENSIVE"}
+        inputs["real_carry"] = (deposit - cpi) - (fed - us_cpi)
+
+    inputs["ppi_cpi_gap"] = _find_metric(turkey_macro, "ppi_cpi_gap")
+    inputs["erp"] = _safe_float(erp_data.get("erp")) if erp_data else None
 
-    # ─── 5. CDS / Sovereign Risk ───
     cds = _find_metric(turkey_macro, "cds_5y") if turkey_macro else None
     if cds is None:
         # Try from macro_data
         cds = _safe_float(macro_data.get("cds", {}).get("value")) if macro_data else None
-    if cds is not None:
-        if cds < 200:
-            scores["cds"] = {"score": 1.0, "value": f"{cds:.0f} bps", "signal": "LOW RISK"}
-        elif cds < 350:
-            scores["cds"] = {"score": 0.3, "value": f"{cds:.0f} bps", "signal": "MODERATE"}
-        elif cds < 500:
-            scores["cds"] = {"score": -0.5, "value": f"{cds:.0f} bps", "signal": "ELEVATED"}
-        else:
-            scores["cds"] = {"score": -1.0, "value": f"{cds:.0f} bps", "signal": "DISTRESSED"}
-
-    # ─── 6. Gold Correlation (FX Hedge vs Commodity) ───
-    corr_usd = _safe_float(gold_corr.get("corr_usd")) if gold_corr else None
-    if corr_usd is not None:
-        if corr_usd > 0.85:
-            scores["gold_corr"] = {"score": -0.8, "value": f"{corr_usd}", "signal": "PURE FX HEDGE (Lira fear)"}
-        elif corr_usd > 0.5:
-            scores["gold_corr"] = {"score": -0.3, "value": f"{corr_usd}", "signal": "MIXED DRIVER"}
-        else:
-            scores["gold_corr"] = {"score": 0.5, "value": f"{corr_usd}", "signal": "COMMODITY PLAY (Healthy)"}
-
-    # ─── Composite Score ───
-    weights = {
-        "yield_curve": 0.20,
-        "real_carry": 0.20,
-        "ppi_cpi_gap": 0.10,
-        "erp": 0.20,
-        "cds": 0.20,
-        "gold_corr": 0.10,
-    }
+    inputs["cds"] = cds
 
-    total_weight = 0
-    weighted_sum = 0
-    for key, w in weights.items():
-        if key in scores:
-            weighted_sum += scores[key]["score"] * w
-            total_weight += w
-
-    if total_weight > 0:
-        composite = (weighted_sum / total_weight) * 100  # Scale to -100 to +100
-    else:
-        composite = 0
-
-    # Signal
-    if composite > 25:
-        signal = "RISK-ON"
-    elif composite > -25:
-        signal = "NEUTRAL"
-    else:
-        signal = "RISK-OFF"
+    inputs["gold_corr"] = _safe_float(gold_corr.get("corr_usd")) if gold_corr else None
+    return inputs
 
-    return {
+
+def record_scorecard(inputs, composite, signal, now=None):
+    """Store a refresh in scorecard_history if its inputs changed (or a day has passed)."""
+    now = now or time.time()
+    with _record_lock:
+        age = now - _last_recorded["epoch"]
+        if age < MIN_RECORD_SECONDS or (inputs == _last_recorded["inputs"] and age < HEARTBEAT_SECONDS):
+            return False
+        _last_recorded.update(epoch=now, inputs=dict(inputs))
+    try:
+        save_scorecard_point({**inputs, "epoch": now, "composite": composite, "signal": signal,
+                              "timestamp": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")})
+    except Exception as e:
+        print(f"[scorecard] History write failed: {e}")
+        return False
+    return True
+
+
+def compute_scorecard():
+    """
+    Compute aggregate macro scorecard (cached under "scorecard").
+    Returns dict with individual scores, composite score, and signal.
+    Concurrent cold callers share one computation.
+    """
+    cached = get_cached("scorecard", ttl_seconds=SCORECARD_TTL)
+    if cached is not None: return cached
+    return run_shared("src:scorecard", _compute_scorecard)
+
+
+def _compute_scorecard():
+    sources, status = _fetch_sources()
+    inputs = scorecard_inputs(sources)
+    row = [np.nan if inputs[m] is None else inputs[m] for m in METRICS]
+    scores_row, bands_row = score_matrix([row])
+
+    scores = {}
+    for j, m in enumerate(METRICS):
+        band = bands_row[0, j]
+        if band < 0: continue
+        _, steps, (_, fallback_signal), fmt = RULES[m]
+        sig = steps[band][2] if band < len(steps) else fallback_signal
+        scores[m] = {"score": float(scores_row[0, j]), "value": fmt.format(inputs[m]), "signal": sig}
+
+    composite = round(float(composite_scores(scores_row)[0]), 1)
+    signal = SIGNALS[int(signal_index(composite))]
+    record_scorecard(inputs, composite, signal)
+
+    # Metrics left out, with the sources that did not deliver in time
+    missing = {m: [src for src in METRIC_SOURCES[m] if status[src]["status"] not in ("ok", "stale")]
+               for m in METRICS if m not in scores}
+
+    result = {
         "scores": scores,
-        "composite": round(composite, 1),
+        "composite": composite,
         "signal": signal,
         "metrics_available": len(scores),
-        "metrics_total": len(weights),
+        "metrics_total": len(WEIGHTS),
+        "missing": missing,
+        "_sources": status,
+    }
+    set_cached("scorecard", result)
+    return result
+
+
+# ── Backtest ─────────────────────────────────────────────────────────
+def _asof(times, at, max_age):
+    """Index of the last `times` entry at or before each `at` (-1 if none or too old)."""
+    idx = np.searchsorted(times, at, side="right") - 1
+    ok = idx >= 0
+    ok[ok] &= at[ok] - times[idx[ok]] <= max_age
+    return np.where(ok, idx, -1)
+
+
+def bucket_forward_returns(signal_idx, closes, horizons=BACKTEST_HORIZONS):
+    """
+    Forward returns of `closes` grouped by signal bucket (-1 = unscored day).
+    Returns {"<h>d": {signal: {count, mean, median, hit_rate}}}.
+    """
+    closes = np.asarray(closes, dtype=float)
+    out = {}
+    for h in horizons:
+        fwd = np.full(len(closes), np.nan)
+        if len(closes) > h:
+            fwd[:-h] = closes[h:] / closes[:-h] - 1
+        keep = (signal_idx >= 0) & ~np.isnan(fwd)
+        b, r = signal_idx[keep], fwd[keep]
+        count = np.bincount(b, minlength=len(SIGNALS))
+        total = np.bincount(b, weights=r, minlength=len(SIGNALS))
+        wins = np.bincount(b, weights=(r > 0).astype(float), minlength=len(SIGNALS))
+        order = np.lexsort((r, b))   # Sorted by bucket, then return -> medians by offset
+        starts = np.concatenate([[0], np.cumsum(count)[:-1]])
+        stats = {}
+        for k, sig in enumerate(SIGNALS):
+            n = int(count[k])
+            if n == 0:
+                stats[sig] = {"count": 0, "mean": None, "median": None, "hit_rate": None}
+                continue
+            seg = r[order[starts[k]:starts[k] + n]]
+            stats[sig] = {"count": n, "mean": round(float(total[k] / n) * 100, 3),
+                          "median": round(float(np.median(seg)) * 100, 3),
+                          "hit_rate": round(float(wins[k] / n), 3)}
+        out[f"{h}d"] = stats
+    return out
+
+
+def backtest(history=None, prices=None, weights=None, horizons=BACKTEST_HORIZONS):
+    """
+    Replay the scorecard over stored inputs and measure what each call was worth.
+        history: scorecard_history rows (default: the whole table).
+        prices:  {asset: [(time, close), ...]}, bars stamped at UTC midnight of their
+                 date (default: BACKTEST_ASSETS from price_history).
+        weights: alternative metric weights to test (default: WEIGHTS).
+    Returns per-asset forward returns (%) for each signal bucket and horizon.
+    """
+    t0 = time.perf_counter()
+    history = get_scorecard_history() if history is None else history
+    if prices is None:
+        since = history[0]["epoch"] - MAX_INPUT_AGE_DAYS * 86400 if history else 0
+        rows = get_price_history_rows(list(BACKTEST_ASSETS.values()), since=since)
+        by_symbol = {}
+        for sym, t, c in rows:
+            by_symbol.setdefault(sym, []).append((t, c))
+        prices = {asset: by_symbol.get(sym, []) for asset, sym in BACKTEST_ASSETS.items()}
+
+    times = np.array([h["epoch"] for h in history], dtype=float)
+    inputs = np.array([[np.nan if h.get(m) is None else h[m] for m in METRICS] for h in history],
+                      dtype=float).reshape(-1, len(METRICS))
+    scores, _ = score_matrix(inputs)
+    composite = composite_scores(scores, weights)
+    signals = signal_index(composite)
+
+    assets = {}
+    for asset, bars in prices.items():
+        bars = sorted(bars)
+        at = np.array([t for t, _ in bars], dtype=float)
+        closes = np.array([c for _, c in bars], dtype=float)
+        if len(history) == 0:
+            day_signal = np.full(len(at), -1)   # Nothing recorded yet: every bucket stays empty
+        else:
+            # Close-to-close: the signal known by a bar's close trades from that close
+            idx = _asof(times, at + BAR_CLOSE_OFFSET, MAX_INPUT_AGE_DAYS * 86400)
+            day_signal = np.where(idx >= 0, signals[np.maximum(idx, 0)], -1)
+        assets[asset] = {"bars": len(bars), "scored_days": int((day_signal >= 0).sum()),
+                         "horizons": bucket_forward_returns(day_signal, closes, horizons)}
+
+    return {
+        "refreshes": len(history),
+        "from": history[0]["timestamp"] if history else None,
+        "to": history[-1]["timestamp"] if history else None,
+        "weights": weights or WEIGHTS,
+        "assets": assets,
+        "ms": round((time.perf_counter() - t0) * 1000, 2),
     }
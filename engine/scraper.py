@@ -4,10 +4,10 @@ The Smart Scraper Engine
 "The Collector"
 Fetches data from user-defined URLs using heuristics to find the relevant price.
 """
-import requests
 import re
 from bs4 import BeautifulSoup
 from datetime import datetime
+from . import pages
 
 class SmartScraper:
     def __init__(self):
@@ -32,77 +32,11 @@ class SmartScraper:
 
         try:
             print(f"[scraper] Fetching {url}...")
-            resp = requests.get(url, headers=self.headers, timeout=10)
-            print(f"[scraper] Status: {resp.status_code}, Len: {len(resp.text)}")
-            
-            if resp.status_code != 200:
-                print(f"[scraper] Failed: {resp.status_code}")
-                return None
-            
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            # Remove scripts and styles
-            for script in soup(["script", "style"]):
-                script.decompose()
-                
-            text = soup.get_text(" ", strip=True)
-            
-            # Regex to find numbers: 
-            # Supports: 1,234.56 | 1.234,56 | 1234.56 | 1234
-            # We look for a number that appears shortly after a keyword.
-            
-            for keyword in keywords:
-                # Find keyword index
-                matches = [m.start() for m in re.finditer(re.escape(keyword), text, re.IGNORECASE)]
-                for start in matches:
-                    # Look at the next 200 chars (expanded window)
-                    chunk = text[start:start+200]
-                    
-                    # Find all numbers in this chunk
-                    # Heuristic: CDS is usually > 100.
-                    # Price is usually > 0.
-                    
-                    # Regex: Find potential float strings
-                    # Exclude dates (2024, 2025) if possible? Hard.
-                    nums = re.findall(r'(\d+[.,]\d+|\d+)', chunk)
-                    
-                    for raw in nums:
-                        try:
-                            # Clean: 1,235.50 -> 1235.50
-                            # If it has comma and dot, assume dot is decimal if it's at end
-                            # If only comma, assume decimal? Or thousand?
-                            # TR/EU: 1.234,56
-                            # US: 1,234.56
-                            
-                            val_str = raw
-                            if "," in val_str and "." in val_str:
-                                if val_str.rfind(",") > val_str.rfind("."):
-                                    # 1.234,56 -> 1234.56
-                                    val_str = val_str.replace(".", "").replace(",", ".")
-                                else:
-                                    # 1,234.56 -> 1234.56
-                                    val_str = val_str.replace(",", "")
-                            elif "," in val_str:
-                                # 12,34 or 1,234 ? 
-                                # If comma is near end (2 chars), it's decimal.
-                                if len(val_str) - val_str.rfind(",") <= 3:
-                                     val_str = val_str.replace(",", ".")
-                                else:
-                                     val_str = val_str.replace(",", "")
-                                     
-                            val = float(val_str)
-                            
-                            # Filter: Avoid years (1990-2030) if likely a date
-                            if 2020 <= val <= 2030: continue 
-
-                            # Filter: Avoid small integers (years/days)
-                            is_int = val.is_integer()
-                            if is_int and val <= 30: continue
-
-                            # Return first valid number
-                            print(f"[scraper] Found {val} near '{keyword}'")
-                            return val
-                        except:
-                            continue
+            # Conditional GET + content hash: unchanged pages skip the parse entirely
+            val = pages.extract(url, lambda html: self._scan_keywords(html, keywords),
+                                name=f"smart:{'|'.join(keywords)}", headers=self.headers)
+            if val is not None:
+                return val
             
             # If we are here, we found nothing.
             # SMART FALLBACK: "Can't be the engine more intelligent?"
@@ -118,6 +52,93 @@ class SmartScraper:
             print(f"[scraper] Error: {e}")
             return None
 
+    def _scan_keywords(self, html, keywords):
+        """Return the first plausible number appearing shortly after a keyword, or None."""
+        soup = BeautifulSoup(html, 'html.parser')
+        # Remove scripts and styles
+        for script in soup(["script", "style"]):
+            script.decompose()
+            
+        text = soup.get_text(" ", strip=True)
+        
+        # Regex to find numbers: 
+        # Supports: 1,234.56 | 1.234,56 | 1234.56 | 1234
+        # We look for a number that appears shortly after a keyword.
+        
+        for keyword in keywords:
+            # Find keyword index
+            matches = [m.start() for m in re.finditer(re.escape(keyword), text, re.IGNORECASE)]
+            for start in matches:
+                # Look at the next 200 chars (expanded window)
+                chunk = text[start:start+200]
+                
+                # Find all numbers in this chunk
+                # Heuristic: CDS is usually > 100.
+                # Price is usually > 0.
+                
+                # Regex: Find potential float strings
+                # Exclude dates (2024, 2025) if possible? Hard.
+                nums = re.findall(r'(\d+[.,]\d+|\d+)', chunk)
+                
+                for raw in nums:
+                    try:
+                        # Clean: 1,235.50 -> 1235.50
+                        # If it has comma and dot, assume dot is decimal if it's at end
+                        # If only comma, assume decimal? Or thousand?
+                        # TR/EU: 1.234,56
+                        # US: 1,234.56
+                        
+                        val_str = raw
+                        if "," in val_str and "." in val_str:
+                            if val_str.rfind(",") > val_str.rfind("."):
+                                # 1.234,56 -> 1234.56
+                                val_str = val_str.replace(".", "").replace(",", ".")
+                            else:
+                                # 1,234.56 -> 1234.56
+                                val_str = val_str.replace(",", "")
+                        elif "," in val_str:
+                            # 12,34 or 1,234 ? 
+                            # If comma is near end (2 chars), it's decimal.
+                            if len(val_str) - val_str.rfind(",") <= 3:
+                                 val_str = val_str.replace(",", ".")
+                            else:
+                                 val_str = val_str.replace(",", "")
+                                 
+                        val = float(val_str)
+                        
+                        # Filter: Avoid years (1990-2030) if likely a date
+                        if 2020 <= val <= 2030: continue 
+
+                        # Filter: Avoid small integers (years/days)
+                        is_int = val.is_integer()
+                        if is_int and val <= 30: continue
+
+                        # Return first valid number
+                        print(f"[scraper] Found {val} near '{keyword}'")
+                        return val
+                    except:
+                        continue
+        return None
+
+    @staticmethod
+    def _parse_te_cds(html):
+        soup = BeautifulSoup(html, 'html.parser')
+        text = soup.get_text(" ", strip=True)
+        
+        # Trading economics usually has the value near "CDS" or just the first Number
+        # We look for a number in the logical range (10-10000)
+        # TE page is specific to the instrument. The big number IS the price.
+        nums = re.findall(r'(\d{2,4}\.\d{2}|\d{3})', text) # 200.00, 202
+        for raw in nums:
+            try:
+                v = float(raw)
+                # CDS range check
+                if 50 <= v <= 5000:
+                    return v
+            except:
+                continue
+        return None
+
     def _smart_fallback_cds(self, original_url):
         """
         If the user provides a link to a hard-to-scrape site (like worldgovernmentbonds),
@@ -152,30 +173,10 @@ class SmartScraper:
             te_url = f"https://tradingeconomics.com/{country}/credit-default-swap"
             
             print(f"[scraper] Fetching fallback: {te_url}")
-            resp = requests.get(te_url, headers=self.headers, timeout=10)
-            
-            if resp.status_code == 200:
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                text = soup.get_text(" ", strip=True)
-                
-                # Trading economics usually has the value near "CDS" or just the first Number
-                # We look for a number in the logical range (10-10000)
-                # TE specific: The value is often in a specific table or ID, but regex search is robust.
-                
-                # Look for "Turkey 5 Years CDS" buffer
-                # Actually, TE page is specific to the instrument. The big number IS the price.
-                # We can search for the first float.
-                
-                nums = re.findall(r'(\d{2,4}\.\d{2}|\d{3})', text) # 200.00, 202
-                for raw in nums:
-                    try:
-                        v = float(raw)
-                        # CDS range check
-                        if 50 <= v <= 5000:
-                            print(f"[scraper] Fallback success: {v}")
-                            return v
-                    except:
-                        continue
+            val = pages.extract(te_url, self._parse_te_cds, headers=self.headers)
+            if val is not None:
+                print(f"[scraper] Fallback success: {val}")
+                return val
                         
             return None
         except Exception as e:
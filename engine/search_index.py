@@ -0,0 +1,189 @@
+"""
+The Search Index
+================
+"Find it before the user finishes typing."
+Prebuilt lookup structures for the command bar over any list of entity
+documents ({"key", "name", "group", "technical_key", "explain", ...}).
+
+    * Exact maps: key -> doc, technical_key -> doc (the reverse map that
+      replaces resolve_entity's linear scan).
+    * Prefix trie over key / technical_key / name tokens: autocomplete for
+      "us" -> usdtry, us_10y, "US CPI ...".
+    * Trigram index: substring matches ("try" in "usdtry") and typo-tolerant
+      fuzzy matches ("usdtyr" -> usdtry) ranked by trigram overlap.
+
+Everything is built once; a query only touches the postings it needs.
+"""
+import re
+import heapq
+from collections import defaultdict
+
+# Ranking: the field a query hit decides the score (same order as the old
+# linear search: key > technical_key > name > anything else).
+FIELD_SCORES = {"key": 4, "technical_key": 3, "name": 2, "group": 1, "explain": 1}
+FUZZY_MIN = 0.45   # Minimum trigram (Dice) similarity for a typo match
+MAX_PREFIX_DOCS = 200
+MAX_VERIFY = 300   # Substring candidates verified per field
+MAX_POSTING = 2000 # Trigrams shared by more docs than this don't seed typo candidates
+MAX_FUZZY = 50     # Typo candidates scored per query
+
+_TOKEN_RE = re.compile(r"[a-z0-9^=.\-]+")
+
+
+def _norm(text):
+    return (text or "").lower().strip()
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(_norm(text))
+
+
+def _trigrams(text):
+    padded = f"  {_norm(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = []
+
+
+class SearchIndex:
+    def __init__(self, docs=()):
+        self.docs = []
+        self._by_key = {}
+        self._by_tech = {}
+        self._trie = _TrieNode()
+        self._grams = {f: defaultdict(set) for f in FIELD_SCORES}  # field -> trigram -> doc ids
+        self._gram_sets = {}                  # (doc id, field) -> trigram set, for typo scoring
+        for doc in docs:
+            self.add(doc)
+
+    def add(self, doc):
+        i = len(self.docs)
+        self.docs.append(doc)
+        self._by_key.setdefault(_norm(doc["key"]), i)
+        tech = doc.get("technical_key")
+        if tech: self._by_tech.setdefault(tech.upper(), i)
+        for field in FIELD_SCORES:
+            value = doc.get(field) or ""
+            if field in ("key", "technical_key", "name"):
+                for tok in set(_tokens(value)) | {_norm(value)}:
+                    if tok: self._insert(tok, i, FIELD_SCORES[field])
+            grams = _trigrams(value) if value else set()
+            if field != "explain": self._gram_sets[(i, field)] = grams
+            postings = self._grams[field]
+            for g in grams: postings[g].add(i)
+
+    def _insert(self, token, i, score):
+        node = self._trie
+        for ch in token:
+            node = node.children.setdefault(ch, _TrieNode())
+        node.ids.append((i, score))
+
+    # ── Exact lookups ────────────────────────────────────────────────
+    def by_key(self, key):
+        i = self._by_key.get(_norm(key))
+        return self.docs[i] if i is not None else None
+
+    def by_technical_key(self, tech):
+        i = self._by_tech.get((tech or "").upper())
+        return self.docs[i] if i is not None else None
+
+    # ── Candidate generators ─────────────────────────────────────────
+    def prefix(self, prefix, limit=MAX_PREFIX_DOCS):
+        """
+        {doc id: best field score} for docs with a key/technical_key/name
+        token starting with `prefix` (at most `limit` docs).
+        """
+        node = self._trie
+        for ch in _norm(prefix):
+            node = node.children.get(ch)
+            if node is None: return {}
+        out, stack = {}, [node]
+        while stack and len(out) < limit:
+            n = stack.pop()
+            for i, score in n.ids:
+                if score > out.get(i, 0): out[i] = score
+                if len(out) >= limit: break
+            stack.extend(n.children.values())
+        return out
+
+    def _substring_candidates(self, q, postings):
+        """
+        Docs whose field may contain `q` (every interior trigram present).
+        Very common trigrams are not intersected: the rarest posting list is
+        returned as-is and the caller's substring check filters it lazily.
+        """
+        grams = [g for g in _trigrams(q) if g.strip() == g]  # Interior trigrams only (no padding)
+        if not grams: return set()
+        sets = sorted((postings.get(g, set()) for g in grams), key=len)
+        if len(sets[0]) > 4 * MAX_VERIFY: return sets[0]
+        out = set(sets[0])
+        for s in sets[1:]:
+            out &= s
+            if not out: break
+        return out
+
+    def _fuzzy_candidates(self, q, n=MAX_FUZZY):
+        """
+        The `n` docs sharing the most reasonably rare trigrams with `q`
+        (trigrams in more than MAX_POSTING docs don't discriminate).
+        """
+        counts = defaultdict(int)
+        for field in ("key", "technical_key", "name"):
+            postings = self._grams[field]
+            for g in _trigrams(q):
+                ids = postings.get(g)
+                if ids and len(ids) <= MAX_POSTING:
+                    for i in ids: counts[i] += 1
+        return heapq.nlargest(n, counts, key=counts.get)
+
+    # ── Ranked search ────────────────────────────────────────────────
+    def search(self, query, limit=15):
+        """
+        Ranked matches as (doc, score, match_type) tuples:
+        prefix/substring hits scored by field, then typo matches scored by
+        trigram similarity (always below an exact-field hit).
+        """
+        q = _norm(query)
+        if not q: return []
+        scores, kinds = {}, {}
+
+        def hit(i, score, kind):
+            if score > scores.get(i, 0):
+                scores[i], kinds[i] = score, kind
+
+        for i, score in self.prefix(q).items():
+            hit(i, score + 0.5, "prefix")
+
+        def settled(score):
+            # Enough hits already outrank anything this stage could add
+            return sum(1 for v in scores.values() if v > score) >= limit
+
+        if len(q) >= 3:
+            for field, score in FIELD_SCORES.items():
+                if settled(score): break
+                found = 0
+                for i in self._substring_candidates(q, self._grams[field]):
+                    if q in _norm(self.docs[i].get(field)):
+                        hit(i, score, "fuzzy")
+                        found += 1
+                        if found >= MAX_VERIFY: break
+
+            if len(scores) < limit:
+                q_grams = _trigrams(q)
+                for i in self._fuzzy_candidates(q):
+                    if i in scores: continue
+                    best = 0.0
+                    for field in ("key", "technical_key", "name"):
+                        grams = self._gram_sets[(i, field)]
+                        if grams: best = max(best, 2 * len(q_grams & grams) / (len(q_grams) + len(grams)))
+                    if best >= FUZZY_MIN:
+                        hit(i, round(best, 3), "typo")
+
+        ranked = sorted(scores, key=lambda i: (-scores[i], self.docs[i]["key"]))[:limit]
+        return [(self.docs[i], scores[i], kinds[i]) for i in ranked]
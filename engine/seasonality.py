@@ -4,58 +4,172 @@ The Seasonality Engine
 "History doesn't repeat, but it rhymes."
 Analyzes 10-year historical data to find seasonal tendencies (e.g. "USDTRY rises in Dec").
 Also provides intraday context (e.g. "London Fix").
+
+A daily job computes, for every tracked symbol at once, month-of-year,
+day-of-week and turn-of-month statistics (mean, median, win rate, count,
+t-stat of returns in %) with pandas groupby over the daily closes in
+price_history. It stores them in the seasonality table. Ten years of daily
+bars are backfilled once per symbol in batched downloads; after that, the
+universe scanner's bar sync keeps the history current. Popups read the
+stored rows and never download history.
 """
+import time
+import calendar
+import threading
 from datetime import datetime
-import statistics
-from .market import fetch_long_history
+import numpy as np
+import pandas as pd
+from .db import (get_price_history_span, get_price_history_rows, save_price_history,
+                 save_seasonality, get_seasonality)
+from .rolling import closed_bars
+
+YEARS = 10
+REFRESH_SECONDS = 86400
+TURN_DAYS_BEFORE, TURN_DAYS_AFTER = 1, 3   # Turn of month: last trading day + first three
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def _bucket_stats(frame, kind):
+    """groupby (symbol, bucket) over frame["ret"] -> table rows."""
+    frame = frame.dropna(subset=["ret"]).assign(win=lambda f: f["ret"] > 0)
+    g = frame.groupby(["symbol", "bucket"])
+    stats = g["ret"].agg(["mean", "median", "count", "std"])
+    stats["win_rate"] = g["win"].mean() * 100
+    stats["t_stat"] = stats["mean"] / (stats["std"] / np.sqrt(stats["count"]))
+    rows = []
+    for (symbol, bucket), r in stats.iterrows():
+        t = r["t_stat"]
+        rows.append({"symbol": symbol, "kind": kind, "bucket": str(bucket),
+                     "mean": round(float(r["mean"]), 3), "median": round(float(r["median"]), 3),
+                     "win_rate": round(float(r["win_rate"]), 1), "count": int(r["count"]),
+                     "t_stat": round(float(t), 2) if np.isfinite(t) else None})
+    return rows
+
+
+def compute_seasonality(history):
+    """
+    history: DataFrame (symbol, time, close) of daily closes for any number
+    of symbols. Returns seasonality table rows for all of them.
+    """
+    df = history.copy()
+    df["date"] = pd.to_datetime(df["time"], unit="s")  # UTC midnight of the session's date (rolling.day_epoch)
+    df = df.sort_values(["symbol", "date"]).drop_duplicates(["symbol", "date"], keep="last")
+    df["ret"] = df.groupby("symbol")["close"].pct_change() * 100
+    df["ym"] = df["date"].dt.to_period("M")
+
+    # Month of year: month-end to month-end, the symbol's in-progress month excluded
+    month_end = df.groupby(["symbol", "ym"])["close"].last()
+    monthly = month_end.groupby(level="symbol").pct_change().mul(100).rename("ret").reset_index()
+    latest = monthly.groupby("symbol")["ym"].transform("max")
+    monthly = monthly[monthly["ym"] < latest].assign(bucket=lambda f: f["ym"].dt.month)
+
+    weekday = df.assign(bucket=df["date"].dt.dayofweek)
+
+    in_month = df.groupby(["symbol", "ym"])
+    from_start = in_month.cumcount()
+    from_end = in_month.cumcount(ascending=False)
+    turn = (from_start < TURN_DAYS_AFTER) | (from_end < TURN_DAYS_BEFORE)
+    tom = df.assign(bucket=np.where(turn, "turn", "rest"))
+
+    return (_bucket_stats(monthly, "month") + _bucket_stats(weekday, "weekday")
+            + _bucket_stats(tom, "turn_of_month"))
+
 
 def get_monthly_seasonality(symbol):
     """
-    Computes average monthly returns over the last 10 years.
+    Precomputed seasonality for `symbol` (no download).
     Returns: Dict {month_int: avg_return_pct} and best/worst months.
     """
-    # Fetch 10y monthly data
-    # We rely on market.fetch_long_history defaulting to period="10y", interval="1mo"
-    history = fetch_long_history(symbol)
-    if not history:
-        return None
-        
-    # Group by month
-    month_changes = {m: [] for m in range(1, 13)}
-    
-    for candle in history:
-        # candle = {date, month, year, close, open}
-        # Calculate % change for that month
-        if candle["open"] and candle["open"] > 0:
-            chg = ((candle["close"] - candle["open"]) / candle["open"]) * 100
-            month_changes[candle["month"]].append(chg)
-            
-    # Compute Averages
+    rows = get_seasonality(symbol)
     seasonality = {}
-    for m, changes in month_changes.items():
-        if changes:
-            avg = statistics.mean(changes)
-            win_rate = len([x for x in changes if x > 0]) / len(changes) * 100
-            seasonality[m] = {
-                "avg_return": round(avg, 2),
-                "win_rate": round(win_rate, 0),
-                "count": len(changes)
-            }
-            
+    weekdays, turn = {}, {}
+    for r in rows:
+        stat = {"avg_return": round(r["mean"], 2), "median": round(r["median"], 2),
+                "win_rate": round(r["win_rate"], 0), "count": r["count"], "t_stat": r["t_stat"]}
+        if r["kind"] == "month":
+            seasonality[int(r["bucket"])] = stat
+        elif r["kind"] == "weekday":
+            weekdays[WEEKDAYS[int(r["bucket"])]] = stat
+        elif r["kind"] == "turn_of_month":
+            turn[r["bucket"]] = stat
     if not seasonality:
         return None
-        
+
     # Context Logic: "Best Month", "Worst Month"
+    best = max(seasonality, key=lambda m: seasonality[m]["avg_return"])
+    worst = min(seasonality, key=lambda m: seasonality[m]["avg_return"])
     # Find current month stats
     current_month = datetime.now().month
-    current_stats = seasonality.get(current_month)
-    
     return {
         "monthly_map": seasonality,
-        "current_month_stats": current_stats,
-        "current_month_name": datetime.now().strftime("%B")
+        "best_month": {"month": best, "name": calendar.month_name[best], **seasonality[best]},
+        "worst_month": {"month": worst, "name": calendar.month_name[worst], **seasonality[worst]},
+        "current_month_stats": seasonality.get(current_month),
+        "current_month_name": datetime.now().strftime("%B"),
+        "weekday_map": weekdays,
+        "turn_of_month": turn,
+        "computed_at": rows[0]["computed_at"],
     }
 
+
+class SeasonalityJob:
+    def __init__(self, symbols=None):
+        self._symbols = symbols
+        self._backfilled = set()
+        self._thread = None
+
+    def symbols(self):
+        if self._symbols is not None: return self._symbols
+        from .universe import universe_symbols
+        return universe_symbols()
+
+    def backfill(self, symbols, now=None):
+        """One batched 10-year daily download for symbols the store barely covers."""
+        from .market import fetch_daily_bars
+        now = now or time.time()
+        spans = get_price_history_span()
+        need = [s for s in symbols if s not in self._backfilled
+                and (s not in spans or spans[s][0] > now - (YEARS - 1) * 365 * 86400)]
+        if not need: return 0
+        got = fetch_daily_bars(need, period=f"{YEARS}y")
+        for sym, bars in got.items():
+            save_price_history(sym, closed_bars(bars, now))  # Already day_epoch-stamped
+            self._backfilled.add(sym)  # Symbols the download failed or left out are retried next refresh
+        return len(got)
+
+    def refresh_once(self, now=None, backfill=True):
+        now = now or time.time()
+        symbols = self.symbols()
+        if backfill:
+            try:
+                self.backfill(symbols, now)
+            except Exception as e:
+                print(f"[seasonality] Backfill failed: {e}")
+        rows = get_price_history_rows(symbols, since=now - YEARS * 365 * 86400)
+        if not rows: return 0
+        table = compute_seasonality(pd.DataFrame(rows, columns=["symbol", "time", "close"]))
+        done = sorted({r["symbol"] for r in table})
+        save_seasonality(done, table, datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"))
+        return len(done)
+
+    def _loop(self):
+        print("[Background] Starting Seasonality Job...")
+        while True:
+            try:
+                n = self.refresh_once()
+                print(f"[seasonality] Tables refreshed for {n} symbols")
+            except Exception as e:
+                print(f"[seasonality] Refresh failed: {e}")
+            time.sleep(REFRESH_SECONDS)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+
+SEASONALITY = SeasonalityJob()
+
 def get_intraday_context():
     """
     Checks if we are near key liquidity events (London Fix, Market Opens).
@@ -0,0 +1,231 @@
+"""
+The Universe Scanner
+====================
+"Watch the symbols nobody is looking at."
+Background anomaly scan over every symbol in ALL_TICKERS plus the BIST
+components, not just the entity a user happens to open.
+
+    * History: the rolling windows (engine.rolling) held per symbol and
+      backed by price_history. Bars are topped up with batched downloads
+      (20 symbols per request), and only for windows that are short or stale.
+    * Live prices: the level store for ALL_TICKERS (the market feed), and
+      the in-progress bar of the batched download for BIST components.
+    * One NumPy pass per refresh: the windows are stacked into one
+      (symbols x bars) matrix. Z-scores, percentile ranks, range breaks and
+      gap moves (today's move in units of the daily return stdev) are
+      computed for the whole universe at once.
+    * Divergence rules (engine.divergence) are evaluated on the same
+      refresh, and their hits join the feed.
+    * Alerts are written to the alerts table. Each (symbol, type) pair has
+      a cooldown, so an alert repeats only after COOLDOWN_SECONDS or when
+      its level escalates (SIGMA -> BLACK_SWAN).
+"""
+import time
+import threading
+from datetime import datetime
+import numpy as np
+from .analytics import z_scores, percentile_ranks
+from .config import ALL_TICKERS, CONFIG
+from .db import add_alerts, get_alerts, get_last_alerts
+from .levels import LEVELS
+from .metrics import incr, gauge
+from .rolling import ROLLING, MIN_BARS, closed_bars
+
+REFRESH_SECONDS = 300
+COOLDOWN_SECONDS = 6 * 3600
+Z_WARN, Z_CRIT = 2.0, 3.0
+GAP_SIGMA = 3.0        # Day move this many daily-return stdevs -> GAP
+LEVEL_RANK = {"INFO": 0, "CAUTION": 1, "WARNING": 1, "CRITICAL": 2}
+
+
+def universe_symbols():
+    comps = CONFIG.get("bist_components", {})
+    bist = [t + ".IS" for t in comps.get("bist30", []) + comps.get("bist100_extra", [])]
+    return list(dict.fromkeys(list(ALL_TICKERS) + bist))
+
+
+def scan_matrix(hist, live):
+    """
+    Vectorized statistics for a (symbols x bars) close matrix, NaN-padded
+    on the left, against a vector of live prices. Returns a dict of arrays:
+    z, percentile (0-1), at_high, at_low, gap_z, count.
+    """
+    hist = np.asarray(hist, dtype=float)
+    live = np.asarray(live, dtype=float)
+    valid = ~np.isnan(hist)
+    count = valid.sum(axis=1)
+    z = z_scores(live, hist)
+    percentile = percentile_ranks(live, hist)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        at_high = live > np.nanmax(np.where(valid, hist, -np.inf), axis=1)
+        at_low = live < np.nanmin(np.where(valid, hist, np.inf), axis=1)
+        rets = np.diff(np.log(hist), axis=1)
+        ret_std = np.nanstd(rets, axis=1, ddof=1)
+        last = hist[:, -1]
+        gap = np.log(live / last)
+        gap_z = np.where(ret_std > 0, gap / ret_std, 0.0)
+    short = count < MIN_BARS
+    z[short] = 0.0
+    gap_z[short] = 0.0
+    at_high &= ~short
+    at_low &= ~short
+    return {"z": z, "percentile": percentile, "at_high": at_high, "at_low": at_low,
+            "gap_z": gap_z, "count": count}
+
+
+def _name(sym):
+    return ALL_TICKERS.get(sym) or sym.replace(".IS", "")
+
+
+class UniverseScanner:
+    def __init__(self, stats=None, symbols=None):
+        self.stats = stats if stats is not None else ROLLING
+        self.symbols = symbols if symbols is not None else universe_symbols()
+        self._lock = threading.Lock()
+        self._fired = None  # (symbol, type) -> (epoch, level); loaded from the table on first use
+        self._thread = None
+        self.last_scan = {"at": None, "ms": None, "scanned": 0}
+
+    # ── Inputs ───────────────────────────────────────────────────────
+    def sync_bars(self, now=None):
+        """
+        Top up short/stale windows (and fetch BIST live bars) in batched
+        downloads. Returns {symbol: live price} taken from in-progress bars.
+        """
+        from .market import fetch_daily_bars
+        now = now or time.time()
+        short, recent = [], []
+        for sym in self.symbols:
+            w = self.stats.window(sym)
+            if w.n < MIN_BARS: short.append(sym)
+            elif sym not in ALL_TICKERS or self.stats.is_stale(sym, now):
+                recent.append(sym)  # BIST components: the download is also their live quote
+        live = {}
+        for period, group in (("3mo", short), ("5d", recent)):
+            if not group: continue
+            for sym, bars in fetch_daily_bars(group, period=period).items():
+                self.stats.add_bars(sym, closed_bars(bars, now))
+                live[sym] = bars[-1][1]
+        return live
+
+    def live_prices(self, fetched=None):
+        out = dict(fetched or {})
+        for sym in self.symbols:
+            val = LEVELS.level(sym)[0]
+            if isinstance(val, (int, float)): out[sym] = float(val)
+        return out
+
+    # ── Scan ─────────────────────────────────────────────────────────
+    def scan(self, live, now=None):
+        """
+        One vectorized pass over the universe. Returns the newly triggered
+        alerts (already persisted).
+        """
+        t0 = time.perf_counter()
+        now = now or time.time()
+        syms = [s for s in self.symbols if s in live]
+        width = self.stats.size
+        hist = np.full((len(syms), width), np.nan)
+        for i, sym in enumerate(syms):
+            vals = self.stats.window(sym).values
+            if vals: hist[i, width - len(vals):] = list(vals)
+        res = scan_matrix(hist, [live[s] for s in syms]) if syms else None
+
+        candidates = []
+        if res is not None:
+            z, pct, gap_z = res["z"], res["percentile"], res["gap_z"]
+            hits = np.flatnonzero((np.abs(z) >= Z_WARN) | res["at_high"] | res["at_low"] | (np.abs(gap_z) >= GAP_SIGMA))
+            for i in hits:
+                candidates.extend(self._alerts_for(syms[i], live[syms[i]], z[i], pct[i], gap_z[i],
+                                                   res["at_high"][i], res["at_low"][i], now))
+        fresh = self._dedupe(candidates, now)
+        add_alerts(fresh)
+        ms = (time.perf_counter() - t0) * 1000
+        self.last_scan = {"at": now, "ms": round(ms, 2), "scanned": len(syms)}
+        gauge("universe.scan_ms", round(ms, 2))
+        incr("universe.alerts", len(fresh))
+        return fresh
+
+    def _alerts_for(self, sym, price, z, pct, gap_z, at_high, at_low, now):
+        base = {"epoch": now, "timestamp": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+                "symbol": sym, "name": _name(sym), "price": round(float(price), 4),
+                "z_score": round(float(z), 2), "percentile": round(float(pct), 3)}
+        out = []
+        if abs(z) >= Z_CRIT:
+            out.append({**base, "type": "SIGMA", "level": "CRITICAL", "message": f"3-SIGMA EVENT ({z:+.1f}σ)"})
+        elif abs(z) >= Z_WARN:
+            out.append({**base, "type": "SIGMA", "level": "WARNING", "message": f"Sigma Alert ({z:+.1f}σ)"})
+        if at_high:
+            out.append({**base, "type": "RANGE_HIGH", "level": "INFO", "message": "New 3-month high"})
+        elif at_low:
+            out.append({**base, "type": "RANGE_LOW", "level": "WARNING", "message": "New 3-month low"})
+        if abs(gap_z) >= GAP_SIGMA:
+            out.append({**base, "type": "GAP", "level": "WARNING",
+                        "message": f"Gap move: {gap_z:+.1f}x a normal day"})
+        return out
+
+    def _dedupe(self, candidates, now):
+        with self._lock:
+            if self._fired is None:
+                self._fired = get_last_alerts(now - COOLDOWN_SECONDS)
+            fresh = []
+            for a in candidates:
+                prev = self._fired.get((a["symbol"], a["type"]))
+                if prev and now - prev[0] < COOLDOWN_SECONDS and LEVEL_RANK[a["level"]] <= LEVEL_RANK.get(prev[1], 0):
+                    continue
+                self._fired[(a["symbol"], a["type"])] = (now, a["level"])
+                fresh.append(a)
+            return fresh
+
+    def push_divergences(self, now=None):
+        """Persist newly fired divergence rules (engine.divergence) to the feed."""
+        from .divergence import DIVERGENCE
+        now = now or time.time()
+        stamp = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        candidates = []
+        for d in DIVERGENCE.evaluate():
+            price = LEVELS.level(d["subject"])[0]
+            candidates.append({"epoch": now, "timestamp": stamp, "symbol": d["subject"], "name": d["subject"],
+                               "type": f"DIVERGENCE:{d['rule']}", "level": d["level"], "message": d["message"],
+                               "price": price if isinstance(price, (int, float)) else None,
+                               "z_score": None, "percentile": None})
+        fresh = self._dedupe(candidates, now)
+        add_alerts(fresh)
+        return fresh
+
+    def refresh_once(self):
+        fetched = {}
+        try:
+            fetched = self.sync_bars()
+        except Exception as e:
+            print(f"[universe] Bar sync failed: {e}")
+        fresh = self.scan(self.live_prices(fetched))
+        try:
+            fresh += self.push_divergences()
+        except Exception as e:
+            print(f"[universe] Divergence rules failed: {e}")
+        return fresh
+
+    def feed(self, limit=50, since=None):
+        """Recent alerts (newest first) plus the last scan's stats."""
+        return {"alerts": get_alerts(limit=limit, since=since), "scan": self.last_scan,
+                "universe": len(self.symbols)}
+
+    # ── Background loop ──────────────────────────────────────────────
+    def _loop(self):
+        print("[Background] Starting Universe Scanner...")
+        while True:
+            try:
+                fresh = self.refresh_once()
+                if fresh: print(f"[universe] {len(fresh)} new alerts")
+            except Exception as e:
+                print(f"[universe] Scan failed: {e}")
+            time.sleep(REFRESH_SECONDS)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+
+UNIVERSE = UniverseScanner()
@@ -3,8 +3,118 @@ The Valuation Engine (Context System)
 =====================================
 "The Judge"
 Computes "Fair Value" for assets using deterministic financial models.
+
+Each model is one NumPy expression over its inputs, so the same code values
+a single entity, every registry entity carrying a `valuation` config in one
+batch (evaluate_all), and whole sensitivity grids by broadcasting an axis of
+one input against an axis of another (e.g. fair TR 10Y across US10Y x CDS).
+Inputs are read from the level store; the batch result is kept until one of
+them changes.
 """
-from .analytics import fair_value_ppp
+import time
+import threading
+import numpy as np
+from .metrics import incr
+
+US_CPI_FALLBACK = 2.5   # Used only until the bonds feed has published US CPI
+GRID_POINTS = 9         # Points per sensitivity axis
+
+# Sensitivity axes: input key -> (offsets added to the live value, floor)
+GRID_AXES = {
+    "us_10y": (np.linspace(-2.0, 2.0, GRID_POINTS), 0.0),
+    "cds": (np.linspace(-150.0, 150.0, GRID_POINTS), 0.0),
+    "tr_10y": (np.linspace(-6.0, 6.0, GRID_POINTS), 0.0),
+    "pe": (np.linspace(-3.0, 3.0, GRID_POINTS), 1.0),
+    "cpi_yoy": (np.linspace(-12.0, 12.0, GRID_POINTS), -5.0),
+    "us_cpi": (np.linspace(-2.0, 2.0, GRID_POINTS), -2.0),
+}
+# Grid name -> (model, x input, y input, z label)
+GRIDS = {
+    "fair_tr_10y": ("SOVEREIGN_SPREAD", "us_10y", "cds", "Fair TR 10Y (%)"),
+    "erp": ("ERP_YIELD", "pe", "tr_10y", "ERP (%)"),
+    "inflation_gap": ("PPP", "cpi_yoy", "us_cpi", "TR - US inflation (pts)"),
+}
+
+_batch_lock = threading.Lock()
+_batch = {"stamp": None, "result": None}
+
+
+def _num(v):
+    """float, or NaN for None / 'N/A' / junk (NaN flows through the models)."""
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+# ── Models (vectorized) ──────────────────────────────────────────────
+def _ppp_gap(cpi_yoy, us_cpi):
+    return np.asarray(cpi_yoy, dtype=float) - np.asarray(us_cpi, dtype=float)
+
+def _sovereign_fair_yield(us_10y, cds):
+    return np.asarray(us_10y, dtype=float) + np.asarray(cds, dtype=float) / 100.0
+
+def _erp(pe, tr_10y):
+    pe = np.asarray(pe, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(pe > 0, 100.0 / pe, np.nan) - np.asarray(tr_10y, dtype=float)
+
+MODEL_FUNCS = {
+    "PPP": (_ppp_gap, ("cpi_yoy", "us_cpi")),
+    "SOVEREIGN_SPREAD": (_sovereign_fair_yield, ("us_10y", "cds")),
+    "ERP_YIELD": (_erp, ("pe", "tr_10y")),
+}
+
+
+def _inputs_for(model, values):
+    """Model inputs from a {key: value} map, with the US CPI fallback applied."""
+    out = {k: _num(values.get(k)) for k in MODEL_FUNCS[model][1]}
+    if model == "PPP" and np.isnan(out["us_cpi"]):
+        out["us_cpi"] = US_CPI_FALLBACK
+    return out
+
+
+def _evaluate(model, rows):
+    """
+    One vectorized pass of `model` over many entities.
+    rows: [(input values dict, current value)] -> list of result dicts.
+    """
+    fn, names = MODEL_FUNCS[model]
+    cols = [_inputs_for(model, values) for values, _ in rows]
+    arrays = [np.array([c[n] for c in cols]) for n in names]
+    out = fn(*arrays)
+    current = np.array([_num(cur) for _, cur in rows])
+    return [_format(model, cols[i], current[i], out[i], rows[i][0]) for i in range(len(rows))]
+
+
+def _format(model, inputs, current, out, raw):
+    if model == "PPP":
+        if np.isnan(inputs["cpi_yoy"]):
+            return {"model": "Relative PPP", "error": "Waiting for CPI Data"}
+        assumed = np.isnan(_num(raw.get("us_cpi")))
+        return {
+            "model": "Relative PPP",
+            "fair_value_desc": f"Inflation Gap ({out:+.1f}%)",
+            "signal": "Undervalued" if out > 0 else "Overvalued",
+            "us_cpi": round(float(inputs["us_cpi"]), 2),
+            "us_cpi_source": "assumed" if assumed else "FRED",
+        }
+    if model == "SOVEREIGN_SPREAD":
+        missing = [label for k, label in (("us_10y", "US10Y"), ("cds", "CDS")) if np.isnan(inputs[k])]
+        if missing:
+            return {"model": "Sovereign Spread", "error": f"Waiting for: {', '.join(missing)}"}
+        res = {"model": "Sovereign Spread", "fair_value": round(float(out), 2),
+               "message": f"Fair Yield: {out:.2f}%"}
+        if not np.isnan(current): res["gap"] = round(float(current - out), 2)
+        return res
+    if model == "ERP_YIELD":
+        if np.isnan(out):
+            return {"model": "Equity Risk Premium", "error": "Waiting for PE/Rates"}
+        return {"model": "Equity Risk Premium", "metric": "ERP", "value": round(float(out), 2),
+                "message": f"ERP: {out:+.1f}%"}
+    return None
+
+
 def compute_fair_value(key, current_value):
     """
     Computes the fair value for a given entity key based on its registry model.
@@ -16,75 +126,84 @@ def compute_fair_value(key, current_value):
     entity = resolve_entity(key)
     if not entity or "valuation" not in entity:
         return None
-        
-    model_cfg = entity["valuation"]
-    model_type = model_cfg["model"]
-    inputs = model_cfg["inputs"]
-    
-    # Fetch Inputs
+    model_type = entity["valuation"]["model"]
+    if model_type not in MODEL_FUNCS:
+        return None
+
     input_values = {}
-    for k in inputs:
-        # resolve_entity might trigger a recursive lookup if not careful, 
-        # but inputs are usually macro vars (cpi, rates) which don't have valuation models.
-        # We use get_current_level directly.
+    for k in entity["valuation"]["inputs"]:
         ie = resolve_entity(k)
         if ie:
-            val, _, _ = get_current_level(ie["key"], ie)
-            input_values[k] = val
-            
-    # Helper to safe float
-    def safe_float(v):
-        try:
-            return float(v)
-        except (TypeError, ValueError):
-            return None
-
-    # Model Logic
-    if model_type == "PPP":
-        cpi = safe_float(input_values.get("cpi_yoy"))
-        if cpi is not None:
-             diff = cpi - 2.5 # US CPI approx
-             return {
-                 "model": "Relative PPP",
-                 "fair_value_desc": f"Inflation Gap ({diff:+.1f}%)",
-                 "signal": "Undervalued" if diff > 0 else "Overvalued"
-             }
-        else:
-            return {"model": "Relative PPP", "error": "Waiting for CPI Data"}
+            input_values[k], _, _ = get_current_level(ie["key"], ie)
+    return _evaluate(model_type, [(input_values, current_value)])[0]
 
-    elif model_type == "SOVEREIGN_SPREAD":
-        us = safe_float(input_values.get("us_10y"))
-        cds = safe_float(input_values.get("cds"))
-        
-        if us is not None and cds is not None:
-            fair_yield = us + (cds / 100.0)
-            gap = current_value - fair_yield
-            return {
-                "model": "Sovereign Spread",
-                "fair_value": round(fair_yield, 2),
-                "gap": round(gap, 2),
-                "message": f"Fair Yield: {fair_yield:.2f}%"
-            }
-        else:
-            missing = []
-            if us is None: missing.append("US10Y")
-            if cds is None: missing.append("CDS")
-            return {"model": "Sovereign Spread", "error": f"Waiting for: {', '.join(missing)}"}
 
-    elif model_type == "ERP_YIELD":
-        rf = safe_float(input_values.get("tr_10y"))
-        pe = safe_float(input_values.get("pe"))
-        
-        if rf is not None and pe and pe > 0:
-            ey = (100.0 / pe)
-            erp = ey - rf
-            return {
-                "model": "Equity Risk Premium",
-                "metric": "ERP",
-                "value": round(erp, 2),
-                "message": f"ERP: {erp:+.1f}%"
-            }
-        else:
-            return {"model": "Equity Risk Premium", "error": "Waiting for PE/Rates"}
-            
-    return None
+# ── Batch + sensitivity grids ────────────────────────────────────────
+def valued_entities():
+    """Registry entities with a valuation model, plus the entities they read."""
+    from .registry import DATA_REGISTRY
+    keys = set()
+    for key, e in DATA_REGISTRY.items():
+        if e.get("valuation", {}).get("model") in MODEL_FUNCS:
+            keys.add(key)
+            keys.update(e["valuation"]["inputs"])
+    return [{"key": k, **DATA_REGISTRY[k]} for k in sorted(keys) if k in DATA_REGISTRY]
+
+
+def sensitivity_grids(values):
+    """
+    {grid name: {"x", "y", "z", "live"}} around the live inputs; z[i][j] is
+    the model at x[i], y[j]. Grids whose inputs are missing are skipped.
+    """
+    grids = {}
+    for name, (model, x_key, y_key, label) in GRIDS.items():
+        live = _inputs_for(model, values)
+        if np.isnan(live[x_key]) or np.isnan(live[y_key]): continue
+        axes = {}
+        for k in (x_key, y_key):
+            offsets, floor = GRID_AXES[k]
+            axes[k] = np.maximum(live[k] + offsets, floor)
+        fn, names = MODEL_FUNCS[model]
+        z = fn(*(axes[n][:, None] if n == x_key else axes[n][None, :] for n in names))  # (len x, len y)
+        grids[name] = {
+            "model": model, "label": label,
+            "x": {"key": x_key, "values": np.round(axes[x_key], 2).tolist()},
+            "y": {"key": y_key, "values": np.round(axes[y_key], 2).tolist()},
+            "z": [[None if np.isnan(v) else round(float(v), 2) for v in row] for row in z],
+            "live": {x_key: round(float(live[x_key]), 2), y_key: round(float(live[y_key]), 2)},
+        }
+    return grids
+
+
+def evaluate_all(levels=None):
+    """
+    Every registry valuation, one vectorized pass per model, plus the
+    sensitivity grids. Recomputed only when an input level changes.
+    """
+    from .registry import DATA_REGISTRY
+    if levels is None:
+        from .levels import LEVELS as levels
+    keys = [e["key"] for e in valued_entities()]
+    values = {k: levels.level(k)[0] for k in keys}
+    stamp = tuple(values[k] for k in keys)
+    with _batch_lock:
+        if _batch["stamp"] == stamp and _batch["result"] is not None:
+            incr("valuation.batch_hits")
+            return _batch["result"]
+
+    by_model = {}
+    for key, e in DATA_REGISTRY.items():
+        model = e.get("valuation", {}).get("model")
+        if model in MODEL_FUNCS: by_model.setdefault(model, []).append(key)
+    models = {}
+    for model, members in by_model.items():
+        rows = [({k: values.get(k) for k in DATA_REGISTRY[m]["valuation"]["inputs"]}, values.get(m)) for m in members]
+        for key, res in zip(members, _evaluate(model, rows)):
+            models[key] = {"current_value": values.get(key), **res}
+
+    result = {"models": models, "grids": sensitivity_grids(values), "inputs": values,
+              "computed_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+    with _batch_lock:
+        _batch["stamp"], _batch["result"] = stamp, result
+    incr("valuation.batch_runs")
+    return result
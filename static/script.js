@@ -1568,10 +1568,13 @@
                         }
 
                         const lName = link.name || link.key;
+                        const rho = (link.correlation != null)
+                            ? `<span style="color:var(--text-muted);font-size:9px;margin-left:6px" title="${link.observations} daily returns">ρ ${link.correlation.toFixed(2)} · β ${link.beta.toFixed(2)}</span>`
+                            : `<span style="color:var(--text-muted);font-size:9px;margin-left:6px">Linked</span>`;
 
                         html += `<div class="impact-item" style="${isNoData ? 'opacity:0.5' : ''}">
                                     <div class="impact-link" onclick="showEntityPopup('${link.key}')">
-                                        <span>${esc(lName)}</span>
+                                        <span>${esc(lName)}</span>${rho}
                                     </div>
                                     <div style="display:flex;align-items:center">
                                         ${zHtml}
@@ -1625,7 +1628,19 @@
                 html += `</div></div></div>`;
             }
 
-
+            // --- UPCOMING EVENTS ---
+            if (entity.events && entity.events.length > 0) {
+                html += `<div class="cmd-popup-section">`;
+                html += `<div class="cmd-popup-section-title">Upcoming Events</div>`;
+                for (const ev of entity.events) {
+                    const iCls = ev.importance === "high" ? "importance-high" : (ev.importance === "medium" ? "importance-medium" : "importance-low");
+                    html += `<div class="cmd-popup-value-row">
+                                <span class="cmd-popup-value-label ${iCls}">${esc(ev.event)}</span>
+                                <span class="cmd-popup-value-data">${esc(ev.date)} ${esc(ev.time || "")}</span>
+                             </div>`;
+                }
+                html += `</div>`;
+            }
 
             // Explain section
             if (entity.explain) {
@@ -1748,10 +1763,11 @@
         const bodyEl = document.getElementById("cmd-popup-body");
 
         try {
-            const [rA, rB] = await Promise.all([
-                fetch(`/api/entity/${encodeURIComponent(keyA)}`).then(r => r.json()),
-                fetch(`/api/entity/${encodeURIComponent(keyB)}`).then(r => r.json())
-            ]);
+            // One batched request: shared snapshot + aligned 3M closes
+            const batch = await fetch(`/api/entities?keys=${encodeURIComponent(keyA)},${encodeURIComponent(keyB)}&history=3mo`).then(r => r.json());
+            const ents = batch.entities || {};
+            const rA = ents[keyA] || { error: "missing" };
+            const rB = ents[keyB] || { error: "missing" };
 
             if (rA.error || rB.error) {
                 bodyEl.innerHTML = `<div style="color:var(--red)">One or both entities not found: @${keyA}, @${keyB}</div>`;
@@ -1790,6 +1806,27 @@
 
             html += `</div>`; // close grid
 
+            // Aligned history: period return + correlation of daily returns
+            const hist = batch.history || {};
+            const sA = (hist.series || {})[rA.key], sB = (hist.series || {})[rB.key];
+            if (sA && sB && sA.length > 2) {
+                const ret = s => ((s[s.length - 1] / s[0] - 1) * 100);
+                const daily = s => s.slice(1).map((v, i) => v / s[i] - 1);
+                const dA = daily(sA), dB = daily(sB);
+                const mean = a => a.reduce((x, y) => x + y, 0) / a.length;
+                const mA = mean(dA), mB = mean(dB);
+                let cov = 0, vA = 0, vB = 0;
+                for (let i = 0; i < dA.length; i++) {
+                    cov += (dA[i] - mA) * (dB[i] - mB); vA += (dA[i] - mA) ** 2; vB += (dB[i] - mB) ** 2;
+                }
+                const corr = vA && vB ? cov / Math.sqrt(vA * vB) : null;
+                html += `<div class="cmd-popup-section" style="margin-top:10px">`;
+                html += `<div class="cmd-popup-section-title">3M (${hist.dates.length} common days)</div>`;
+                html += `<div class="cmd-popup-value-row"><span class="cmd-popup-value-label">Return</span><span class="cmd-popup-value-data"><span class="${chgCls(ret(sA))}">${ret(sA).toFixed(2)}%</span> vs <span class="${chgCls(ret(sB))}">${ret(sB).toFixed(2)}%</span></span></div>`;
+                if (corr != null) html += `<div class="cmd-popup-value-row"><span class="cmd-popup-value-label">Correlation</span><span class="cmd-popup-value-data">${corr.toFixed(2)}</span></div>`;
+                html += `</div>`;
+            }
+
             // Explanations side by side
             html += `<div style="display:grid;grid-template-columns:1fr 1fr;gap:12px;margin-top:10px;">`;
             html += `<div class="cmd-popup-explain">${rA.explain || "No explanation"}</div>`;
@@ -1,5 +1,7 @@
 import unittest
+import numpy as np
 from engine.analytics import z_score, percentile_rank, real_return, implied_carry_trade, fair_value_ppp
+from engine.analytics import z_scores, rolling_z_scores, rolling_percentile_ranks, real_returns
 
 class TestAnalytics(unittest.TestCase):
     
@@ -54,5 +56,40 @@ class TestAnalytics(unittest.TestCase):
         res = fair_value_ppp(30.0, 0.50, 0.05)
         self.assertEqual(res, 43.5)
 
+
+class TestBatchAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.series = np.round(100 + rng.normal(0, 2, (5, 60)), 1)  # Rounded -> ties
+        self.series[1, [3, 17, 40]] = np.nan
+        self.series[4, :] = 7.0  # Zero variance
+
+    def _history(self, i, t, window):
+        return [None if np.isnan(v) else v for v in self.series[i, t - window:t]]
+
+    def test_rolling_matches_scalar(self):
+        window = 20
+        z = rolling_z_scores(self.series, window)
+        pct = rolling_percentile_ranks(self.series, window)
+        self.assertEqual(z.shape, self.series.shape)
+        self.assertTrue(np.isnan(z[:, :window]).all())
+        for i in range(self.series.shape[0]):
+            for t in range(window, self.series.shape[1]):
+                cur = self.series[i, t]
+                if np.isnan(cur):
+                    self.assertTrue(np.isnan(pct[i, t]))
+                    continue
+                hist = self._history(i, t, window)
+                self.assertAlmostEqual(z[i, t], z_score(cur, hist), places=9)
+                self.assertAlmostEqual(pct[i, t], percentile_rank(cur, hist), places=12)
+
+    def test_cross_section_and_fisher(self):
+        hist = self.series[:, :30]
+        cur = self.series[:, 30]
+        expected = [z_score(c, [None if np.isnan(v) else v for v in row]) for c, row in zip(cur, hist)]
+        np.testing.assert_allclose(z_scores(cur, hist), expected)
+        np.testing.assert_allclose(real_returns([0.50, 0.05, 0.1], [0.40, -0.02, -1.0]), [0.0714286, 0.0714286, 0.0], atol=1e-6)
+
 if __name__ == '__main__':
     unittest.main()
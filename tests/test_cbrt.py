@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from engine import db, macro
+
+
+class TestCBRTTracker(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db_patch = patch.object(db, "DB_PATH", self.path)
+        self.db_patch.start()
+        db.init_db()
+        self.sync_patch = patch.object(macro.STORE, "sync")
+        self.sync_patch.start()
+
+    def tearDown(self):
+        self.sync_patch.stop()
+        self.db_patch.stop()
+        os.remove(self.path)
+
+    def _observe(self, rows):
+        db.upsert_evds_observations("TP.TEST", [(d, d, v) for d, v in rows])
+
+    def test_change_points_are_folded_incrementally(self):
+        self._observe([("2026-01-01", 45.0), ("2026-01-02", 45.0), ("2026-01-23", 42.5), ("2026-01-24", 42.5)])
+        self.assertEqual(macro._update_cbrt_decisions("TP.TEST"), 42.5)
+        self._observe([("2026-03-13", 42.5), ("2026-03-14", 40.0)])
+        with patch.object(macro, "get_evds_observations", wraps=db.get_evds_observations) as obs:
+            self.assertEqual(macro._update_cbrt_decisions("TP.TEST"), 40.0)
+            self.assertEqual(obs.call_args[1]["since"], "2025-12-25")  # Cursor minus the revision window
+        decisions = db.get_cbrt_decisions("TP.TEST")
+        self.assertEqual([(d["obs_date"], d["rate"], d["previous"]) for d in decisions], [
+            ("2026-01-01", 45.0, None), ("2026-01-23", 42.5, 45.0), ("2026-03-14", 40.0, 42.5)])
+
+    def test_revised_rates_replace_stored_decisions(self):
+        self._observe([("2026-01-01", 45.0), ("2026-03-10", 45.0), ("2026-03-12", 42.5), ("2026-03-13", 42.5)])
+        macro._update_cbrt_decisions("TP.TEST")
+        self._observe([("2026-03-12", 43.0), ("2026-03-13", 43.0), ("2026-03-16", 43.0)])   # Revised print
+        self.assertEqual(macro._update_cbrt_decisions("TP.TEST"), 43.0)
+        self.assertEqual([(d["obs_date"], d["rate"], d["previous"]) for d in db.get_cbrt_decisions("TP.TEST")],
+                         [("2026-01-01", 45.0, None), ("2026-03-12", 43.0, 45.0)])
+        self._observe([("2026-03-12", 45.0), ("2026-03-13", 45.0), ("2026-03-16", 45.0)])   # No change after all
+        self.assertEqual(macro._update_cbrt_decisions("TP.TEST"), 45.0)
+        self.assertEqual([d["obs_date"] for d in db.get_cbrt_decisions("TP.TEST")], ["2026-01-01"])
+
+
+if __name__ == '__main__':
+    unittest.main()
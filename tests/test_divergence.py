@@ -0,0 +1,47 @@
+import unittest
+from engine.divergence import DivergenceEngine
+from engine.levels import LevelStore
+from engine.rolling import RollingStats
+
+
+def rule(rid, subject, other, *when, level="WARNING", message="{other_change_pct:+.1f}%"):
+    return {"id": rid, "subject": subject, "other": other, "level": level, "message": message,
+            "when": [dict(zip(("leg", "metric", "op", "value"), c)) for c in when]}
+
+
+class TestDivergenceEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.levels = LevelStore()
+        self.levels.publish("market", {"USDTRY=X": {"price": 41.0, "change_pct": 0.05},
+                                       "XU100.IS": {"price": 10000.0, "change_pct": 1.5},
+                                       "^VIX": {"price": 25.0, "change_pct": 6.0},
+                                       "GC=F": {"price": 2600.0, "change_pct": 0.2}})
+
+    def test_all_pairs_in_one_pass(self):
+        rules = [rule("fragile", "bist100", "vix", ("subject", "change_pct", "gt", 1.0), ("other", "change_pct", "gt", 5.0)),
+                 rule("quiet", "usdtry", "vix", ("subject", "change_pct", "abs_lt", 0.1), ("other", "change_pct", "gt", 10.0)),
+                 rule("missing", "usdtry", "cds", ("subject", "change_pct", "abs_lt", 0.1), ("other", "change_pct", "gt", 2.0))]
+        rules += [rule(f"r{i}", "gold", "usdtry", ("subject", "change_pct", "gt", i / 100)) for i in range(50)]
+        eng = DivergenceEngine(rules, levels=self.levels, stats=RollingStats(persist=False))
+        fired = {a["rule"] for a in eng.evaluate()}
+        self.assertEqual(fired, {"fragile"} | {f"r{i}" for i in range(20)})  # NaN CDS change never fires
+        self.assertEqual(eng.for_entity("bist100")[0]["message"], "+6.0%")
+        self.assertIs(eng.evaluate(), eng.evaluate())  # Cached while inputs are unchanged
+
+    def test_z_score_leg_uses_rolling_window(self):
+        stats = RollingStats(persist=False)
+        stats.replace("GC=F", [2500.0 + (i % 2) * 10 for i in range(40)])
+        eng = DivergenceEngine([rule("gold_z", "gold", "usdtry", ("subject", "z", "gt", 3.0),
+                                     message="gold {subject_z:+.0f} sigma")], levels=self.levels, stats=stats)
+        self.assertEqual(eng.evaluate()[0]["message"], "gold +19 sigma")
+
+    def test_adhoc_check_with_explicit_inputs(self):
+        eng = DivergenceEngine([rule("hidden", "usdtry", "cds", ("subject", "change_pct", "abs_lt", 0.1),
+                                     ("other", "change_pct", "gt", 2.0))], levels=self.levels)
+        self.assertEqual(len(eng.check("usdtry", 0.05, {"cds": {"value": 300, "change_pct": 3.5}})), 1)
+        self.assertEqual(eng.check("usdtry", 1.0, {"cds": {"value": 300, "change_pct": 3.5}}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
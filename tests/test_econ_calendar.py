@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from engine import db
+from engine.econ_calendar import EconomicCalendar
+from engine.releases import ReleaseSchedule
+
+CONFIG = {
+    "fixed": [{"event": "CBRT MPC Meeting", "country": "TR", "importance": "high", "time": "14:00",
+               "entities": ["policy_rate"], "dates": ["2026-09-10", "2026-10-22", "2026-12-10"]}],
+    "monthly": [{"event": "US CPI Release", "country": "US", "importance": "high", "day": 13, "time": "15:30",
+                 "entities": ["us_10y"]}],
+}
+RULES = {"rules": [{"event": "TR CPI Release", "day": 3, "time": "10:00", "lag_months": 1,
+                    "importance": "high", "series": ["cpi_index"], "entities": ["cpi_yoy"]}]}
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+class TestEconomicCalendar(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db_patch = patch.object(db, "DB_PATH", self.path)
+        self.db_patch.start()
+        db.init_db()
+        self.now_patch = patch("engine.econ_calendar.now_tr", return_value=NOW)
+        self.now_patch.start()
+        self.schedule = ReleaseSchedule(RULES, {"cpi_index": "TP.CPI"})
+        self.cal = EconomicCalendar(CONFIG, schedule=self.schedule)
+        self.schedule.calendar = self.cal
+
+    def tearDown(self):
+        self.now_patch.stop()
+        self.db_patch.stop()
+        os.remove(self.path)
+
+    def test_upcoming_skips_past_events(self):
+        nxt = self.cal.upcoming(3, now=NOW)
+        self.assertEqual([(e["date"], e["event"]) for e in nxt], [
+            ("2026-10-22", "CBRT MPC Meeting"), ("2026-11-03", "TR CPI Release"), ("2026-11-13", "US CPI Release")])
+        self.assertEqual(self.cal.upcoming(1, now=NOW, country="US")[0]["date"], "2026-11-13")
+
+    def test_window_and_entity_queries(self):
+        self.assertEqual(len(self.cal.window("2026-10-01", "2026-10-31")), 3)
+        self.assertEqual([e["date"] for e in self.cal.for_entity("policy_rate", now=NOW)], ["2026-10-22", "2026-12-10"])
+        self.assertEqual(self.cal.for_entity("nobody", now=NOW), [])
+        self.assertEqual(self.cal.next_of("CBRT MPC Meeting", now=NOW)["date"], "2026-10-22")
+        self.assertEqual(self.cal.last_of("CBRT MPC Meeting", now=NOW)["date"], "2026-09-10")
+
+    def test_corrected_date_moves_release_clock(self):
+        self.cal.reload()  # Seed the table first
+        self.assertTrue(db.set_calendar_date("TR CPI Release", "TR", "2026-11", "2026-11-04"))
+        self.cal.reload()
+        rule = self.schedule.rule_for("TP.CPI")
+        self.assertEqual(self.schedule.next_release(rule, NOW), datetime(2026, 11, 4, 10, 0))
+        self.assertEqual(self.schedule.state("TP.CPI", "2026-09-01", datetime(2026, 11, 3, 12, 0)), "landed")
+
+    def test_config_correction_reseeds_but_hand_fix_survives(self):
+        self.cal.reload()
+        db.set_calendar_date("US CPI Release", "US", "2026-11", "2026-11-12")
+        fixed = {**CONFIG, "fixed": [{**CONFIG["fixed"][0], "dates": ["2026-09-10", "2026-10-23", "2026-12-10"]}],
+                 "monthly": [{**CONFIG["monthly"][0], "day": 14}]}
+        cal = EconomicCalendar(fixed, schedule=self.schedule)
+        self.assertEqual(cal.next_of("CBRT MPC Meeting", now=NOW)["date"], "2026-10-23")   # Config fix applied
+        self.assertEqual([e["date"] for e in cal.window("2026-11-01", "2026-12-31") if e["event"] == "US CPI Release"],
+                         ["2026-11-12", "2026-12-14"])                                      # Hand fix kept
+
+    def test_correction_into_another_month_leaves_no_copy(self):
+        self.cal.reload()
+        moved = {**CONFIG, "fixed": [{**CONFIG["fixed"][0], "dates": ["2026-09-10", "2026-11-02", "2026-12-10"]}]}
+        cal = EconomicCalendar(moved, schedule=self.schedule)
+        self.assertEqual([e["date"] for e in cal.window("2026-09-01", "2026-12-31") if e["event"] == "CBRT MPC Meeting"],
+                         ["2026-09-10", "2026-11-02", "2026-12-10"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from engine import db
+from engine.evds import EVDSClient, EVDSStore, evds_iso
+
+
+def _fake_response(codes):
+    resp = MagicMock()
+    resp.status_code = 200
+    resp.json.return_value = {"items": [
+        {"Tarih": "2026-1", **{c.replace(".", "_"): "10.5" for c in codes}},
+        {"Tarih": "2026-2", **{c.replace(".", "_"): "11.0" for c in codes}},
+    ]}
+    return resp
+
+
+class TestEVDSClient(unittest.TestCase):
+
+    def setUp(self):
+        self.client = EVDSClient()
+        self.calls = []
+
+        def fake_get(url, headers=None, timeout=None):
+            series = url.split("series=")[1].split("&")[0]
+            self.calls.append(series)
+            time.sleep(0.05)
+            return _fake_response(series.split("-"))
+
+        self.client.http = MagicMock(get=fake_get)
+
+    @patch("engine.evds.EVDS_API_KEY", "test")
+    def test_batches_same_window(self):
+        res = self.client.fetch_many(["TP.A1", "TP.B2", "TP.C3"], "01-01-2026", "01-03-2026")
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.calls[0], "TP.A1-TP.B2-TP.C3")
+        self.assertEqual(res["TP.B2"][-1], {"Tarih": "2026-2", "TP_B2": "11.0"})
+
+    @patch("engine.evds.EVDS_API_KEY", "test")
+    def test_concurrent_callers_share_request(self):
+        out = []
+        threads = [threading.Thread(target=lambda: out.append(self.client.fetch("TP.X9", "02-01-2026", "01-03-2026")))
+                   for _ in range(5)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(all(len(items) == 2 for items in out))
+
+    @patch("engine.evds.EVDS_API_KEY", "test")
+    def test_failed_batch_retries_singly(self):
+        def flaky_get(url, headers=None, timeout=None):
+            series = url.split("series=")[1].split("&")[0]
+            self.calls.append(series)
+            if "-" in series or series == "TP.BAD":
+                resp = MagicMock(); resp.status_code = 400
+                return resp
+            return _fake_response([series])
+
+        self.client.http = MagicMock(get=flaky_get)
+        res = self.client.fetch_many(["TP.OK1", "TP.BAD"], "03-01-2026", "01-03-2026")
+        self.assertEqual(len(res["TP.OK1"]), 2)
+        self.assertEqual(res["TP.BAD"], [])
+        self.assertEqual(len(self.calls), 3)
+
+
+class TestEVDSStore(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db_patch = patch.object(db, "DB_PATH", self.path)
+        self.db_patch.start()
+        db.init_db()
+        self.client = MagicMock()
+        self.client._spec.side_effect = lambda code, start: (code, start, "today", None)
+        self.store = EVDSStore(client=self.client)
+
+    def tearDown(self):
+        self.db_patch.stop()
+        os.remove(self.path)
+
+    def _serve(self, rows):
+        self.client.fetch_specs.side_effect = lambda specs: {
+            s: [{"Tarih": t, s[0].replace(".", "_"): v} for t, v in rows] for s in specs
+        }
+
+    def test_evds_iso_formats(self):
+        self.assertEqual(evds_iso("13-02-2026"), "2026-02-13")
+        self.assertEqual(evds_iso("2026-1"), "2026-01-01")
+        self.assertEqual(evds_iso("2025-Q3"), "2025-07-01")
+        self.assertIsNone(evds_iso("garbage"))
+
+    def test_growth_from_local_data(self):
+        self._serve([(f"2025-{m}", str(100 + m)) for m in range(1, 13)] + [("2026-1", "120,0")])
+        self.store.sync([("TP.IDX", 400)])
+        yoy, label = self.store.growth("TP.IDX", 12)
+        self.assertEqual(label, "2026-1")
+        self.assertAlmostEqual(yoy, round((120 / 101 - 1) * 100, 2))
+        self.assertEqual(self.store.last("TP.IDX"), (120.0, "2026-1"))
+
+    def test_recent_sync_skips_network(self):
+        self._serve([("2026-1", "1.0")])
+        self.store.sync([("TP.IDX", 60)])
+        self.store.sync([("TP.IDX", 60)])
+        self.assertEqual(self.client.fetch_specs.call_count, 1)
+
+    def test_stale_sync_pulls_only_trailing_window(self):
+        self._serve([(f"2026-{m}", "1.0") for m in range(1, 4)])
+        self.store.sync([("TP.IDX", 800)])
+        self.store.sync([("TP.IDX", 800)], min_interval=0)
+        (spec,), = self.client.fetch_specs.call_args[0]
+        days_back = (time.time() - time.mktime(time.strptime(spec[1], "%d-%m-%Y"))) / 86400
+        self.assertLess(days_back, 800)
+
+
+if __name__ == '__main__':
+    unittest.main()
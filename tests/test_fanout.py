@@ -0,0 +1,66 @@
+import time
+import unittest
+from unittest.mock import patch
+from engine import fanout
+from engine.cache import set_cached, get_last_good
+from engine.fanout import fan_out, run_shared
+
+
+class TestFanOut(unittest.TestCase):
+
+    def test_runs_sources_concurrently(self):
+        t0 = time.time()
+        res, status = fan_out({name: (lambda name=name: time.sleep(0.2) or name) for name in "abcd"}, deadline=2)
+        self.assertLess(time.time() - t0, 0.6)
+        self.assertEqual(res, {n: n for n in "abcd"})
+        self.assertTrue(all(s["status"] == "ok" for s in status.values()))
+
+    def test_deadline_falls_back_to_last_good(self):
+        set_cached("test_fo:slow", {"val": 1})
+        late = []
+        t0 = time.time()
+        res, status = fan_out({"slow": (lambda: time.sleep(0.5) or {"val": 2}, 0.1), "fast": lambda: {"val": 3}},
+                              key_prefix="test_fo", on_late=late.append)
+        self.assertLess(time.time() - t0, 0.4)
+        self.assertEqual(res["slow"], {"val": 1})
+        self.assertEqual(status["slow"]["status"], "stale")
+        self.assertEqual(res["fast"], {"val": 3})
+        time.sleep(0.6)
+        self.assertEqual(late, ["slow"])
+        self.assertEqual(get_last_good("test_fo:slow"), {"val": 2})
+
+    def test_overlapping_calls_share_inflight_source(self):
+        calls = []
+        def slow():
+            calls.append(1); time.sleep(0.2); return 42
+        fan_out({"x": (slow, 0.01)}, key_prefix="test_share")
+        res, _ = fan_out({"x": (slow, 1)}, key_prefix="test_share")
+        self.assertEqual(res["x"], 42)
+        self.assertEqual(len(calls), 1)
+
+    def test_error_without_fallback(self):
+        res, status = fan_out({"bad": lambda: 1 / 0})
+        self.assertIsNone(res["bad"])
+        self.assertEqual(status["bad"]["status"], "error")
+
+    def test_nested_fan_out_does_not_starve(self):
+        def panel(i):
+            inner, _ = fan_out({k: (lambda k=k: time.sleep(0.05) or k) for k in "xy"}, deadline=1)
+            return inner
+        with patch.object(fanout, "POOL_WORKERS", 2), patch.dict(fanout._pools, clear=True):
+            res, status = fan_out({i: (lambda i=i: panel(i)) for i in range(4)}, deadline=2)
+        self.assertEqual(res, {i: {"x": "x", "y": "y"} for i in range(4)})   # One shared pool of 2 would time out
+
+    def test_shared_call_with_deadline_serves_last_good(self):
+        set_cached("test_rs", 1)
+        late = []
+        t0 = time.time()
+        self.assertEqual(run_shared("test_rs", lambda: time.sleep(0.3) or 2, deadline=0.05, on_late=late.append), 1)
+        self.assertLess(time.time() - t0, 0.2)
+        time.sleep(0.4)
+        self.assertEqual(late, ["test_rs"])
+        self.assertEqual(run_shared("test_rs", lambda: 3, deadline=1), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
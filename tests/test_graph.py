@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from unittest.mock import patch
+from engine import graph
+from engine.graph import link_stats, get_impact_chain
+from engine.levels import LevelStore
+from engine.rolling import RollingStats
+
+DAY = 86400
+
+
+def _rows(sym, closes, start=1_700_000_000):
+    return [(sym, start + i * DAY, float(c)) for i, c in enumerate(closes)]
+
+
+class TestLinkStats(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        r = rng.normal(0, 0.01, 60)
+        self.trigger = 100 * np.cumprod(1 + r)
+        self.follower = 50 * np.cumprod(1 + 2 * r)        # beta 2, corr 1
+        self.noise = 20 * np.cumprod(1 + rng.normal(0, 0.01, 60))
+
+    def test_measured_correlation_and_beta(self):
+        rows = _rows("T", self.trigger) + _rows("F", self.follower) + _rows("N", self.noise)
+        stats = link_stats("T", ["F", "N", "MISSING"], rows)
+        self.assertEqual(stats["F"], (1.0, 2.0, 59))
+        self.assertLess(abs(stats["N"][0]), 0.5)
+        self.assertNotIn("MISSING", stats)
+
+    def test_only_shared_dates_count(self):
+        rows = _rows("T", self.trigger) + _rows("F", self.follower)[:15]  # Too short to measure
+        self.assertEqual(link_stats("T", ["F"], rows), {})
+
+
+class TestImpactChain(unittest.TestCase):
+
+    def test_chain_is_one_batch(self):
+        trigger = {"key": "oil", "source": "market", "technical_key": "BZ=F", "name": "Brent",
+                   "correlations": ["A.IS", "B.IS"]}
+        stats = RollingStats(persist=False)
+        closes = np.linspace(10, 12, 40)
+        stats.replace("A.IS", closes)
+        levels = LevelStore()
+        levels.publish("market", {"A.IS": {"price": 14.0, "change_pct": 3.0}})
+        rows = _rows("BZ=F", closes) + _rows("A.IS", closes * 2)
+        with patch("engine.registry.resolve_entity", side_effect=lambda k: trigger if k == "oil" else None), \
+             patch.object(graph.SCANNER, "stats", stats), patch("engine.resolver.LEVELS", levels), \
+             patch.object(graph, "_top_up") as top_up, \
+             patch.object(graph, "get_price_history_rows", return_value=rows) as load:
+            graph._stats_cache.clear()
+            chain = get_impact_chain("oil")
+            get_impact_chain("oil")
+        top_up.assert_called_with(["BZ=F", "A.IS", "B.IS"], stats)
+        self.assertEqual(load.call_args[0][0], ["BZ=F", "A.IS", "B.IS"])
+        a, b = chain
+        self.assertEqual(a["correlation"], 1.0)
+        self.assertEqual(a["beta"], 1.0)
+        self.assertGreater(a["z_score"], 3)
+        self.assertEqual(a["alert"]["type"], "BLACK_SWAN")
+        self.assertEqual(b["status"], "No Data")
+        self.assertIsNone(b["correlation"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from engine import httpclient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"x" * (4096 if self.path == "/big" else 16)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def test_keep_alive_reuses_connection(self):
+        for _ in range(5):
+            self.assertEqual(httpclient.get(self.base + "/small").content, b"x" * 16)
+        stats = httpclient.connection_stats()["127.0.0.1"]
+        self.assertGreaterEqual(stats["requests"], 5)
+        self.assertLess(stats["connections"], stats["requests"])
+        self.assertGreater(stats["reuse_rate"], 0.5)
+
+    def test_size_limit(self):
+        with self.assertRaises(httpclient.ResponseTooLarge):
+            httpclient.get(self.base + "/big", max_bytes=1024)
+        self.assertEqual(len(httpclient.get(self.base + "/big").content), 4096)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import patch
+from engine.cache import set_cached
+from engine.levels import LevelStore, LEVELS, PRIORITY_SECONDS
+
+
+class TestLevelStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = LevelStore()
+
+    def test_feeds_publish_entity_levels(self):
+        self.store.publish("market", {"USDTRY=X": {"price": 41.2, "change_pct": 0.3},
+                                      "AKBNK.IS": {"price": 55.0, "change_pct": -1.0}})
+        self.store.publish("bonds", {"tr_10y": 30.5, "risk_premium": 26.0})
+        self.store.publish("turkey_macro", [{"key": "cpi_yoy", "last": 33.3, "unit": "%"}])
+        self.assertEqual(self.store.level("usdtry"), (41.2, "", 0.3))
+        self.assertEqual(self.store.level("AKBNK.IS"), (55.0, "", -1.0))  # Raw ticker
+        self.assertEqual(self.store.level("tr_10y"), (30.5, "%", None))
+        self.assertEqual(self.store.level("risk_premium"), (2600.0, "bps", None))
+        self.assertEqual(self.store.level("cpi_yoy"), (33.3, "%", None))
+        rec = self.store.get("usdtry")
+        self.assertEqual(rec["source"], "market")
+        self.assertIn("ts", rec)
+        self.assertEqual(self.store.level("nope"), (None, None, None))
+
+    def test_higher_priority_feed_wins(self):
+        self.store.publish("macro", {"policy_rates": {"deposit": 45.0}})
+        self.store.publish("turkey_macro", [{"key": "deposit_rate", "last": 44.0, "unit": "%"}])
+        self.assertEqual(self.store.level("deposit_rate"), (45.0, "%", None))
+        self.store.publish("macro", {"policy_rates": {"deposit": 46.0}})
+        self.assertEqual(self.store.level("deposit_rate"), (46.0, "%", None))
+
+    def test_placeholder_and_stale_values_do_not_block(self):
+        self.store.publish("macro", {"policy_rates": {"deposit": "N/A"}})
+        self.store.publish("turkey_macro", [{"key": "deposit_rate", "last": 44.0, "unit": "%"}])
+        self.assertEqual(self.store.level("deposit_rate")[0], 44.0)
+        self.store.publish("macro", {"policy_rates": {"deposit": "N/A"}})  # Never replaces a real value
+        self.assertEqual(self.store.level("deposit_rate")[0], 44.0)
+        self.store.publish("macro", {"policy_rates": {"deposit": 45.0}})
+        with patch("engine.levels.time.time", return_value=self.store.get("deposit_rate")["ts"] + PRIORITY_SECONDS + 1):
+            self.store.publish("turkey_macro", [{"key": "deposit_rate", "last": 43.0, "unit": "%"}])
+        self.assertEqual(self.store.level("deposit_rate"), (43.0, "%", None))  # The macro value went stale
+
+    def test_set_cached_publishes_to_shared_store(self):
+        set_cached("erp", {"erp": 4.2, "pe": 6.1})
+        self.assertEqual(LEVELS.level("pe"), (6.1, "x", None))
+
+    def test_lookup_never_fetches(self):
+        from engine.resolver import get_current_level
+        with patch("engine.resolver.LEVELS", LevelStore()), \
+             patch("engine.resolver.fetch_turkey_macro") as fetch:
+            self.assertEqual(get_current_level("core_cpi", {"technical_key": "core_cpi", "source": "macro"}),
+                             (None, None, None))
+            fetch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import time
+import unittest
+from unittest.mock import patch
+from engine.cache import set_cached
+from engine.materialize import AnalysisMaterializer, HOT_SEED
+
+
+class TestMaterializer(unittest.TestCase):
+
+    def setUp(self):
+        self.mat = AnalysisMaterializer()
+
+    def test_hot_set_follows_access_frequency(self):
+        now = time.time()
+        for _ in range(5): self.mat.record_access("gold", now)
+        self.mat.record_access("dxy", now)
+        self.mat.record_access("old_news", now - 3 * 86400)
+        hot = self.mat.hot_keys(n=2, now=now)
+        self.assertEqual(hot[:len(HOT_SEED)], HOT_SEED)
+        self.assertEqual(hot[len(HOT_SEED):], ["gold", "dxy"])
+
+    @patch("engine.resolver.get_entity_analysis", return_value={"alert": {"msg": "x"}})
+    @patch("engine.resolver.get_current_level", return_value=(1.5, "%", None))
+    def test_recomputes_only_after_input_refresh(self, level, analysis):
+        set_cached("bonds", {"tr_10y": 30})
+        first = self.mat.get_or_compute("tr_10y")
+        self.assertEqual(first["level"], (1.5, "%", None))
+        self.assertIs(self.mat.get_or_compute("tr_10y"), first)
+        self.assertFalse(self.mat.needs_refresh("tr_10y"))
+        time.sleep(0.01)
+        set_cached("bonds", {"tr_10y": 31})
+        self.assertTrue(self.mat.needs_refresh("tr_10y"))
+        self.assertEqual(analysis.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
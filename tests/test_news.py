@@ -0,0 +1,130 @@
+import os
+import time
+import unittest
+from unittest.mock import patch
+import feedparser
+from engine import news
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "news")
+
+RSS = """<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>
+{items}
+</channel></rss>"""
+ITEM = "<item><title>{t}</title><link>https://x/{t}</link><guid>g-{t}</guid><description>&lt;p&gt;Body {t}&lt;/p&gt;</description><pubDate>Mon, 19 Oct 2026 10:00:00 GMT</pubDate></item>"
+
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status_code = status
+        self.content = body
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400: raise RuntimeError(self.status_code)
+
+
+def rss(*titles):
+    return RSS.format(items="".join(ITEM.format(t=t) for t in titles)).encode()
+
+
+def reset_state():
+    news._validators.clear()
+    news._body_hashes.clear()
+    news._seen.clear()
+    news._seen_loaded = True  # Never seed from the real archive in tests
+
+
+class TestNewsIngestion(unittest.TestCase):
+
+    def setUp(self):
+        reset_state()
+
+    def test_conditional_get_and_only_new_entries(self):
+        calls = []
+
+        def fake_get(url, headers=None, timeout=None):
+            calls.append(headers)
+            if headers.get("If-None-Match") == '"v2"':
+                return FakeResponse(304)
+            if headers.get("If-None-Match") == '"v1"':
+                return FakeResponse(200, rss("a", "b", "c"), {"ETag": '"v2"'})
+            return FakeResponse(200, rss("a", "b"), {"ETag": '"v1"', "Last-Modified": "Mon, 19 Oct 2026 10:00:00 GMT"})
+
+        with patch.object(news.http, "get", side_effect=fake_get), \
+             patch.object(news, "archive_news") as archive:
+            first = news.refresh_feeds({"S": "https://feed"})
+            second = news.refresh_feeds({"S": "https://feed"})
+            third = news.refresh_feeds({"S": "https://feed"})
+        self.assertEqual((first, second, third), ({"S": 200}, {"S": 200}, {"S": 304}))
+        archived = [[i["title"] for i in c[0][0]] for c in archive.call_args_list]
+        self.assertEqual(archived, [["a", "b"], ["c"]])   # a, b were already seen; the 304 archives nothing
+        self.assertEqual(archive.call_args_list[0][0][0][0]["summary"], "Body a")
+        self.assertEqual(calls[1], {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 19 Oct 2026 10:00:00 GMT"})
+
+    def test_failed_archive_is_retried(self):
+        def fake_get(url, headers=None, timeout=None):
+            if headers.get("If-None-Match") == '"v1"':
+                return FakeResponse(304)
+            return FakeResponse(200, rss("a"), {"ETag": '"v1"'})
+
+        with patch.object(news.http, "get", side_effect=fake_get), \
+             patch.object(news, "archive_news", side_effect=[RuntimeError("locked"), None]) as archive:
+            with self.assertRaises(RuntimeError):
+                news.refresh_feeds({"S": "https://feed"})
+            self.assertEqual(news.refresh_feeds({"S": "https://feed"}), {"S": 200})
+            self.assertEqual(news.refresh_feeds({"S": "https://feed"}), {"S": 304})
+        self.assertEqual(len(archive.call_args_list[1][0][0]), 1)
+
+    def test_refresh_is_bounded_by_slowest_feed(self):
+        def slow_get(url, headers=None, timeout=None):
+            time.sleep(0.3)
+            return FakeResponse(200, rss(url[-1]))
+
+        sources = {f"S{i}": f"https://feed/{i}" for i in range(6)}
+        with patch.object(news.http, "get", side_effect=slow_get), \
+             patch.object(news, "archive_news") as archive:
+            t0 = time.perf_counter()
+            status = news.refresh_feeds(sources)
+            elapsed = time.perf_counter() - t0
+        self.assertLess(elapsed, 1.0)   # Six 0.3s feeds, fetched together
+        self.assertEqual(set(status.values()), {200})
+        self.assertEqual(len(archive.call_args[0][0]), 6)
+
+    def test_strip_tags(self):
+        self.assertEqual(news.strip_tags('<p><img src="x.jpg" /></p><p><b>Faiz</b> &ndash; kararı</p><script>x()</script>'),
+                         "Faiz – kararı")
+        self.assertEqual(news.strip_tags("plain  text"), "plain text")
+
+
+class TestNewsSkippedWork(unittest.TestCase):
+    """What a refresh of the recorded fixtures parses and strips, cold and repeated."""
+
+    def setUp(self):
+        reset_state()
+        self.bodies = {}
+        for fname in sorted(os.listdir(FIXTURES)):
+            with open(os.path.join(FIXTURES, fname), "rb") as f:
+                self.bodies[fname[:-4]] = f.read()
+
+    def test_seen_entries_and_identical_bodies_skip_work(self):
+        sources = {n: f"https://fixture/{n}" for n in self.bodies}
+        serve = lambda url, headers=None, timeout=None: FakeResponse(200, self.bodies[url.rsplit("/", 1)[1]])
+        feeds, entries = len(self.bodies), 30 * len(self.bodies)
+        with patch.object(news.http, "get", side_effect=serve), \
+             patch.object(news, "archive_news") as archive, \
+             patch.object(news.feedparser, "parse", wraps=feedparser.parse) as parse, \
+             patch.object(news, "strip_tags", wraps=news.strip_tags) as strip:
+            news.refresh_feeds(sources)
+            self.assertEqual((parse.call_count, strip.call_count), (feeds, entries))   # Cold: everything
+
+            news.refresh_feeds(sources)
+            self.assertEqual((parse.call_count, strip.call_count), (feeds, entries))   # Identical bodies: no parse
+
+            news._body_hashes.clear()   # Same entries in a new document (e.g. a changed lastBuildDate)
+            news.refresh_feeds(sources)
+            self.assertEqual((parse.call_count, strip.call_count), (2 * feeds, entries))   # Parsed, nothing stripped
+        self.assertEqual(len(archive.call_args_list[0][0][0]), entries)
+        self.assertEqual(archive.call_count, 1)   # Later refreshes find nothing new
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import threading
+import unittest
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from engine import pages
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    served = []
+
+    def do_GET(self):
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.served.append(304)
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"<html><body>CDS 245.50</body></html>"
+        self.served.append(200)
+        self.send_response(200)
+        if self.path == "/etag":
+            self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPages(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        _Handler.served.clear()
+        self.parses = 0
+
+    def _parser(self, html):
+        self.parses += 1
+        return float(html.split("CDS ")[1].split("<")[0])
+
+    def test_etag_revalidation_skips_body_and_parse(self):
+        url = self.base + "/etag"
+        self.assertEqual(pages.extract(url, self._parser, name="t1"), 245.5)
+        self.assertEqual(pages.extract(url, self._parser, name="t1"), 245.5)
+        self.assertEqual(_Handler.served, [200, 304])
+        self.assertEqual(self.parses, 1)
+
+    def test_unchanged_body_without_validators_skips_parse(self):
+        url = self.base + "/plain"
+        first = pages.fetch_page(url)
+        second = pages.fetch_page(url)
+        self.assertTrue(first["changed"])
+        self.assertFalse(second["changed"])
+        pages.extract(url, self._parser, name="t2")
+        pages.extract(url, self._parser, name="t2")
+        self.assertEqual(_Handler.served, [200] * 4)
+        self.assertEqual(self.parses, 1)
+
+    def test_page_cache_is_lru_bounded(self):
+        with patch.object(pages, "MAX_PAGES", 2):
+            pages.extract(self.base + "/a", self._parser, name="t3")
+            pages.fetch_page(self.base + "/b")
+            pages.fetch_page(self.base + "/a")   # Touch: /b is now the oldest
+            pages.fetch_page(self.base + "/c")
+            self.assertEqual(list(pages._pages)[-2:], [self.base + "/a", self.base + "/c"])
+            self.assertNotIn(self.base + "/b", pages._pages)
+            self.assertLessEqual(len(pages._pages), 2)
+            pages.fetch_page(self.base + "/d")
+            self.assertNotIn((self.base + "/a", "t3"), pages._extracted)
+
+
+if __name__ == '__main__':
+    unittest.main()
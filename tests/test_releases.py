@@ -0,0 +1,52 @@
+import math
+import unittest
+from datetime import datetime
+from engine.releases import ReleaseSchedule
+
+RULES = {
+    "poll_seconds": 60,
+    "window_hours": 72,
+    "rules": [
+        {"event": "TR CPI Release", "day": 3, "time": "10:00", "lag_months": 1, "series": ["cpi_index"]},
+        {"event": "TR GDP Release", "day": 1, "time": "10:00", "lag_months": 5, "months": [3, 6, 9, 12],
+         "series": ["gdp_volume"]},
+    ],
+}
+
+
+class TestReleaseSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.sched = ReleaseSchedule(RULES, {"cpi_index": "TP.CPI", "gdp_volume": "TP.GDP"})
+
+    def test_release_dates(self):
+        rule = self.sched.rule_for("TP.CPI")
+        now = datetime(2026, 10, 3, 9, 0)
+        self.assertEqual(self.sched.last_release(rule, now), datetime(2026, 9, 3, 10, 0))
+        self.assertEqual(self.sched.next_release(rule, now), datetime(2026, 10, 3, 10, 0))
+        gdp = self.sched.rule_for("TP.GDP")
+        self.assertEqual(self.sched.next_release(gdp, now), datetime(2026, 12, 1, 10, 0))
+        self.assertEqual(self.sched.expected_period(gdp, datetime(2026, 12, 1, 10, 0)), "2026-07-01")
+
+    def test_held_until_release_then_polled(self):
+        before = datetime(2026, 10, 2, 12, 0)
+        self.assertEqual(self.sched.sync_interval("TP.CPI", "2026-08-01", 600, before), math.inf)
+        after = datetime(2026, 10, 3, 10, 5)
+        self.assertEqual(self.sched.state("TP.CPI", "2026-08-01", after), "pending")
+        self.assertEqual(self.sched.sync_interval("TP.CPI", "2026-08-01", 600, after), 60)
+        self.assertEqual(self.sched.sync_interval("TP.CPI", "2026-09-01", 600, after), math.inf)
+        late = datetime(2026, 10, 8, 10, 0)
+        self.assertEqual(self.sched.sync_interval("TP.CPI", "2026-08-01", 600, late), 600)
+        self.assertEqual(self.sched.sync_interval("TP.OTHER", None, 600, late), 600)
+
+    def test_in_window_and_events(self):
+        after = datetime(2026, 10, 3, 11, 0)
+        last = {"TP.CPI": "2026-08-01", "TP.GDP": "2026-04-01"}
+        self.assertTrue(self.sched.in_window(["TP.CPI", "TP.GDP"], last.get, after))
+        self.assertFalse(self.sched.in_window(["TP.GDP"], last.get, after))
+        events = self.sched.events("2026-11-01", "2026-12-31")
+        self.assertEqual([e["date"] for e in events], ["2026-11-03", "2026-12-03", "2026-12-01"])
+
+
+if __name__ == '__main__':
+    unittest.main()
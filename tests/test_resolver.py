@@ -0,0 +1,72 @@
+import time
+import unittest
+from unittest.mock import patch
+from engine import resolver
+from engine.levels import LevelStore
+
+FAST = {"alert": 0.3, "valuation": 0.3, "graph": 0.3, "seasonality": 0.3, "divergence": 0.3}
+
+
+class TestEntityAnalysis(unittest.TestCase):
+
+    @patch.dict(resolver.STAGE_DEADLINES, FAST)
+    @patch("engine.resolver.get_impact_chain", return_value=[{"target": "x"}])
+    @patch("engine.resolver.compute_fair_value", side_effect=lambda k, v: time.sleep(1.0) or {"fair": 1})
+    @patch.object(resolver.SCANNER, "check_anomaly", return_value={"msg": "2 sigma"})
+    def test_slow_stage_does_not_block_popup(self, *_):
+        t0 = time.time()
+        res = resolver.get_entity_analysis("test_entity_a", 10.0, 1.0)
+        self.assertLess(time.time() - t0, 0.8)
+        self.assertEqual(res["alert"], {"msg": "2 sigma"})
+        self.assertEqual(res["graph"], [{"target": "x"}])
+        self.assertNotIn("valuation", res)
+        self.assertEqual(res["_stages"]["valuation"]["status"], "timeout")
+        self.assertEqual(res["_stages"]["alert"]["status"], "ok")
+
+    @patch.dict(resolver.STAGE_DEADLINES, FAST)
+    @patch("engine.resolver.get_impact_chain", side_effect=RuntimeError("boom"))
+    @patch("engine.resolver.compute_fair_value", return_value=None)
+    @patch.object(resolver.SCANNER, "check_anomaly", return_value=None)
+    def test_failed_stage_reports_error(self, *_):
+        res = resolver.get_entity_analysis("test_entity_b", 10.0, 1.0)
+        self.assertEqual(res["_stages"]["graph"]["status"], "error")
+        self.assertEqual(set(res), {"_stages"})
+
+    @patch.dict(resolver.STAGE_DEADLINES, FAST)
+    @patch("engine.resolver.get_impact_chain", return_value=None)
+    @patch("engine.resolver.compute_fair_value", side_effect=lambda k, v: time.sleep(0.1) or {"at": v})
+    @patch.object(resolver.SCANNER, "check_anomaly", return_value=None)
+    def test_live_stages_not_shared_across_values(self, *_):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(2) as pool:
+            a, b = pool.map(lambda v: resolver.get_entity_analysis("test_entity_c", v), (10.0, 12.0))
+        self.assertEqual(a["valuation"], {"at": 10.0})
+        self.assertEqual(b["valuation"], {"at": 12.0})
+
+
+class TestEntitiesBatch(unittest.TestCase):
+
+    @patch("engine.market.fetch_history")
+    @patch("engine.resolver.fetch_market_data")
+    @patch("engine.resolver.LEVELS", new_callable=LevelStore)
+    def test_shared_snapshot_and_deduplicated_history(self, _levels, market, history):
+        market.return_value = {"XU100.IS": {"price": 10000.0, "change_pct": 1.0},
+                               "USDTRY=X": {"price": 40.0, "change_pct": 0.1}}
+        day = 86400
+        history.side_effect = lambda sym, period: [
+            {"time": t * day, "close": float(t + (100 if sym == "USDTRY=X" else 0))}
+            for t in ([1, 2, 3, 4] if sym == "USDTRY=X" else [2, 3, 4, 5])]
+        res = resolver.get_entities_batch(["bist100", "XU100.IS", "usdtry", "nope"], history_period="3mo")
+        self.assertEqual(market.call_count, 1)
+        self.assertEqual(history.call_count, 2)
+        ents = res["entities"]
+        self.assertEqual(ents["bist100"]["current_value"], 10000.0)
+        self.assertEqual(ents["XU100.IS"]["key"], "bist100")
+        self.assertEqual(ents["usdtry"]["current_value"], 40.0)
+        self.assertIn("error", ents["nope"])
+        self.assertEqual(res["history"]["dates"], ["1970-01-03", "1970-01-04", "1970-01-05"])
+        self.assertEqual(res["history"]["series"]["usdtry"], [102.0, 103.0, 104.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import random
+import tempfile
+import statistics
+import unittest
+from unittest.mock import patch
+from engine import db
+from engine.rolling import RollingWindow, RollingStats, closed_bars
+from engine.alerts import SigmaScanner
+
+SYMBOL = "TEST_ROLLING.IS"
+
+
+class TestRollingWindow(unittest.TestCase):
+
+    def test_matches_full_recompute_while_sliding(self):
+        rng = random.Random(7)
+        w = RollingWindow(size=30)
+        seen = []
+        for _ in range(200):
+            x = rng.gauss(100, 5)
+            w.push(x)
+            seen.append(x)
+            tail = seen[-30:]
+            self.assertAlmostEqual(w.mean, statistics.mean(tail), places=6)
+            if len(tail) > 1:
+                self.assertAlmostEqual(w.std(), statistics.stdev(tail), places=6)
+            self.assertEqual(w.min, min(tail))
+            self.assertEqual(w.max, max(tail))
+
+
+class TestRollingStats(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db_patch = patch.object(db, "DB_PATH", self.path)
+        self.db_patch.start()
+        db.init_db()
+
+    def tearDown(self):
+        self.db_patch.stop()
+        os.remove(self.path)
+
+    def test_only_new_bars_are_added_and_restart_rebuilds_from_store(self):
+        stats = RollingStats(size=25)
+        bars = [(86400 * i, 100.0 + (i % 3)) for i in range(29, -1, -1)]
+        self.assertEqual(stats.add_bars(SYMBOL, bars), 30)
+        self.assertEqual(stats.add_bars(SYMBOL, bars[-5:] + [(86400 * 30, 104.0)]), 1)
+        before = stats.window(SYMBOL)
+
+        restarted = RollingStats(size=25)
+        after = restarted.window(SYMBOL)
+        self.assertEqual(list(after.values), list(before.values))
+        self.assertEqual(after.last_time, 86400 * 30)
+        self.assertAlmostEqual(after.z(110.0), before.z(110.0))
+
+    def test_scanner_scores_without_refetching(self):
+        scanner = SigmaScanner(RollingStats(size=63))
+        now = 1_790_164_800   # Wed 2026-09-23 12:00 UTC
+        day = 86400
+        rows = [{"time": now - 12 * 3600 - day * (40 - i), "close": 100.0 + (i % 2)} for i in range(41)]
+        with patch("engine.alerts.fetch_history", return_value=rows) as fetch, \
+             patch("engine.rolling.time.time", return_value=now):
+            self.assertEqual(scanner.check_anomaly(SYMBOL, 110.0)["type"], "BLACK_SWAN")
+        self.assertEqual(scanner.stats.window(SYMBOL).n, 40)  # Today's running bar left out
+        with patch("engine.alerts.fetch_history", return_value=rows) as fetch, \
+             patch("engine.rolling.RETRY_SECONDS", 0):
+            for hours in (1, 11.9):   # Tuesday's close is the newest bar until Wednesday's day is over
+                with patch("engine.rolling.time.time", return_value=now + hours * 3600):
+                    self.assertIsNone(scanner.check_anomaly(SYMBOL, 100.5))
+            self.assertEqual(fetch.call_count, 0)
+            with patch("engine.rolling.time.time", return_value=now + 12 * 3600):
+                scanner.check_anomaly(SYMBOL, 100.5)
+            self.assertEqual(fetch.call_count, 1)
+
+    def test_friday_close_is_kept_and_fresh_over_the_weekend(self):
+        stats = RollingStats(size=63)
+        friday = 1_790_294_400   # Fri 2026-09-25 00:00 UTC
+        bars = [(friday - 86400 * i, 100.0 + i) for i in range(29, -1, -1)]
+        saturday = friday + 86400 + 3600
+        self.assertEqual(closed_bars(bars, now=friday + 3600)[-1][0], friday - 86400)  # Friday still running
+        self.assertEqual(closed_bars(bars, now=saturday)[-1][0], friday)
+        stats.add_bars(SYMBOL, closed_bars(bars, now=saturday))
+        self.assertFalse(stats.is_stale(SYMBOL, now=saturday))
+        self.assertFalse(stats.is_stale(SYMBOL, now=friday + 4 * 86400 - 1))   # Monday's day still running
+        self.assertTrue(stats.is_stale(SYMBOL, now=friday + 4 * 86400))
+        self.assertFalse(stats.needs_bars(SYMBOL, now=friday + 2 * 86400))
+
+    def test_one_session_is_one_bar_whatever_the_stamp(self):
+        stats = RollingStats(size=63)
+        monday = 1_789_948_800   # Mon 2026-09-21 00:00 UTC
+        ny, ist = 4 * 3600, -3 * 3600   # Local midnight in New York (EDT) / Istanbul, as Ticker.history stamps
+        self.assertEqual(stats.add_bars(SYMBOL, [(monday + ny, 100.0), (monday + 86400 + ist, 101.0)]), 2)
+        # yf.download stamps the same Tuesday at UTC midnight
+        self.assertEqual(stats.add_bars(SYMBOL, [(monday + 86400, 101.0), (monday + 2 * 86400, 102.0)]), 1)
+        self.assertEqual(stats.window(SYMBOL).n, 3)
+        self.assertEqual(db.get_price_history(SYMBOL), [(monday + d * 86400, 100.0 + d) for d in range(3)])
+
+    def test_init_db_collapses_local_midnight_rows(self):
+        monday = 1_789_948_800
+        conn = db.get_db_connection()
+        conn.executemany("INSERT INTO price_history (symbol, time, close) VALUES (?, ?, ?)",
+                         [(SYMBOL, monday + 4 * 3600, 100.0), (SYMBOL, monday, 100.0),
+                          (SYMBOL, monday + 86400 - 3 * 3600, 101.0)])
+        conn.commit()
+        conn.close()
+        db.init_db()
+        self.assertEqual(db.get_price_history(SYMBOL), [(monday, 100.0), (monday + 86400, 101.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import time
+import unittest
+from unittest.mock import patch
+import numpy as np
+from engine import scorecard
+from engine.cache import invalidate
+from engine.scorecard import compute_scorecard, score_matrix, backtest, METRICS
+
+DAY = 86400
+
+TURKEY_MACRO = [{"key": "cpi", "last": "45,0"}, {"key": "ppi_cpi_gap", "last": "-2"}, {"key": "cds_5y", "last": "280"}]
+MACRO = {"policy_rates": {"deposit": "50"}}
+BONDS = {"tr_10y": "28", "tr_2y": "31", "fed_funds": "4.5", "us_cpi": "3"}
+
+
+class TestScorecard(unittest.TestCase):
+
+    def setUp(self):
+        scorecard._last_recorded.update(epoch=0, inputs=None)
+        invalidate("scorecard")
+
+    def _compute(self):
+        with patch.object(scorecard, "fetch_turkey_macro", return_value=TURKEY_MACRO), \
+             patch.object(scorecard, "fetch_macro_data", return_value=MACRO), \
+             patch.object(scorecard, "fetch_equity_risk", return_value={"erp": "-6"}), \
+             patch.object(scorecard, "fetch_gold_correlation", return_value={"corr_usd": 0.9}), \
+             patch.object(scorecard, "fetch_bond_yields", return_value=BONDS), \
+             patch.object(scorecard, "save_scorecard_point") as save:
+            card = compute_scorecard()
+            compute_scorecard()
+        return card, save
+
+    def test_card_and_single_history_row(self):
+        card, save = self._compute()
+        s = card["scores"]
+        self.assertEqual(s["yield_curve"], {"score": -1.0, "value": "-3.00%", "signal": "DEEP INVERSION (Danger)"})
+        self.assertEqual(s["real_carry"]["signal"], "POSITIVE CARRY")   # (50 - 45) - (4.5 - 3) = 3.5
+        self.assertEqual(s["cds"]["value"], "280 bps")
+        self.assertEqual(s["gold_corr"]["score"], -0.8)
+        # (-1*.2 + .5*.2 + .3*.1 - 1*.2 + .3*.2 - .8*.1) / 1.0 * 100
+        self.assertEqual(card["composite"], -29.0)
+        self.assertEqual(card["signal"], "RISK-OFF")
+        self.assertEqual(card["metrics_available"], 6)
+        self.assertEqual(card["missing"], {})
+        save.assert_called_once()   # Second call is served from the "scorecard" cache
+        row = save.call_args[0][0]
+        self.assertEqual(row["composite"], -29.0)
+        self.assertAlmostEqual(row["real_carry"], 3.5)
+
+    def test_sources_run_concurrently_under_a_deadline(self):
+        def slow_gold():
+            time.sleep(0.6)
+            return {"corr_usd": 0.9}
+        with patch.object(scorecard, "SCORECARD_DEADLINE", 0.3), \
+             patch.object(scorecard, "fetch_turkey_macro", return_value=TURKEY_MACRO), \
+             patch.object(scorecard, "fetch_macro_data", return_value=MACRO), \
+             patch.object(scorecard, "fetch_equity_risk", side_effect=lambda: time.sleep(0.2) or {"erp": "-6"}), \
+             patch.object(scorecard, "fetch_gold_correlation", side_effect=slow_gold), \
+             patch.object(scorecard, "fetch_bond_yields", side_effect=lambda: time.sleep(0.2) or BONDS), \
+             patch("engine.fanout.get_last_good", return_value=None), \
+             patch.object(scorecard, "save_scorecard_point"):
+            t0 = time.perf_counter()
+            card = compute_scorecard()
+            elapsed = time.perf_counter() - t0
+        self.assertLess(elapsed, 0.5)   # Bounded by the deadline, not the sum
+        self.assertEqual(card["missing"], {"gold_corr": ["gold_corr"]})
+        self.assertEqual(card["metrics_available"], 5)
+        self.assertEqual(card["_sources"]["gold_corr"]["status"], "timeout")
+        time.sleep(0.4)   # The late source lands and drops the cached card
+        self.assertIsNone(scorecard.get_cached("scorecard", ttl_seconds=60))
+
+    def test_score_matrix_bands(self):
+        x = np.full((3, len(METRICS)), np.nan)
+        x[:, METRICS.index("cds")] = [150, 350, np.nan]
+        scores, bands = score_matrix(x)
+        col = METRICS.index("cds")
+        self.assertEqual(list(scores[:2, col]), [1.0, -0.5])   # 350 is not < 350
+        self.assertTrue(np.isnan(scores[2, col]))
+        self.assertEqual(list(bands[:, col]), [0, 2, -1])
+
+
+class TestBacktest(unittest.TestCase):
+
+    def test_forward_returns_per_bucket(self):
+        start = 1_600_000_000
+        # Risk-on for ten days, then risk-off
+        history = [{"epoch": start + d * DAY + 3600, "timestamp": str(d),
+                    **{m: (10.0 if d < 10 else -10.0) for m in ("yield_curve", "real_carry", "erp")},
+                    "ppi_cpi_gap": None, "cds": None, "gold_corr": None} for d in range(20)]
+        closes = [100 * 1.01 ** d if d < 11 else 100 * 1.01 ** 10 * 0.99 ** (d - 10) for d in range(20)]
+        prices = {"bist100": [(start + d * DAY, c) for d, c in enumerate(closes)]}
+        res = backtest(history, prices, horizons=(1,))
+        h1 = res["assets"]["bist100"]["horizons"]["1d"]
+        self.assertEqual(h1["RISK-ON"]["count"], 10)
+        self.assertAlmostEqual(h1["RISK-ON"]["mean"], 1.0, places=3)
+        self.assertEqual(h1["RISK-ON"]["hit_rate"], 1.0)
+        self.assertEqual(h1["RISK-OFF"]["count"], 9)   # Last bar has no forward return
+        self.assertEqual(h1["RISK-OFF"]["hit_rate"], 0.0)
+        self.assertEqual(h1["NEUTRAL"]["count"], 0)
+
+    def test_signal_after_the_bist_close_trades_next_day(self):
+        day0 = 1_790_035_200   # Tue 2026-09-22 00:00 UTC
+        risk_on = {m: 10.0 for m in ("yield_curve", "real_carry", "erp")}
+        history = [{"epoch": day0 + 14 * 3600, "timestamp": "a", **{m: -10.0 for m in risk_on}},   # 17:00 Istanbul
+                   {"epoch": day0 + 16 * 3600, "timestamp": "b", **risk_on}]                        # 19:00 Istanbul
+        prices = {"bist100": [(day0, 100.0), (day0 + DAY, 110.0), (day0 + 2 * DAY, 121.0)]}
+        h1 = backtest(history, prices, horizons=(1,))["assets"]["bist100"]["horizons"]["1d"]
+        self.assertEqual(h1["RISK-OFF"]["count"], 1)   # Day 0 trades on what was known by its close
+        self.assertEqual(h1["RISK-ON"]["count"], 1)
+
+    def test_empty_history_before_first_refresh(self):
+        res = backtest(history=[], prices={"bist100": [(0, 1.0), (DAY, 1.1)]})
+        self.assertEqual(res["refreshes"], 0)
+        self.assertEqual(res["assets"]["bist100"]["scored_days"], 0)
+        self.assertEqual(res["assets"]["bist100"]["horizons"]["1d"]["RISK-ON"]["count"], 0)
+
+    def test_years_of_daily_data_well_under_a_second(self):
+        rng = np.random.default_rng(2)
+        start, days = 1_300_000_000, 252 * 12
+        history = [{"epoch": start + d * DAY + 7200, "timestamp": str(d),
+                    **{m: float(v) for m, v in zip(METRICS, rng.normal(0, 300, len(METRICS)))}}
+                   for d in range(days)]
+        bars = [(start + d * DAY, float(c)) for d, c in enumerate(100 * np.cumprod(1 + rng.normal(0, 0.01, days)))]
+        t0 = time.perf_counter()
+        res = backtest(history, {"bist100": bars, "usdtry": bars})
+        self.assertLess(time.perf_counter() - t0, 0.5)
+        self.assertEqual(res["assets"]["usdtry"]["scored_days"], days)
+
+
+if __name__ == '__main__':
+    unittest.main()
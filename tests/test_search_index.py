@@ -0,0 +1,36 @@
+import time
+import unittest
+from engine.registry import search_registry, resolve_entity
+from engine.search_index import SearchIndex
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def test_prefix_substring_and_typo(self):
+        keys = lambda q: [r["key"] for r in search_registry(q)]
+        self.assertIn("usdtry", keys("usd"))
+        self.assertIn("usdtry", keys("try"))
+        self.assertEqual(keys("usdtyr")[0], "usdtry")
+        self.assertEqual(search_registry("usdtry")[0]["match_type"], "exact")
+
+    def test_technical_key_and_bare_tickers_resolve(self):
+        self.assertEqual(resolve_entity("^IXIC")["key"], "nasdaq")
+        self.assertEqual(resolve_entity("@XU100.IS")["key"], "bist100")
+        self.assertEqual(resolve_entity("SOL-USD")["source"], "market")
+        self.assertIsNone(resolve_entity("not_a_thing"))
+
+    def test_scales_to_large_universe(self):
+        docs = [{"key": f"tp_series_{i}", "name": f"EVDS Series {i} Index", "group": f"g{i % 50}",
+                 "technical_key": f"TP.S{i}.A{i % 7}", "explain": "synthetic"} for i in range(10000)]
+        docs.append({"key": "usdtry", "name": "USD/TRY", "group": "fx", "technical_key": "USDTRY=X"})
+        idx = SearchIndex(docs)
+        t0 = time.perf_counter()
+        for _ in range(50):
+            self.assertEqual(idx.search("usdtyr")[0][0]["key"], "usdtry")
+            self.assertEqual(idx.by_technical_key("TP.S2345.A0")["key"], "tp_series_2345")
+            self.assertTrue(idx.search("tp_series_1999", limit=5))
+        self.assertLess((time.perf_counter() - t0) / 50, 0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import time
+import calendar
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from engine import db
+from engine.seasonality import compute_seasonality, get_monthly_seasonality, SeasonalityJob
+
+SYMBOLS = ["TEST_SEAS_A", "TEST_SEAS_B.IS"]
+
+
+def business_days(start, end):
+    days = pd.bdate_range(start, end)
+    # Bars stamped at UTC midnight of their date, as fetch_daily_bars and price_history carry them
+    return [int(d.timestamp()) for d in days], days
+
+
+class TestSeasonality(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db_patch = patch.object(db, "DB_PATH", self.path)
+        self.db_patch.start()
+        db.init_db()
+
+    def tearDown(self):
+        self.db_patch.stop()
+        os.remove(self.path)
+
+    def test_groupby_stats_match_manual(self):
+        times, days = business_days("2020-01-01", "2021-12-31")
+        rng = np.random.default_rng(5)
+        closes = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(days)))
+        frame = pd.DataFrame({"symbol": SYMBOLS[1], "time": times, "close": closes})
+        rows = {(r["kind"], r["bucket"]): r for r in compute_seasonality(frame)}
+
+        s = pd.Series(closes, index=days)
+        month_end = s.groupby(s.index.to_period("M")).last()
+        march = month_end.pct_change().mul(100)[[pd.Period("2020-03"), pd.Period("2021-03")]]
+        self.assertAlmostEqual(rows[("month", "3")]["mean"], round(march.mean(), 3))
+        self.assertEqual(rows[("month", "3")]["count"], 2)
+        self.assertEqual(rows[("month", "12")]["count"], 1)  # Dec 2021 is the month in progress
+
+        rets = s.pct_change().mul(100)
+        mondays = rets[rets.index.dayofweek == 0].dropna()
+        self.assertAlmostEqual(rows[("weekday", "0")]["mean"], round(mondays.mean(), 3))
+        self.assertEqual(rows[("weekday", "0")]["count"], len(mondays))
+        self.assertAlmostEqual(rows[("weekday", "0")]["win_rate"], round((mondays > 0).mean() * 100, 1))
+        t = mondays.mean() / (mondays.std() / np.sqrt(len(mondays)))
+        self.assertAlmostEqual(rows[("weekday", "0")]["t_stat"], round(t, 2))
+
+        turn = rows[("turn_of_month", "turn")]["count"] + rows[("turn_of_month", "rest")]["count"]
+        self.assertEqual(turn, len(rets.dropna()))
+        self.assertEqual(rows[("turn_of_month", "turn")]["count"], 24 * 4 - 1)  # First month has no prior close
+
+    def test_job_persists_rows_popups_read(self):
+        times, _ = business_days("2016-01-01", "2026-06-30")
+        bars = [(t, 100.0 + i % 7) for i, t in enumerate(times)]
+        job = SeasonalityJob(symbols=[SYMBOLS[0]])
+        with patch("engine.market.fetch_daily_bars", return_value={SYMBOLS[0]: bars}) as fetch:
+            self.assertEqual(job.refresh_once(now=times[-1]), 1)
+            job.refresh_once(now=times[-1])
+        self.assertEqual(fetch.call_count, 1)  # Backfilled once
+        res = get_monthly_seasonality(SYMBOLS[0])
+        self.assertEqual(set(res["monthly_map"]), set(range(1, 13)))
+        self.assertEqual(set(res["weekday_map"]), {"Mon", "Tue", "Wed", "Thu", "Fri"})
+        self.assertIn("turn", res["turn_of_month"])
+        best, worst = res["best_month"], res["worst_month"]
+        self.assertEqual(best["avg_return"], max(m["avg_return"] for m in res["monthly_map"].values()))
+        self.assertEqual(worst["avg_return"], min(m["avg_return"] for m in res["monthly_map"].values()))
+        self.assertEqual(best["name"], calendar.month_name[best["month"]])
+        self.assertIsNone(get_monthly_seasonality("TEST_SEAS_NONE"))
+
+    def test_failed_backfill_is_retried(self):
+        job = SeasonalityJob(symbols=SYMBOLS)
+        with patch("engine.market.fetch_daily_bars", side_effect=[RuntimeError("timeout"), {}, {}]) as fetch:
+            job.refresh_once(now=time.time())
+            self.assertEqual(job.backfill(SYMBOLS), 0)  # Download left every symbol out
+            job.backfill(SYMBOLS)
+        self.assertEqual(fetch.call_count, 3)
+        self.assertEqual(fetch.call_args[0][0], SYMBOLS)
+
+
+if __name__ == '__main__':
+    unittest.main()
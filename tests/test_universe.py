@@ -0,0 +1,84 @@
+import os
+import time
+import tempfile
+import unittest
+import numpy as np
+from unittest.mock import patch
+from engine import db
+from engine.rolling import RollingStats
+from engine.universe import UniverseScanner, scan_matrix, COOLDOWN_SECONDS
+
+PREFIX = "TEST_UNIV"
+
+
+class TestScanMatrix(unittest.TestCase):
+
+    def test_vectorized_stats_match_per_row(self):
+        rng = np.random.default_rng(3)
+        hist = 100 + rng.normal(0, 1, (4, 40))
+        hist[3, :30] = np.nan  # Short history -> ignored
+        live = np.array([hist[0].mean() + 3.5 * hist[0].std(ddof=1), hist[1].mean(), hist[2].max() + 1, 200.0])
+        res = scan_matrix(hist, live)
+        self.assertAlmostEqual(res["z"][0], 3.5)
+        self.assertLess(abs(res["z"][1]), 1e-9)
+        self.assertTrue(res["at_high"][2])
+        self.assertEqual(res["percentile"][2], 1.0)
+        self.assertEqual(res["z"][3], 0.0)
+        self.assertFalse(res["at_high"][3])
+
+    def test_whole_universe_in_milliseconds(self):
+        rng = np.random.default_rng(1)
+        hist = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (2000, 63)), axis=1))
+        t0 = time.perf_counter()
+        scan_matrix(hist, hist[:, -1] * 1.001)
+        self.assertLess(time.perf_counter() - t0, 0.1)
+
+
+class TestUniverseScanner(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db_patch = patch.object(db, "DB_PATH", self.path)
+        self.db_patch.start()
+        db.init_db()
+
+    def tearDown(self):
+        self.db_patch.stop()
+        os.remove(self.path)
+
+    def test_alerts_persist_with_cooldown_and_escalation(self):
+        syms = [f"{PREFIX}{i}" for i in range(3)]
+        stats = RollingStats(size=63, persist=False)
+        for s in syms:
+            stats.replace(s, [100.0 + (i % 2) for i in range(40)])
+        scanner = UniverseScanner(stats=stats, symbols=syms)
+        now = 2_000_000_000.0
+        with patch("engine.universe.get_last_alerts", return_value={}):
+            first = scanner.scan({syms[0]: 101.7, syms[1]: 100.5}, now=now)
+        self.assertEqual([(a["symbol"], a["type"], a["level"]) for a in first], [(syms[0], "SIGMA", "WARNING"), (syms[0], "RANGE_HIGH", "INFO")])
+        self.assertEqual(scanner.scan({syms[0]: 101.7}, now=now + 60), [])
+        escalated = scanner.scan({syms[0]: 102.2}, now=now + 120)
+        self.assertEqual([(a["type"], a["level"]) for a in escalated], [("SIGMA", "CRITICAL")])
+        again = scanner.scan({syms[0]: 101.7}, now=now + COOLDOWN_SECONDS + 121)
+        self.assertEqual(len(again), 2)
+        stored = scanner.feed(limit=10)["alerts"]
+        self.assertEqual(sum(1 for a in stored if a["symbol"] == syms[0]), 5)
+
+    def test_fresh_windows_are_not_downloaded_again(self):
+        sym = "USDTRY=X"
+        stats = RollingStats(size=63, persist=False)
+        tuesday = 1_790_035_200   # Tue 2026-09-22 00:00 UTC
+        stats.add_bars(sym, [(tuesday - d * 86400, 40.0 + d % 2) for d in range(40)])
+        scanner = UniverseScanner(stats=stats, symbols=[sym])
+        bars = {sym: [(tuesday, 40.0), (tuesday + 86400, 41.0), (tuesday + 2 * 86400, 41.5)]}
+        with patch("engine.market.fetch_daily_bars", return_value=bars) as fetch:
+            self.assertEqual(scanner.sync_bars(now=tuesday + 86400 + 43200), {})   # Wednesday, mid-session
+            fetch.assert_not_called()
+            self.assertEqual(scanner.sync_bars(now=tuesday + 2 * 86400 + 3600), {sym: 41.5})
+            fetch.assert_called_once_with([sym], period="5d")
+        self.assertEqual(stats.window(sym).last_time, tuesday + 86400)   # Wednesday closed, Thursday running
+
+
+if __name__ == '__main__':
+    unittest.main()
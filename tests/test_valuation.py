@@ -0,0 +1,50 @@
+import unittest
+from unittest.mock import patch
+from engine import valuation
+from engine.levels import LevelStore
+
+
+class TestValuation(unittest.TestCase):
+
+    def setUp(self):
+        self.levels = LevelStore()
+        self.levels.publish("market", {"USDTRY=X": {"price": 41.0, "change_pct": 0.1},
+                                       "XU100.IS": {"price": 10000.0, "change_pct": 0.5}})
+        self.levels.publish("bonds", {"tr_10y": 30.0, "us_10y": 4.0, "us_cpi": 3.0})
+        self.levels.publish("macro", {"cds": {"val": 300.0}})
+        self.levels.publish("erp", {"pe": 5.0})
+        self.levels.publish("turkey_macro", [{"key": "cpi", "last": "33.00", "unit": "%"}])
+
+    def test_batch_matches_models(self):
+        res = valuation.evaluate_all(self.levels)
+        m = res["models"]
+        self.assertEqual(m["tr_10y"]["fair_value"], 7.0)
+        self.assertEqual(m["tr_10y"]["gap"], 23.0)
+        self.assertEqual(m["bist100"]["value"], -10.0)
+        self.assertEqual(m["usdtry"]["fair_value_desc"], "Inflation Gap (+30.0%)")
+        self.assertEqual(m["usdtry"]["us_cpi_source"], "FRED")
+
+    def test_grids_broadcast_around_live_inputs(self):
+        grid = valuation.evaluate_all(self.levels)["grids"]["fair_tr_10y"]
+        xs, ys, z = grid["x"]["values"], grid["y"]["values"], grid["z"]
+        self.assertEqual((len(z), len(z[0])), (len(xs), len(ys)))
+        mid = valuation.GRID_POINTS // 2
+        self.assertEqual(z[mid][mid], 7.0)
+        self.assertAlmostEqual(z[0][-1], xs[0] + ys[-1] / 100, places=2)
+
+    def test_cached_until_an_input_changes(self):
+        first = valuation.evaluate_all(self.levels)
+        self.assertIs(valuation.evaluate_all(self.levels), first)
+        self.levels.publish("bonds", {"tr_10y": 31.0, "us_10y": 4.0, "us_cpi": 3.0})
+        self.assertEqual(valuation.evaluate_all(self.levels)["models"]["tr_10y"]["gap"], 24.0)
+
+    def test_single_entity_uses_us_cpi_fallback(self):
+        with patch("engine.resolver.LEVELS", LevelStore()) as levels:
+            levels.publish("turkey_macro", [{"key": "cpi", "last": "33.00", "unit": "%"}])
+            res = valuation.compute_fair_value("usdtry", 41.0)
+        self.assertEqual(res["us_cpi_source"], "assumed")
+        self.assertEqual(res["fair_value_desc"], "Inflation Gap (+30.5%)")
+
+
+if __name__ == '__main__':
+    unittest.main()